@@ -0,0 +1,157 @@
+# Live event feeds for sequential A/B tests
+# Reads impression/click/conversion events from a growing local file or a local HTTP
+# endpoint and feeds them to an ab_testing.SequentialTest on a background thread,
+# re-evaluating the always-valid boundaries after every batch. No Streamlit import.
+
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+
+from ab_testing import SequentialTest
+
+try:
+    import requests
+except ImportError:
+    requests = None
+
+Event = Dict[str, object]
+
+
+def parse_event(line: str) -> Optional[Event]:
+    """
+    One event per line: JSON (``{"variant": "B", "event": "click", "count": 1}``) or
+    CSV (``B,click[,count]``). Blank and malformed lines return None.
+    """
+    line = line.strip()
+    if not line:
+        return None
+    if line.startswith("{"):
+        try:
+            event = json.loads(line)
+        except ValueError:
+            return None
+        return event if isinstance(event, dict) else None
+    parts = [p.strip() for p in line.split(",")]
+    if len(parts) < 2:
+        return None
+    try:
+        count = int(parts[2]) if len(parts) > 2 and parts[2] else 1
+    except ValueError:
+        return None
+    return {"variant": parts[0], "event": parts[1], "count": count}
+
+
+class FileTail:
+    """Returns the complete lines appended to ``path`` since the last read (restarts if the file shrinks)."""
+
+    def __init__(self, path: str, from_start: bool = True):
+        self.path = path
+        self.offset = 0 if from_start or not os.path.exists(path) else os.path.getsize(path)
+        self._partial = b""
+
+    def read(self) -> List[Event]:
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return []
+        if size < self.offset:
+            self.offset, self._partial = 0, b""
+        if size == self.offset:
+            return []
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read()
+        self.offset += len(data)
+        *lines, self._partial = (self._partial + data).split(b"\n")
+        events = (parse_event(line.decode("utf-8", "replace")) for line in lines)
+        return [e for e in events if e is not None]
+
+
+class HttpPoller:
+    """
+    Polls ``url`` with ``?since=<cursor>``; the endpoint answers with a JSON list or
+    NDJSON of new events. The cursor is the last event's ``id`` when events carry one,
+    else the running event count.
+    """
+
+    def __init__(self, url: str, timeout: float = 5.0):
+        if requests is None:
+            raise RuntimeError("The requests package is needed to poll an HTTP event feed.")
+        self.url = url
+        self.timeout = timeout
+        self.cursor: object = 0
+        self._session = requests.Session()
+
+    def read(self) -> List[Event]:
+        resp = self._session.get(self.url, params={"since": self.cursor}, timeout=self.timeout)
+        resp.raise_for_status()
+        body = resp.text.strip()
+        if body.startswith("["):
+            events = [e for e in json.loads(body) if isinstance(e, dict)]
+        else:
+            events = [e for e in map(parse_event, body.splitlines()) if e is not None]
+        if events:
+            last_id = events[-1].get("id")
+            self.cursor = last_id if last_id is not None else int(self.cursor) + len(events)
+        return events
+
+
+class SequentialConsumer(threading.Thread):
+    """
+    Drains ``source`` into ``test`` every ``interval`` seconds and keeps the latest
+    evaluation in ``result``. Stops on ``stop()`` or, with ``auto_stop``, as soon as
+    the test is decided.
+    """
+
+    def __init__(self, source, test: SequentialTest, interval: float = 1.0, auto_stop: bool = True):
+        super().__init__(daemon=True)
+        self.source = source
+        self.test = test
+        self.interval = interval
+        self.auto_stop = auto_stop
+        self.lock = threading.Lock()
+        self.result: Optional[Dict] = None
+        self.batches = 0
+        self.error = ""
+        self.decided = False
+        self._stop_event = threading.Event()
+
+    def poll_once(self) -> int:
+        try:
+            events = self.source.read()
+            self.error = ""
+        except Exception as e:
+            self.error = str(e)
+            return 0
+        if not events:
+            return 0
+        with self.lock:
+            self.test.add_batch(events)
+            self.result = self.test.evaluate()
+            self.decided = self.test.decided(self.result)
+            self.batches += 1
+        return len(events)
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self.poll_once()
+            if self.decided and self.auto_stop:
+                break
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+
+    def snapshot(self) -> Dict:
+        with self.lock:
+            return {
+                "names": list(self.test.names),
+                "counts": [list(c) for c in self.test.counts],
+                "events": self.test.events,
+                "result": self.result,
+                "batches": self.batches,
+                "decided": self.decided,
+                "running": self.is_alive(),
+                "error": self.error,
+            }
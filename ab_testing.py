@@ -0,0 +1,338 @@
+# A/B/n split-test statistics
+# Vectorized NumPy helpers for the A/B Split Tester: per-variant KPIs, two-proportion
+# z-tests against a control, sample-size grids, Bayesian beta-binomial probabilities
+# estimated by Monte Carlo, a Thompson-sampling bandit for splitting live traffic and an
+# mSPRT sequential test fed one event at a time. Variant 0 is the control throughout.
+
+import math
+from statistics import NormalDist
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+
+RATE_METRICS = {
+    "CTR": ("Clicks", "Impressions"),
+    "Click→Conv": ("Conversions", "Clicks"),
+    "Imp→Conv": ("Conversions", "Impressions"),
+}
+
+
+def _ratio(num, den) -> np.ndarray:
+    num = np.asarray(num, dtype="float64")
+    den = np.asarray(den, dtype="float64")
+    out = np.zeros(np.broadcast(num, den).shape)
+    np.divide(num, den, out=out, where=den > 0)
+    return out
+
+
+def variant_kpis(impressions, clicks, conversions, cost, revenue) -> Dict[str, np.ndarray]:
+    """CTR, CVR and Imp→Conv in %, EPC in $ and ROI in % of cost (0 where undefined)."""
+    return {
+        "CTR %": _ratio(clicks, impressions) * 100,
+        "Click→Conv %": _ratio(conversions, clicks) * 100,
+        "Imp→Conv %": _ratio(conversions, impressions) * 100,
+        "EPC $": _ratio(revenue, clicks),
+        "ROI %": _ratio(np.asarray(revenue, dtype="float64") - np.asarray(cost, dtype="float64"), cost) * 100,
+    }
+
+
+def z_test_vs_control(successes: Sequence[int], trials: Sequence[int]) -> Dict[str, np.ndarray]:
+    """
+    Two-sided pooled two-proportion z-test of every variant against variant 0.
+    Returns relative lift, z and p per variant; the control's own row is 0 / 0 / 1.
+    """
+    x = np.asarray(successes, dtype="float64")
+    n = np.asarray(trials, dtype="float64")
+    rate = _ratio(x, n)
+    pooled = _ratio(x + x[0], n + n[0])
+    se = np.sqrt(pooled * (1 - pooled) * (_ratio(1, n) + _ratio(1, n[0])))
+    z = _ratio(rate - rate[0], se)
+    p = np.array([math.erfc(abs(v) / math.sqrt(2)) for v in z])
+    p[(n == 0) | (n[0] == 0) | (se == 0)] = 1.0
+    lift = _ratio(rate - rate[0], rate[0])
+    return {"rate": rate, "lift": lift, "z": z, "p": p}
+
+
+def sample_size_grid(
+    baselines: Sequence[float],
+    mdes: Sequence[float],
+    powers: Sequence[float],
+    confidence: float = 95,
+    variants: int = 2,
+) -> np.ndarray:
+    """
+    Trials per variant for a two-sided two-proportion z-test, for every baseline rate ×
+    relative minimum detectable effect × power (all fractions) in one broadcast pass.
+    Shape is (baselines, mdes, powers); alpha is Bonferroni-split across the challengers
+    and impossible cells (lifted rate ≥ 1 or no effect) are NaN.
+    """
+    p1 = np.asarray(baselines, dtype="float64")[:, None, None]
+    p2 = p1 * (1 + np.asarray(mdes, dtype="float64")[None, :, None])
+    alpha = (1 - confidence / 100) / max(variants - 1, 1)
+    normal = NormalDist()
+    z_alpha = normal.inv_cdf(1 - alpha / 2)
+    z_power = np.array([normal.inv_cdf(p) for p in powers])[None, None, :]
+    p_bar = (p1 + p2) / 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        n = (z_alpha * np.sqrt(2 * p_bar * (1 - p_bar)) + z_power * np.sqrt(p1 * (1 - p1) + p2 * (1 - p2))) ** 2 / (
+            p2 - p1
+        ) ** 2
+    n = np.broadcast_to(np.ceil(n), (p1.shape[0], p2.shape[1], z_power.shape[2])).copy()
+    n[np.broadcast_to((p2 >= 1) | (p2 <= p1) | (p1 <= 0), n.shape)] = np.nan
+    return n
+
+
+# Above this shape, gamma draws use the Wilson–Hilferty cube of a normal draw, which is
+# ~4x cheaper than rng.standard_gamma and matches its quantiles to ~1e-4.
+WILSON_HILFERTY_MIN_SHAPE = 100.0
+
+
+def gamma_draws(shape: np.ndarray, size: int, rng: np.random.Generator) -> np.ndarray:
+    """len(shape) x ``size`` float32 Gamma(shape, 1) draws, one contiguous row per variant."""
+    shape = np.asarray(shape, dtype="float32")
+    out = np.empty((len(shape), size), dtype=np.float32)
+    for row, k in zip(out, shape):
+        if k < WILSON_HILFERTY_MIN_SHAPE:
+            row[:] = rng.standard_gamma(k, size=size, dtype=np.float32)
+            continue
+        c = np.float32(1 / (9 * k))
+        rng.standard_normal(size=size, dtype=np.float32, out=row)
+        row *= np.sqrt(c)
+        row += 1 - c
+        np.multiply(row, row * row, out=row)
+        row *= k
+    return out
+
+
+def beta_draws(a: np.ndarray, b: np.ndarray, size: int, rng: np.random.Generator) -> np.ndarray:
+    """len(a) x ``size`` Beta(a, b) draws, as X / (X + Y) of two gammas."""
+    x = gamma_draws(a, size, rng)
+    y = gamma_draws(b, size, rng)
+    y += x
+    x /= y
+    return x
+
+
+def posterior_draws(
+    successes: np.ndarray, trials: np.ndarray, size: int, rng: np.random.Generator, prior=(1.0, 1.0)
+) -> np.ndarray:
+    """Variants x ``size`` draws from each Beta posterior."""
+    return beta_draws(prior[0] + successes, prior[1] + np.maximum(trials - successes, 0), size, rng)
+
+
+def bayes_vs_control(
+    successes: Sequence[int],
+    trials: Sequence[int],
+    draws: int = 1_000_000,
+    chunk: int = 200_000,
+    seed: Optional[int] = None,
+    prior=(1.0, 1.0),
+) -> Dict[str, np.ndarray]:
+    """
+    Monte Carlo estimates per variant of P(beats control), P(best of all) and the
+    expected loss (rate given up versus the best variant) under Beta posteriors.
+    Draws are taken in chunks so memory stays at variants x ``chunk``.
+    """
+    x = np.asarray(successes, dtype="float64")
+    n = np.asarray(trials, dtype="float64")
+    k = len(x)
+    rng = np.random.default_rng(seed)
+    beats = np.zeros(k)
+    best = np.zeros(k)
+    loss = np.zeros(k)
+    done = 0
+    while done < draws:
+        size = min(chunk, draws - done)
+        samples = posterior_draws(x, n, size, rng, prior)
+        top = samples.max(axis=0)
+        beats += np.count_nonzero(samples > samples[0], axis=1)
+        best += np.count_nonzero(samples == top, axis=1)
+        # sum(top - s_j) without materialising the variants x draws difference matrix.
+        loss += top.sum(dtype="float64") - samples.sum(axis=1, dtype="float64")
+        done += size
+    beats[0] = np.nan
+    return {"p_beat_control": beats / draws, "p_best": best / draws, "expected_loss": loss / draws}
+
+
+# Cap on draws x arms per Monte Carlo chunk (~16 MB of float32).
+_BANDIT_CHUNK_CELLS = 4_000_000
+
+
+class ThompsonBandit:
+    """
+    Beta-Bernoulli arms (headlines, subject lines, ads...) for live traffic splitting.
+    Updates are O(1) per arm; ``allocate`` gives each of the next ``n`` impressions
+    to the arm whose posterior draw is highest.
+    """
+
+    def __init__(self, names: Iterable[str] = (), prior=(1.0, 1.0)):
+        self.prior = prior
+        self.names: List[str] = []
+        self._index: Dict[str, int] = {}
+        self.alpha = np.empty(0)
+        self.beta = np.empty(0)
+        for name in names:
+            self.add_arm(name)
+
+    @classmethod
+    def from_counts(cls, names: Sequence[str], successes: Sequence[float], failures: Sequence[float], prior=(1.0, 1.0)):
+        bandit = cls(prior=prior)
+        bandit.names = list(names)
+        bandit._index = {name: i for i, name in enumerate(bandit.names)}
+        if len(bandit._index) != len(bandit.names):
+            raise ValueError("Arm names must be unique.")
+        bandit.alpha = prior[0] + np.asarray(successes, dtype="float64")
+        bandit.beta = prior[1] + np.asarray(failures, dtype="float64")
+        return bandit
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def add_arm(self, name: str, successes: float = 0, failures: float = 0) -> int:
+        if name in self._index:
+            raise ValueError(f"Duplicate arm: {name}")
+        self._index[name] = len(self.names)
+        self.names.append(name)
+        self.alpha = np.append(self.alpha, self.prior[0] + successes)
+        self.beta = np.append(self.beta, self.prior[1] + failures)
+        return len(self.names) - 1
+
+    def update(self, arm: Union[str, int], successes: float = 0, failures: float = 0):
+        i = self._index[arm] if isinstance(arm, str) else arm
+        self.alpha[i] += successes
+        self.beta[i] += failures
+
+    def update_batch(self, arms: Sequence[int], successes: Sequence[float], failures: Sequence[float]):
+        """Fold a batch of per-event results in; ``arms`` may repeat."""
+        np.add.at(self.alpha, np.asarray(arms), np.asarray(successes, dtype="float64"))
+        np.add.at(self.beta, np.asarray(arms), np.asarray(failures, dtype="float64"))
+
+    def means(self) -> np.ndarray:
+        return self.alpha / (self.alpha + self.beta)
+
+    def allocate(self, n: int, rng: Optional[np.random.Generator] = None, max_draws: int = 20_000) -> np.ndarray:
+        """
+        Impressions per arm for the next ``n``. Up to ``max_draws`` impressions get
+        their own Thompson draw; beyond that the win shares from ``max_draws`` draws
+        are scaled up with a multinomial split.
+        """
+        rng = rng or np.random.default_rng()
+        k = len(self.names)
+        if not k or n <= 0:
+            return np.zeros(k, dtype="int64")
+        draws = min(n, max_draws)
+        chunk = max(1, _BANDIT_CHUNK_CELLS // k)
+        wins = np.zeros(k, dtype="int64")
+        done = 0
+        while done < draws:
+            size = min(chunk, draws - done)
+            wins += np.bincount(beta_draws(self.alpha, self.beta, size, rng).argmax(axis=0), minlength=k)
+            done += size
+        if draws == n:
+            return wins
+        return rng.multinomial(n, wins / draws)
+
+
+# Event type -> running count column (Impressions, Clicks, Conversions).
+EVENT_COLUMNS = {"impression": 0, "click": 1, "conversion": 2}
+_COUNT_NAMES = ["Impressions", "Clicks", "Conversions"]
+
+
+class SequentialTest:
+    """
+    Running A/B/n counts fed one event at a time, with always-valid p-values from a
+    normal-approximation mSPRT (mixture of N(0, tau^2) over the rate difference).
+    The test may be checked after every batch without inflating the false-positive
+    rate. The first variant seen is the control unless one is given.
+    """
+
+    def __init__(
+        self,
+        metric: str = "CTR",
+        confidence: float = 95,
+        expected_lift: float = 0.2,
+        control: Optional[str] = None,
+        min_trials: int = 100,
+    ):
+        self.metric = metric
+        self.alpha = 1 - confidence / 100
+        self.expected_lift = expected_lift
+        self.min_trials = min_trials
+        self.names: List[str] = []
+        self.counts: List[List[int]] = []
+        self._index: Dict[str, int] = {}
+        self._p_values: List[float] = []
+        self.events = 0
+        if control is not None:
+            self._variant(control)
+
+    def _variant(self, name: str) -> int:
+        i = self._index.get(name)
+        if i is None:
+            i = self._index[name] = len(self.names)
+            self.names.append(name)
+            self.counts.append([0, 0, 0])
+            self._p_values.append(1.0)
+        return i
+
+    def add(self, variant: str, event: str, count: int = 1):
+        """Count one event (``impression``, ``click`` or ``conversion``); unknown event types are ignored."""
+        col = EVENT_COLUMNS.get(event)
+        if col is None:
+            return
+        self.counts[self._variant(variant)][col] += count
+        self.events += count
+
+    def add_batch(self, events: Iterable[Dict]):
+        """Count parsed feed events; ones without a variant or with a bad count are skipped."""
+        for e in events:
+            variant = e.get("variant")
+            try:
+                count = int(e.get("count", 1))
+            except (TypeError, ValueError):
+                continue
+            if variant in (None, "") or count < 0:
+                continue
+            self.add(str(variant), str(e.get("event", "")).lower(), count)
+
+    def evaluate(self) -> Dict[str, np.ndarray]:
+        """
+        Re-derive rates, lift and log-likelihood ratios from the running counts and
+        tighten each challenger's always-valid p-value (the running minimum of 1/LR).
+        Challengers are compared with the control at a Bonferroni-adjusted alpha.
+        """
+        counts = np.asarray(self.counts, dtype="float64").reshape(-1, 3)
+        s_col, t_col = (_COUNT_NAMES.index(c) for c in RATE_METRICS[self.metric])
+        x, n = counts[:, s_col], counts[:, t_col]
+        rate = _ratio(x, n)
+        theta = rate - rate[0] if len(rate) else rate
+        var = _ratio(rate * (1 - rate), n)
+        v = var + (var[0] if len(var) else 0)
+        pooled = _ratio(x.sum(), n.sum())
+        tau2 = (self.expected_lift * pooled) ** 2
+        ready = (n >= self.min_trials) & (n[0] >= self.min_trials if len(n) else False) & (v > 0) & (tau2 > 0)
+        ready[:1] = False
+        log_lr = np.zeros(len(rate))
+        vr, tr = v[ready], theta[ready]
+        log_lr[ready] = 0.5 * np.log(vr / (vr + tau2)) + tau2 * tr ** 2 / (2 * vr * (vr + tau2))
+        p_now = np.minimum(1.0, np.exp(-log_lr))
+        self._p_values = list(np.minimum(self._p_values, p_now))
+        p = np.asarray(self._p_values)
+        alpha = self.alpha / max(len(rate) - 1, 1)
+        significant = p < alpha
+        significant[:1] = False
+        return {
+            "rate": rate,
+            "lift": _ratio(theta, rate[0]) if len(rate) else rate,
+            "log_lr": log_lr,
+            "p": p,
+            "alpha": alpha,
+            "significant": significant,
+        }
+
+    def decided(self, result: Optional[Dict] = None) -> bool:
+        """True once any challenger is significantly better or every challenger is significantly worse."""
+        result = result or self.evaluate()
+        better = result["significant"] & (result["lift"] > 0)
+        worse = result["significant"] & (result["lift"] < 0)
+        return bool(better.any()) or (len(self.names) > 1 and bool(worse[1:].all()))
@@ -0,0 +1,562 @@
+# Campaign analytics store
+# Columnar (pandas) storage for campaign snapshots with KPIs derived in vectorized
+# passes and per-group rollups that are updated from each appended batch instead of
+# being recomputed over the whole history. SQLiteCampaignStore persists the same
+# data to a local WAL-mode database; CampaignStore keeps it in memory.
+
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import IO, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+KEY_COLUMNS = ["Campaign", "Channel"]
+COUNT_COLUMNS = ["Clicks", "Leads", "Sales"]
+MONEY_COLUMNS = ["Spend", "Revenue"]
+METRIC_COLUMNS = ["Spend", "Clicks", "Leads", "Sales", "Revenue"]
+SNAPSHOT_COLUMNS = ["Timestamp"] + KEY_COLUMNS + METRIC_COLUMNS
+KPI_COLUMNS = ["CPC", "CPL", "CPS", "EPC", "ROI%"]
+
+Rows = Union[pd.DataFrame, Iterable[Dict]]
+Instant = Union[datetime, pd.Timestamp, None]
+
+
+def snapshot_frame(rows: Rows) -> pd.DataFrame:
+    """Coerce snapshot rows into the store's column order and dtypes. Missing timestamps become now (UTC)."""
+    df = rows if isinstance(rows, pd.DataFrame) else pd.DataFrame(list(rows))
+    df = df.reindex(columns=SNAPSHOT_COLUMNS)
+    if df["Timestamp"].isna().any():
+        df["Timestamp"] = df["Timestamp"].fillna(datetime.now(timezone.utc))
+    df["Timestamp"] = pd.to_datetime(df["Timestamp"], utc=True)
+    for col in KEY_COLUMNS:
+        df[col] = df[col].fillna("").astype(str)
+    for col in COUNT_COLUMNS:
+        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype("int64")
+    for col in MONEY_COLUMNS:
+        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0.0).astype("float64")
+    return df.reset_index(drop=True)
+
+
+def _utc(ts: Instant) -> pd.Timestamp:
+    ts = pd.Timestamp(ts)
+    return ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+
+
+def _ratio(num, den) -> np.ndarray:
+    num = np.asarray(num, dtype="float64")
+    den = np.asarray(den, dtype="float64")
+    out = np.zeros_like(num)
+    np.divide(num, den, out=out, where=den > 0)
+    return out
+
+
+def add_kpis(df: pd.DataFrame) -> pd.DataFrame:
+    """Return a copy of ``df`` with CPC, CPL, CPS, EPC and ROI% columns (0 where undefined)."""
+    out = df.copy()
+    out["CPC"] = _ratio(df["Spend"], df["Clicks"]).round(4)
+    out["CPL"] = _ratio(df["Spend"], df["Leads"]).round(4)
+    out["CPS"] = _ratio(df["Spend"], df["Sales"]).round(4)
+    out["EPC"] = _ratio(df["Revenue"], df["Clicks"]).round(4)
+    out["ROI%"] = (_ratio(df["Revenue"] - df["Spend"], df["Spend"]) * 100).round(2)
+    return out
+
+
+def rollup_batch(df: pd.DataFrame, by: Sequence[str] = KEY_COLUMNS) -> pd.DataFrame:
+    """Summed metrics plus a snapshot count for each ``by`` group of one batch."""
+    grouped = df.groupby(list(by), sort=False, observed=True)
+    totals = grouped[METRIC_COLUMNS].sum()
+    totals["Snapshots"] = grouped.size()
+    return totals
+
+
+GRAINS = ("day", "week", "month")
+
+
+def bucket_start(ts: pd.Series, grain: str) -> pd.Series:
+    """Start of the UTC day, Monday-based week or month containing each timestamp."""
+    day = ts.dt.floor("D")
+    if grain == "day":
+        return day
+    if grain == "week":
+        return day - pd.to_timedelta(day.dt.weekday, unit="D")
+    if grain == "month":
+        return day - pd.to_timedelta(day.dt.day - 1, unit="D")
+    raise ValueError(f"Unknown grain: {grain}")
+
+
+def bucket_rollup(df: pd.DataFrame, grain: str) -> pd.DataFrame:
+    """Summed metrics per (Bucket, Campaign, Channel) for one batch."""
+    return rollup_batch(df.assign(Bucket=bucket_start(df["Timestamp"], grain)), ["Bucket"] + KEY_COLUMNS)
+
+
+def downsample(trend: pd.DataFrame, max_points: int) -> pd.DataFrame:
+    """
+    Merge runs of consecutive buckets so a series has at most ``max_points`` rows.
+    Metrics are sums, so merged totals stay exact and KPIs are re-derived from them.
+    """
+    if len(trend) <= max_points:
+        return trend
+    step = -(-len(trend) // max_points)
+    groups = np.arange(len(trend)) // step
+    merged = trend.groupby(groups).agg({"Bucket": "first", **{c: "sum" for c in METRIC_COLUMNS + ["Snapshots"]}})
+    return add_kpis(merged.reset_index(drop=True))
+
+
+class CampaignStore:
+    """
+    In-memory campaign snapshots. Appends are buffered and concatenated on the next
+    read; rollups and time buckets that have been asked for once are kept and
+    folded forward with each new batch.
+    """
+
+    def __init__(self):
+        self._frame = snapshot_frame([])
+        self._pending: List[pd.DataFrame] = []
+        self._rollups: Dict[Tuple[str, ...], pd.DataFrame] = {}
+        self._buckets: Dict[str, pd.DataFrame] = {}
+
+    def __len__(self) -> int:
+        return len(self._frame) + sum(len(p) for p in self._pending)
+
+    def append(self, rows: Rows) -> int:
+        batch = snapshot_frame(rows)
+        if batch.empty:
+            return 0
+        self._pending.append(batch)
+        for by, totals in self._rollups.items():
+            self._rollups[by] = totals.add(rollup_batch(batch, by), fill_value=0)
+        for grain, totals in self._buckets.items():
+            self._buckets[grain] = totals.add(bucket_rollup(batch, grain), fill_value=0)
+        return len(batch)
+
+    def frame(self, with_kpis: bool = True) -> pd.DataFrame:
+        if self._pending:
+            self._frame = pd.concat([self._frame, *self._pending], ignore_index=True)
+            self._pending = []
+        return add_kpis(self._frame) if with_kpis else self._frame
+
+    def _filtered(self, campaign=None, channel=None, start: Instant = None, end: Instant = None) -> pd.DataFrame:
+        df = self.frame(with_kpis=False)
+        mask = np.ones(len(df), dtype=bool)
+        if campaign:
+            mask &= (df["Campaign"] == campaign).to_numpy()
+        if channel:
+            mask &= (df["Channel"] == channel).to_numpy()
+        if start:
+            mask &= (df["Timestamp"] >= _utc(start)).to_numpy()
+        if end:
+            mask &= (df["Timestamp"] < _utc(end)).to_numpy()
+        return df[mask]
+
+    def count(self, **filters) -> int:
+        return len(self._filtered(**filters)) if any(filters.values()) else len(self)
+
+    def page(self, offset: int = 0, limit: int = 100, **filters) -> pd.DataFrame:
+        """Newest-first slice of the snapshots matching ``filters``, with KPIs."""
+        # Same order as the SQLite store (ts DESC, id DESC): reversing first makes the
+        # stable sort break timestamp ties newest-inserted first.
+        df = self._filtered(**filters).iloc[::-1].sort_values("Timestamp", ascending=False, kind="stable")
+        return add_kpis(df.iloc[offset: offset + limit].reset_index(drop=True))
+
+    def options(self, column: str) -> List[str]:
+        return sorted(self.rollup()[column].unique())
+
+    def rollup(self, by: Optional[Sequence[str]] = None, **filters) -> pd.DataFrame:
+        if any(filters.values()):
+            df = self._filtered(**filters)
+            return add_kpis(rollup_batch(df, by or KEY_COLUMNS).reset_index())
+        by = tuple(by or KEY_COLUMNS)
+        if by not in self._rollups:
+            self._rollups[by] = rollup_batch(self.frame(with_kpis=False), by)
+        totals = self._rollups[by]
+        for col in COUNT_COLUMNS + ["Snapshots"]:
+            totals[col] = totals[col].astype("int64")
+        return add_kpis(totals.reset_index())
+
+    def trend(self, grain: str = "day", campaign=None, channel=None, start: Instant = None, end: Instant = None) -> pd.DataFrame:
+        """Totals and KPIs per time bucket, for buckets starting in [start, end)."""
+        if grain not in self._buckets:
+            self._buckets[grain] = bucket_rollup(self.frame(with_kpis=False), grain)
+        df = self._buckets[grain].reset_index()
+        mask = np.ones(len(df), dtype=bool)
+        if campaign:
+            mask &= (df["Campaign"] == campaign).to_numpy()
+        if channel:
+            mask &= (df["Channel"] == channel).to_numpy()
+        if start:
+            mask &= (df["Bucket"] >= _utc(start)).to_numpy()
+        if end:
+            mask &= (df["Bucket"] < _utc(end)).to_numpy()
+        totals = df[mask].groupby("Bucket")[METRIC_COLUMNS + ["Snapshots"]].sum()
+        for col in COUNT_COLUMNS + ["Snapshots"]:
+            totals[col] = totals[col].astype("int64")
+        return add_kpis(totals.reset_index())
+
+
+# Header names seen in network exports, by store column (compared lowercased, spaces/underscores folded).
+COLUMN_SYNONYMS: Dict[str, Tuple[str, ...]] = {
+    "Timestamp": ("timestamp", "date", "day", "datetime", "time", "period"),
+    "Campaign": ("campaign", "campaignname", "campaignid", "offer", "offername", "adset"),
+    "Channel": ("channel", "source", "trafficsource", "network", "platform"),
+    "Spend": ("spend", "cost", "adspend", "amountspent", "totalcost"),
+    "Clicks": ("clicks", "uniqueclicks", "hops", "visits"),
+    "Leads": ("leads", "optins", "signups", "registrations", "subscribers"),
+    "Sales": ("sales", "orders", "conversions", "actions", "purchases"),
+    "Revenue": ("revenue", "payout", "earnings", "commission", "income", "grossrevenue"),
+}
+
+
+def _fold(name: str) -> str:
+    return "".join(ch for ch in str(name).lower() if ch.isalnum())
+
+
+def guess_column_mapping(headers: Sequence[str]) -> Dict[str, Optional[str]]:
+    """Best-effort store column -> CSV header mapping from common export header names."""
+    folded = {_fold(h): h for h in headers}
+    mapping: Dict[str, Optional[str]] = {}
+    for target, synonyms in COLUMN_SYNONYMS.items():
+        mapping[target] = next((folded[s] for s in synonyms if s in folded), None)
+    return mapping
+
+
+def csv_headers(f: IO) -> List[str]:
+    """Header row of an open CSV; the stream is rewound afterwards."""
+    headers = list(pd.read_csv(f, nrows=0).columns)
+    f.seek(0)
+    return headers
+
+
+def _clean_numbers(series: pd.Series) -> pd.Series:
+    if not pd.api.types.is_numeric_dtype(series):
+        # "$1,234.50" style strings from spreadsheet exports.
+        series = series.str.replace(r"[$€£,\s]", "", regex=True)
+    return pd.to_numeric(series, errors="coerce")
+
+
+class ImportResult:
+    def __init__(self):
+        self.rows = 0
+        self.skipped = 0
+        self.chunks = 0
+        self.totals: Optional[pd.DataFrame] = None
+
+    def add(self, chunk: pd.DataFrame, skipped: int):
+        self.rows += len(chunk)
+        self.skipped += skipped
+        self.chunks += 1
+        batch = rollup_batch(chunk)
+        self.totals = batch if self.totals is None else self.totals.add(batch, fill_value=0)
+
+    def summary(self) -> pd.DataFrame:
+        """Totals and KPIs of the imported rows per campaign and channel."""
+        if self.totals is None:
+            return add_kpis(rollup_batch(snapshot_frame([])).reset_index())
+        totals = self.totals.copy()
+        for col in COUNT_COLUMNS + ["Snapshots"]:
+            totals[col] = totals[col].astype("int64")
+        return add_kpis(totals.reset_index())
+
+
+def import_csv(
+    f: Union[str, IO],
+    store,
+    mapping: Dict[str, Optional[str]],
+    defaults: Optional[Dict[str, str]] = None,
+    chunksize: int = 50_000,
+    progress: Optional[Callable[[ImportResult], None]] = None,
+) -> ImportResult:
+    """
+    Stream a CSV into ``store`` one chunk at a time. ``mapping`` maps store columns to
+    CSV headers; unmapped Campaign/Channel take ``defaults`` and unmapped metrics are 0.
+    Rows whose mapped timestamp can't be parsed are skipped. Only the mapped columns are
+    read, and no more than one chunk is held in memory.
+    """
+    defaults = defaults or {}
+    used = {target: source for target, source in mapping.items() if source}
+    result = ImportResult()
+    # Let the C parser type numeric columns; only text that needs cleaning goes through _clean_numbers.
+    text_columns = {used[t]: str for t in ("Timestamp", *KEY_COLUMNS) if t in used}
+    reader = pd.read_csv(
+        f, usecols=list(set(used.values())), chunksize=chunksize, dtype=text_columns, skipinitialspace=True
+    )
+    for raw in reader:
+        chunk = pd.DataFrame(index=raw.index)
+        for target in SNAPSHOT_COLUMNS:
+            source = used.get(target)
+            if source is None:
+                if target in KEY_COLUMNS:
+                    chunk[target] = defaults.get(target, "")
+                continue
+            col = raw[source]
+            if target == "Timestamp":
+                chunk[target] = pd.to_datetime(col, utc=True, errors="coerce")
+            elif target in KEY_COLUMNS:
+                chunk[target] = col.fillna(defaults.get(target, "")).str.strip()
+            else:
+                chunk[target] = _clean_numbers(col)
+        skipped = 0
+        if "Timestamp" in used:
+            valid = chunk["Timestamp"].notna()
+            skipped = int((~valid).sum())
+            chunk = chunk[valid]
+        chunk = snapshot_frame(chunk)
+        store.append(chunk)
+        result.add(chunk, skipped)
+        if progress:
+            progress(result)
+    return result
+
+
+# Display column -> database column.
+DB_COLUMNS = {
+    "Timestamp": "ts",
+    "Campaign": "campaign",
+    "Channel": "channel",
+    "Spend": "spend",
+    "Clicks": "clicks",
+    "Leads": "leads",
+    "Sales": "sales",
+    "Revenue": "revenue",
+}
+_TOTAL_COLUMNS = [DB_COLUMNS[c] for c in METRIC_COLUMNS] + ["snapshots"]
+_EPOCH = pd.Timestamp(0, tz="UTC")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    ts INTEGER NOT NULL,
+    campaign TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    spend REAL NOT NULL DEFAULT 0,
+    clicks INTEGER NOT NULL DEFAULT 0,
+    leads INTEGER NOT NULL DEFAULT 0,
+    sales INTEGER NOT NULL DEFAULT 0,
+    revenue REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS snapshots_ts ON snapshots (ts);
+CREATE INDEX IF NOT EXISTS snapshots_campaign_ts ON snapshots (campaign, ts);
+CREATE INDEX IF NOT EXISTS snapshots_channel_ts ON snapshots (channel, ts);
+CREATE TABLE IF NOT EXISTS campaign_totals (
+    campaign TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    spend REAL NOT NULL,
+    clicks INTEGER NOT NULL,
+    leads INTEGER NOT NULL,
+    sales INTEGER NOT NULL,
+    revenue REAL NOT NULL,
+    snapshots INTEGER NOT NULL,
+    PRIMARY KEY (campaign, channel)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS bucket_totals (
+    grain TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    campaign TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    spend REAL NOT NULL,
+    clicks INTEGER NOT NULL,
+    leads INTEGER NOT NULL,
+    sales INTEGER NOT NULL,
+    revenue REAL NOT NULL,
+    snapshots INTEGER NOT NULL,
+    PRIMARY KEY (grain, bucket, campaign, channel)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS bucket_totals_campaign ON bucket_totals (grain, campaign, bucket);
+CREATE INDEX IF NOT EXISTS bucket_totals_channel ON bucket_totals (grain, channel, bucket);
+"""
+
+
+def _epoch_ms(ts: Instant) -> int:
+    return int((_utc(ts) - _EPOCH) // pd.Timedelta(milliseconds=1))
+
+
+def _is_midnight(ts: Instant) -> bool:
+    return not ts or _utc(ts) == _utc(ts).floor("D")
+
+
+def _where(
+    campaign=None, channel=None, start: Instant = None, end: Instant = None, ts_column: str = "ts", grain=None
+) -> Tuple[str, List]:
+    clauses, params = [], []
+    if grain:
+        clauses.append("grain = ?")
+        params.append(grain)
+    if campaign:
+        clauses.append("campaign = ?")
+        params.append(campaign)
+    if channel:
+        clauses.append("channel = ?")
+        params.append(channel)
+    if start:
+        clauses.append(f"{ts_column} >= ?")
+        params.append(_epoch_ms(start))
+    if end:
+        clauses.append(f"{ts_column} < ?")
+        params.append(_epoch_ms(end))
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+def _from_db(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.rename(columns={v: k for k, v in DB_COLUMNS.items()})
+    df = df.rename(columns={"snapshots": "Snapshots", "bucket": "Bucket"})
+    for col in ("Timestamp", "Bucket"):
+        if col in df:
+            df[col] = pd.to_datetime(df[col], unit="ms", utc=True)
+    return df
+
+
+def _records(df: pd.DataFrame, columns: Sequence[str]) -> List[tuple]:
+    values = []
+    for col in columns:
+        if pd.api.types.is_datetime64_any_dtype(df[col]):
+            values.append(((df[col] - _EPOCH) // pd.Timedelta(milliseconds=1)).tolist())
+        else:
+            values.append(df[col].tolist())
+    return list(zip(*values))
+
+
+def _upsert_sql(table: str, keys: Sequence[str]) -> str:
+    columns = list(keys) + _TOTAL_COLUMNS
+    return (
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+        f"ON CONFLICT ({', '.join(keys)}) DO UPDATE SET "
+        + ", ".join(f"{c} = {c} + excluded.{c}" for c in _TOTAL_COLUMNS)
+    )
+
+
+class SQLiteCampaignStore:
+    """
+    Campaign snapshots in a local SQLite database (WAL mode) with indexes on
+    timestamp, campaign and channel. Each append is one transaction that also
+    folds the batch's group sums into ``campaign_totals`` and the day/week/month
+    ``bucket_totals``, so totals and trends read small pre-aggregated tables.
+    Connections are per thread; writers are serialized.
+    """
+
+    def __init__(self, path: str, batch_size: int = 5000):
+        self.path = path
+        self.batch_size = batch_size
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        had_buckets = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'bucket_totals'"
+        ).fetchone()
+        conn.executescript(SCHEMA)
+        if not had_buckets:
+            self._backfill_buckets()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            self._local.conn = conn
+        return conn
+
+    def _upsert_totals(self, conn: sqlite3.Connection, batch: pd.DataFrame):
+        totals = rollup_batch(batch).reset_index()
+        conn.executemany(
+            _upsert_sql("campaign_totals", ["campaign", "channel"]),
+            _records(totals, KEY_COLUMNS + METRIC_COLUMNS + ["Snapshots"]),
+        )
+
+    def _upsert_buckets(self, conn: sqlite3.Connection, batch: pd.DataFrame):
+        sql = _upsert_sql("bucket_totals", ["grain", "bucket", "campaign", "channel"])
+        for grain in GRAINS:
+            buckets = bucket_rollup(batch, grain).reset_index()
+            rows = _records(buckets, ["Bucket"] + KEY_COLUMNS + METRIC_COLUMNS + ["Snapshots"])
+            conn.executemany(sql, [(grain,) + row for row in rows])
+
+    def _backfill_buckets(self, chunksize: int = 200_000):
+        """Build bucket_totals for a database written before it existed."""
+        conn = self._conn()
+        sql = f"SELECT {', '.join(DB_COLUMNS.values())} FROM snapshots"
+        with self._write_lock, conn:
+            for chunk in pd.read_sql_query(sql, conn, chunksize=chunksize):
+                self._upsert_buckets(conn, snapshot_frame(_from_db(chunk)))
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def append(self, rows: Rows) -> int:
+        batch = snapshot_frame(rows)
+        if batch.empty:
+            return 0
+        records = _records(batch, SNAPSHOT_COLUMNS)
+        columns = ", ".join(DB_COLUMNS.values())
+        insert = f"INSERT INTO snapshots ({columns}) VALUES ({', '.join('?' * len(DB_COLUMNS))})"
+        conn = self._conn()
+        with self._write_lock, conn:
+            for i in range(0, len(records), self.batch_size):
+                conn.executemany(insert, records[i: i + self.batch_size])
+            self._upsert_totals(conn, batch)
+            self._upsert_buckets(conn, batch)
+        return len(records)
+
+    def _totals_source(self, filters: Dict) -> Optional[Tuple[str, str, List]]:
+        """The pre-aggregated table that answers ``filters`` exactly, or None to scan snapshots."""
+        start, end = filters.get("start"), filters.get("end")
+        if not start and not end:
+            where, params = _where(filters.get("campaign"), filters.get("channel"))
+            return "campaign_totals", where, params
+        if _is_midnight(start) and _is_midnight(end):
+            where, params = _where(**filters, ts_column="bucket", grain="day")
+            return "bucket_totals", where, params
+        return None
+
+    def count(self, **filters) -> int:
+        source = self._totals_source(filters)
+        if source is not None:
+            table, where, params = source
+            sql = f"SELECT COALESCE(SUM(snapshots), 0) FROM {table}{where}"
+        else:
+            where, params = _where(**filters)
+            sql = f"SELECT COUNT(*) FROM snapshots{where}"
+        return int(self._conn().execute(sql, params).fetchone()[0])
+
+    def page(self, offset: int = 0, limit: int = 100, **filters) -> pd.DataFrame:
+        """Newest-first slice of the snapshots matching ``filters``, with KPIs."""
+        where, params = _where(**filters)
+        sql = (
+            f"SELECT {', '.join(DB_COLUMNS.values())} FROM snapshots{where} "
+            "ORDER BY ts DESC, id DESC LIMIT ? OFFSET ?"
+        )
+        df = pd.read_sql_query(sql, self._conn(), params=params + [limit, offset])
+        return add_kpis(snapshot_frame(_from_db(df)))
+
+    def options(self, column: str) -> List[str]:
+        col = DB_COLUMNS[column]
+        rows = self._conn().execute(f"SELECT DISTINCT {col} FROM campaign_totals ORDER BY {col}").fetchall()
+        return [r[0] for r in rows]
+
+    def _frame(self, sql: str, params: List) -> pd.DataFrame:
+        df = _from_db(pd.read_sql_query(sql, self._conn(), params=params))
+        for col in COUNT_COLUMNS + ["Snapshots"]:
+            df[col] = df[col].fillna(0).astype("int64")
+        return add_kpis(df)
+
+    def rollup(self, by: Optional[Sequence[str]] = None, **filters) -> pd.DataFrame:
+        """Totals and KPIs per campaign and channel, from pre-aggregated tables whenever they cover ``filters``."""
+        keys = ", ".join(DB_COLUMNS[c] for c in (by or KEY_COLUMNS))
+        source = self._totals_source(filters)
+        if source is not None:
+            table, where, params = source
+            sums = ", ".join(f"SUM({c}) AS {c}" for c in _TOTAL_COLUMNS)
+        else:
+            table = "snapshots"
+            where, params = _where(**filters)
+            sums = ", ".join(f"SUM({DB_COLUMNS[c]}) AS {DB_COLUMNS[c]}" for c in METRIC_COLUMNS)
+            sums += ", COUNT(*) AS snapshots"
+        return self._frame(f"SELECT {keys}, {sums} FROM {table}{where} GROUP BY {keys} ORDER BY {keys}", params)
+
+    def trend(self, grain: str = "day", **filters) -> pd.DataFrame:
+        """Totals and KPIs per time bucket, for buckets starting in [start, end)."""
+        if grain not in GRAINS:
+            raise ValueError(f"Unknown grain: {grain}")
+        where, params = _where(**filters, ts_column="bucket", grain=grain)
+        sums = ", ".join(f"SUM({c}) AS {c}" for c in _TOTAL_COLUMNS)
+        return self._frame(f"SELECT bucket, {sums} FROM bucket_totals{where} GROUP BY bucket ORDER BY bucket", params)
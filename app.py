@@ -1,10 +1,42 @@
 import streamlit as st
+import altair as alt
+import numpy as np
+import pandas as pd
 import textwrap
 import re
-from typing import List, Tuple, Dict
+import bisect
+import codecs
+import csv
+import gzip
+import random
+import hashlib
+import heapq
+import io
+import os
+import json
+import pickle
+import sqlite3
+import string
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+import cProfile
+import pstats
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, List, Tuple, Dict, Iterator, Optional, Deque
 
 import streamlit.components.v1 as components  # not strictly needed, but safe if later used
 
+import ab_stream
+import ab_testing
+import analytics_store
+import event_bus
+import geo_bulk
+import postback_receiver
+import webhook_outbox
+
 # Optional HTTP for Zapier test hook
 try:
     import requests  # type: ignore
@@ -32,6 +64,18 @@ try:
 except ImportError:
     cohere = None
 
+# Optional sampling profiler for the admin performance panel (cProfile is the fallback)
+try:
+    from pyinstrument import Profiler  # type: ignore
+except ImportError:
+    Profiler = None
+
+# Optional PDF manual builder (needs reportlab)
+try:
+    import generate_illuminati_ai_package as package_builder
+except ImportError:
+    package_builder = None
+
 
 # =========================
 # Page config & base styles
@@ -217,28 +261,202 @@ section[data-testid="stSidebar"] [data-testid="stVideo"] {
 }
 </style>
 """
-st.markdown(APP_CSS, unsafe_allow_html=True)
+
+
+@st.cache_data(show_spinner=False)
+def minify_css(css: str) -> str:
+    # Streamlit drops any element a rerun doesn't re-emit, so the style block has to go out
+    # every run; strip comments and whitespace once so each rerun ships the smallest payload.
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    return re.sub(r"\s*([{}:;,>])\s*", r"\1", css).strip()
+
+
+st.markdown(minify_css(APP_CSS), unsafe_allow_html=True)
 
 
 # =========================
 # Copywriting knowledge
 # =========================
 
-MASTER_FLAVORS: Dict[str, str] = {
-    "Gary Halbert": "raw, emotional, street-smart letter that pokes at greed, fear, curiosity, and desire",
-    "David Ogilvy": "research-driven, benefit-heavy copy with strong proof and specifics",
-    "Dan Kennedy": "no-BS, direct-response copy with clear promises, deadlines, and risk reversal",
-    "Claude Hopkins": "scientific advertising with specific, testable claims and strong self-interest",
-    "Joe Sugarman": "slippery-slide, curiosity-driven narrative with sensory detail",
-    "Eugene Schwartz": "deeply desire-focused copy tuned to the market’s level of awareness",
-    "John Carlton": "punchy, conversational, 'killer hook' copy with urgency and attitude",
-    "Jay Abraham": "preeminence-based, value-stacking copy that makes your offer a no-brainer",
-    "Robert Bly": "classic direct-response with 4U headlines and long-form structure",
-    "Neville Medhora": "short, simple, scannable copy with humor and directness",
-    "Joanna Wiebe": "voice-of-customer heavy copy that sounds like the reader and feels tested",
-    "Hybrid Mix": "a blended style drawing from all the masters above",
+# Master styles live in style_packs/*.json (one pack per file). Missing slots fall
+# back to DEFAULT_STYLE_PACK; templated slots may use the listed brief fields
+# ({aud_cap} upper-cases only the first letter, {aud_sentence} is str.capitalize()).
+
+STYLE_PACK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "style_packs")
+
+STYLE_SLOTS: Dict[str, Tuple[str, ...]] = {
+    "flavor": (),
+    "intro": (),
+    "classified_hook": ("product_name", "niche", "aud_short", "aud_cap", "aud_sentence"),
+    "vsl_hook": ("product_name", "niche", "aud_short", "aud_cap", "aud_sentence"),
+}
+
+DEFAULT_STYLE_PACK: Dict[str, str] = {
+    "name": "Default",
+    "flavor": "direct-response style tuned for conversions",
+    "intro": "Here’s the real story no one else is telling you.",
+    "classified_hook": "{product_name} For {niche}: Limited Spots.",
+    "vsl_hook": "Let’s cut through the noise and talk about what actually matters.",
 }
 
+
+def compile_style_pack(raw: Dict) -> Dict:
+    if not isinstance(raw, dict):
+        raise ValueError("Style pack must be a JSON object.")
+    name = str(raw.get("name", "")).strip()
+    if not name:
+        raise ValueError("Style pack is missing a 'name'.")
+    try:
+        order = int(raw.get("order", 1000))
+    except (TypeError, ValueError):
+        raise ValueError(f"Style pack '{name}': 'order' must be a number.") from None
+    pack: Dict = {"name": name, "order": order}
+    for slot, allowed in STYLE_SLOTS.items():
+        template = str(raw.get(slot) or DEFAULT_STYLE_PACK[slot])
+        # Validate placeholders now so a bad pack fails on load, not mid-render.
+        for _, field, _, _ in string.Formatter().parse(template):
+            if field is not None and field not in allowed:
+                raise ValueError(f"Style pack '{name}': unknown field {{{field}}} in '{slot}'.")
+        pack[slot] = template
+    return pack
+
+
+class StylePackRegistry:
+    """
+    Name → compiled style pack, loaded lazily from ``pack_dir``.
+
+    Startup reads one cached index (rebuilt only when a pack file changes); each
+    pack is compiled on first lookup and its compiled form is pickled next to the
+    index, so later processes skip JSON parsing and validation entirely. Checking
+    the index still costs one stat() per pack file, so in-place edits are caught;
+    the registry is shared by every session, so loading and adding hold a lock.
+    """
+
+    def __init__(self, pack_dir: str):
+        self.pack_dir = pack_dir
+        self.cache_dir = os.path.join(pack_dir, ".cache")
+        self._default = compile_style_pack(DEFAULT_STYLE_PACK)
+        self._compiled: Dict[str, Dict] = {}
+        self._index: Optional[Dict[str, str]] = None
+        self._names: List[str] = []
+        self._lock = threading.RLock()
+
+    def _read_cache(self, name: str, signature: Tuple):
+        # Each source has one cache file holding (signature, value); a changed
+        # signature simply means the entry is stale and gets overwritten.
+        try:
+            with open(os.path.join(self.cache_dir, name + ".pickle"), "rb") as f:
+                cached_sig, value = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError):
+            return None
+        return value if cached_sig == signature else None
+
+    def _write_cache(self, name: str, signature: Tuple, value) -> None:
+        path = os.path.join(self.cache_dir, name + ".pickle")
+        try:
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                pickle.dump((signature, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except OSError:
+            pass  # read-only deploys just skip the cache
+
+    def _load_index(self) -> Dict[str, str]:
+        if self._index is not None:
+            return self._index
+        with self._lock:
+            if self._index is None:
+                self._build_index()
+        return self._index
+
+    def _build_index(self) -> None:
+        # Keyed on every pack file's (name, mtime, size), so edits made in place are
+        # picked up too, not only files being added or removed.
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            files = sorted(
+                (entry.name, entry.path, entry.stat())
+                for entry in os.scandir(self.pack_dir)
+                if entry.name.endswith(".json") and entry.is_file()
+            )
+        except OSError:
+            files = []
+        signature: Tuple = tuple((name, st_.st_mtime_ns, st_.st_size) for name, _, st_ in files)
+        cached = self._read_cache("_index", signature)
+        if cached is None:
+            entries = []
+            for _, path, _ in files:
+                pack = self._compile_file(path)
+                entries.append((pack["order"], pack["name"], path))
+            entries.sort()
+            cached = [(name, path) for _, name, path in entries]
+            self._write_cache("_index", signature, cached)
+        self._names = [name for name, _ in cached]
+        self._index = dict(cached)
+
+    def _compile_file(self, path: str) -> Dict:
+        st_ = os.stat(path)
+        signature = (st_.st_mtime_ns, st_.st_size)
+        cache_name = os.path.basename(path)
+        pack = self._read_cache(cache_name, signature)
+        if pack is None:
+            with open(path, encoding="utf-8") as f:
+                pack = compile_style_pack(json.load(f))
+            self._write_cache(cache_name, signature, pack)
+        self._compiled[pack["name"]] = pack
+        return pack
+
+    def names(self) -> List[str]:
+        self._load_index()
+        with self._lock:
+            return list(self._names)
+
+    def get(self, name: str) -> Dict:
+        pack = self._compiled.get(name)
+        if pack is not None:
+            return pack
+        path = self._load_index().get(name)
+        if path is None:
+            return self._default
+        with self._lock:
+            return self._compile_file(path)
+
+    def add(self, raw: Dict, persist: bool = False) -> Dict:
+        pack = compile_style_pack(raw)
+        with self._lock:
+            index = self._load_index()
+            if persist:
+                slug = re.sub(r"[^a-z0-9]+", "_", pack["name"].lower()).strip("_") or "style"
+                path = index.get(pack["name"]) or os.path.join(self.pack_dir, f"{slug}.json")
+                with open(path, "w", encoding="utf-8") as f:
+                    json.dump(raw, f, ensure_ascii=False, indent=2)
+                for old in [n for n, p in index.items() if p == path and n != pack["name"]]:
+                    # The rewritten file no longer holds the pack under its old name.
+                    del index[old]
+                    self._compiled.pop(old, None)
+                    if old in self._names:
+                        self._names.remove(old)
+                index[pack["name"]] = path
+            if pack["name"] not in self._compiled and pack["name"] not in self._names:
+                self._names.append(pack["name"])
+            self._compiled[pack["name"]] = pack
+            return pack
+
+
+@st.cache_resource(show_spinner=False)
+def get_style_registry() -> StylePackRegistry:
+    return StylePackRegistry(STYLE_PACK_DIR)
+
+
+def style_names() -> List[str]:
+    return get_style_registry().names()
+
+
+def style_pack(master_style: str) -> Dict:
+    return get_style_registry().get(master_style)
+
+
 AWARENESS_ANGLE: Dict[str, str] = {
     "Unaware": "start by dramatizing a problem they’re feeling but haven’t named yet, then reveal the real cause and finally your solution",
     "Problem-aware": "agitate the pain they already recognize, then introduce your new mechanism as the missing key",
@@ -247,6 +465,8 @@ AWARENESS_ANGLE: Dict[str, str] = {
     "Most-aware": "focus on offer mechanics, bonuses, scarcity, and a very clear reason to pull the trigger today",
 }
 
+AWARENESS_LEVELS: List[str] = list(AWARENESS_ANGLE.keys())
+
 NICHE_DEFAULTS: Dict[str, Dict[str, List[str]]] = {
     "Natural / Alternative Healing": {
         "audience": ["a busy parent who wants natural ways to feel better without pills"],
@@ -372,6 +592,111 @@ def login_page():
     render_footer()
 
 
+# =========================
+# Performance instrumentation
+# =========================
+
+PERF_WINDOW = 500  # samples kept per block for rolling percentiles
+
+
+class PerfStore:
+    """Process-wide rolling timings per block, shared by every session on this server."""
+
+    def __init__(self, window: int = PERF_WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples: Dict[str, Deque[float]] = {}
+        self._counts: Dict[str, int] = {}
+
+    def record(self, block: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.get(block)
+            if samples is None:
+                samples = self._samples[block] = deque(maxlen=self.window)
+            samples.append(seconds)
+            self._counts[block] = self._counts.get(block, 0) + 1
+
+    def summary(self) -> List[Dict]:
+        with self._lock:
+            snapshot = {block: sorted(vals) for block, vals in self._samples.items()}
+            counts = dict(self._counts)
+        rows = []
+        for block, vals in snapshot.items():
+            rows.append(
+                {
+                    "Block": block,
+                    "Runs": counts[block],
+                    "p50 ms": round(_percentile(vals, 0.50) * 1000, 1),
+                    "p90 ms": round(_percentile(vals, 0.90) * 1000, 1),
+                    "p99 ms": round(_percentile(vals, 0.99) * 1000, 1),
+                    "Max ms": round(vals[-1] * 1000, 1),
+                }
+            )
+        rows.sort(key=lambda r: r["p90 ms"], reverse=True)
+        return rows
+
+    def reset(self) -> None:
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+
+
+def _percentile(sorted_vals: List[float], q: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    return sorted_vals[min(int(q * len(sorted_vals)), len(sorted_vals) - 1)]
+
+
+@st.cache_resource(show_spinner=False)
+def get_perf_store() -> PerfStore:
+    return PerfStore()
+
+
+# Per-run stack of child-time accumulators; the script namespace is fresh on every
+# rerun, so this never leaks between sessions.
+_TIMER_STACK: List[List[float]] = []
+
+
+@contextmanager
+def timed(block: str, exclusive_as: Optional[str] = None):
+    """Record wall time for ``block``; ``exclusive_as`` also records the time not spent in nested blocks."""
+    _TIMER_STACK.append([0.0])
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        children = _TIMER_STACK.pop()[0]
+        if _TIMER_STACK:
+            _TIMER_STACK[-1][0] += elapsed
+        store = get_perf_store()
+        store.record(block, elapsed)
+        if exclusive_as:
+            store.record(exclusive_as, elapsed - children)
+
+
+def run_profiled(fn: Callable[[], None], engine: str) -> str:
+    """Run ``fn`` once under pyinstrument or cProfile and return the report text."""
+    if engine == "pyinstrument" and Profiler is not None:
+        profiler = Profiler()
+        profiler.start()
+        try:
+            fn()
+        finally:
+            profiler.stop()
+        return profiler.output_text(unicode=True, color=False)
+
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        fn()
+    finally:
+        profile.disable()
+    out = io.StringIO()
+    pstats.Stats(profile, stream=out).sort_stats("cumulative").print_stats(40)
+    return out.getvalue()
+
+
 # =========================
 # Utility & scoring helpers
 # =========================
@@ -400,11 +725,33 @@ def choose_niche_defaults(niche: str) -> Tuple[str, List[str]]:
     return data["audience"][0], data["benefits"]
 
 
-def send_zapier_webhook(url: str, payload: Dict) -> Tuple[bool, str]:
+@st.cache_resource(show_spinner=False)
+def get_webhook_dispatcher() -> Optional[webhook_outbox.Dispatcher]:
+    """Process-wide outbox + delivery thread; None without requests or a writable outbox database."""
+    if requests is None:
+        return None
+    path = os.environ.get("ILLUMINATI_OUTBOX_DB") or os.path.join(DATA_DIR, "outbox.db")
+    try:
+        dispatcher = webhook_outbox.Dispatcher(webhook_outbox.Outbox(path))
+    except (sqlite3.Error, OSError):
+        return None
+    dispatcher.start()
+    return dispatcher
+
+
+def send_zapier_webhook(url: str, payload: Dict, fmt: str = "single") -> Tuple[bool, str]:
+    """Queue ``payload`` for background delivery; blocks only when the outbox is unavailable."""
     if not url:
         return False, "No Zapier URL provided."
     if requests is None:
         return False, "The 'requests' library is not available."
+    dispatcher = get_webhook_dispatcher()
+    if dispatcher is not None:
+        dispatcher.outbox.put(url, payload, fmt)
+        dispatcher.wake()
+        if not dispatcher.is_alive():
+            return False, "Webhook queued, but the delivery thread has stopped. Restart the app to deliver it."
+        return True, "Webhook queued for delivery."
     try:
         resp = requests.post(url, json=payload, timeout=10)
         return True, f"Webhook sent. HTTP {resp.status_code}"
@@ -412,6 +759,113 @@ def send_zapier_webhook(url: str, payload: Dict) -> Tuple[bool, str]:
         return False, f"Error sending webhook: {e}"
 
 
+EVENT_SINKS = ["Zapier", "Local file"]
+
+
+def event_log_path() -> str:
+    return os.environ.get("ILLUMINATI_EVENT_LOG") or os.path.join(DATA_DIR, "events.jsonl")
+
+
+@st.cache_resource(show_spinner=False)
+def get_event_bus() -> event_bus.EventBus:
+    bus = event_bus.EventBus(get_webhook_dispatcher())
+    bus.start()
+    return bus
+
+
+def emit_event(kind: str, data) -> None:
+    """Send a structured event to this session's chosen sinks without waiting on them."""
+    sinks = st.session_state.get("event_sinks") or []
+    if not sinks:
+        return
+    url = st.session_state.get("zapier_url")
+    zapier = (url, st.session_state.get("zapier_format", "single")) if "Zapier" in sinks and url else None
+    file_path = event_log_path() if "Local file" in sinks else None
+    get_event_bus().emit(kind, data, zapier=zapier, file_path=file_path)
+
+
+SESSION_CACHE_LIMIT = 12
+
+
+def brief_key(brief: Dict) -> str:
+    """Stable short hash of a brief, used to key generated outputs in session state."""
+    raw = json.dumps(brief, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=10).hexdigest()
+
+
+def session_cache(bucket: str, key: str, build):
+    """Return session_state[bucket][key], building it once; keeps the newest SESSION_CACHE_LIMIT entries."""
+    store = st.session_state.setdefault(bucket, {})
+    if key in store:
+        store[key] = store.pop(key)  # mark as most recently used
+        return store[key]
+    value = build()
+    store[key] = value
+    while len(store) > SESSION_CACHE_LIMIT:
+        store.pop(next(iter(store)))
+    return value
+
+
+def shared_brief() -> Dict:
+    """The offer brief shared by every generator page (product, audience, benefits, style…)."""
+    return st.session_state.setdefault("shared_brief", {})
+
+
+def update_shared_brief(**fields) -> None:
+    shared_brief().update(fields)
+
+
+def brief_option_index(options: List[str], field: str, default: int = 0) -> int:
+    value = shared_brief().get(field)
+    return options.index(value) if value in options else default
+
+
+def parse_benefits(benefits_text: str) -> List[str]:
+    return [ln.strip() for ln in benefits_text.splitlines() if ln.strip()]
+
+
+def active_session_result(bucket: str):
+    return st.session_state.get(bucket, {}).get(st.session_state.get(f"{bucket}_active"))
+
+
+GENERATION_EVENTS = {
+    "copy_results": "copy.generated",
+    "email_results": "email_sequence.generated",
+    "vsl_results": "vsl_script.generated",
+    "classified_results": "classified_ads.generated",
+}
+
+
+def generation_event_output(bucket: str, value):
+    """The shareable part of a generator's output (copies of anything the page mutates later)."""
+    if bucket == "copy_results":
+        return {
+            "headlines": value["headlines"],
+            "ranked": [{"score": score, "headline": h} for score, h in value["ranked"]],
+            "sales_copy": value["sales_copy"],
+            "score": dict(value["scores"]["Sales Copy Draft"]),
+        }
+    if bucket == "classified_results":
+        return {"ads": value["ads"]}
+    return value
+
+
+def store_session_result(bucket: str, params: Dict, build):
+    """Cache a generator's output under the hash of its inputs and mark it active for the page."""
+    key = brief_key(params)
+
+    def timed_build():
+        with timed(f"generate:{bucket}"):
+            value = build()
+        if bucket in GENERATION_EVENTS:
+            emit_event(GENERATION_EVENTS[bucket], {"params": params, "output": generation_event_output(bucket, value)})
+        return value
+
+    value = session_cache(bucket, key, timed_build)
+    st.session_state[f"{bucket}_active"] = key
+    return value
+
+
 EMOTIONAL_TRIGGERS = [
     "secret", "secrets", "discover", "finally", "weird", "shocking", "hidden", "proven",
     "guaranteed", "guarantee", "instantly", "suddenly", "fear", "greed", "curiosity",
@@ -578,10 +1032,174 @@ def call_llm_cohere(prompt: str, model: str = "command-r") -> Tuple[bool, str]:
         return False, f"Cohere error: {e}"
 
 
+# =========================
+# Spintax
+# =========================
+
+# "{Stop|Quit|Don't} wasting money" spins into 3 variants and options may nest:
+# "{Hi|Hey {there|friend}}" spins into 3. A template compiles once into a tree
+# where every node knows how many variants sit below it, so the count is closed
+# form and the Nth variant is decoded in a single walk over the template.
+# Use a backslash to keep a literal brace or pipe ("\{", "\|", "\}"); any other backslash
+# is plain text.
+
+SPIN_OPEN, SPIN_SEP, SPIN_CLOSE, SPIN_ESCAPE = "{", "|", "}", "\\"
+_SPIN_META = (SPIN_OPEN, SPIN_SEP, SPIN_CLOSE, SPIN_ESCAPE)
+
+
+class _SpinSeq:
+    __slots__ = ("parts", "radices", "count")
+
+    def __init__(self, parts: List):
+        self.parts = parts
+        self.radices = [1 if isinstance(p, str) else p.count for p in parts]
+        count = 1
+        for r in self.radices:
+            count *= r
+        self.count = count
+
+
+class _SpinAlt:
+    __slots__ = ("options", "offsets", "count")
+
+    def __init__(self, options: List[_SpinSeq]):
+        self.options = options
+        self.offsets: List[int] = []
+        total = 0
+        for opt in options:
+            self.offsets.append(total)
+            total += opt.count
+        self.count = total
+
+
+def _parse_spintax(template: str) -> _SpinSeq:
+    stack: List[Tuple[List, List[_SpinSeq], int]] = []
+    parts: List = []
+    buf: List[str] = []
+
+    def flush() -> None:
+        if buf:
+            parts.append("".join(buf))
+            buf.clear()
+
+    i, n = 0, len(template)
+    while i < n:
+        ch = template[i]
+        if ch == SPIN_ESCAPE and i + 1 < n and template[i + 1] in _SPIN_META:
+            buf.append(template[i + 1])
+            i += 2
+            continue
+        if ch == SPIN_OPEN:
+            flush()
+            stack.append((parts, [], i))
+            parts = []
+        elif ch == SPIN_SEP and stack:
+            flush()
+            stack[-1][1].append(_SpinSeq(parts))
+            parts = []
+        elif ch == SPIN_CLOSE and stack:
+            flush()
+            parent, options, _ = stack.pop()
+            options.append(_SpinSeq(parts))
+            parts = parent
+            parts.append(_SpinAlt(options))
+        else:
+            buf.append(ch)
+        i += 1
+
+    if stack:
+        raise ValueError(f"Unclosed '{SPIN_OPEN}' in spintax at position {stack[-1][2]}.")
+    flush()
+    return _SpinSeq(parts)
+
+
+def _render_spin(seq: _SpinSeq, index: int, out: List[str]) -> None:
+    digits: List[int] = []
+    for radix in reversed(seq.radices):
+        index, d = divmod(index, radix)
+        digits.append(d)
+    for part, d in zip(seq.parts, reversed(digits)):
+        if isinstance(part, str):
+            out.append(part)
+        else:
+            j = bisect.bisect_right(part.offsets, d) - 1
+            _render_spin(part.options[j], d - part.offsets[j], out)
+
+
+def _parse_option(option: str) -> _SpinSeq:
+    # Like spin(), malformed spintax in a brief field is kept as literal text.
+    try:
+        return _parse_spintax(option)
+    except ValueError:
+        return _SpinSeq([option])
+
+
+class Spintax:
+    """A compiled spintax template: count, index, sample, or lazily enumerate its variants."""
+
+    def __init__(self, template: str):
+        self.template = template
+        self._root = _parse_spintax(template)
+
+    @classmethod
+    def from_slots(cls, slots: List[List[str]]) -> "Spintax":
+        """Concatenate slots, each an alternation over spintax options, without re-escaping them."""
+        obj = cls.__new__(cls)
+        obj.template = "".join(SPIN_OPEN + SPIN_SEP.join(opts) + SPIN_CLOSE for opts in slots)
+        obj._root = _SpinSeq([_SpinAlt([_parse_option(o) for o in opts]) for opts in slots if opts])
+        return obj
+
+    @property
+    def count(self) -> int:
+        return self._root.count
+
+    def nth(self, index: int) -> str:
+        if not 0 <= index < self._root.count:
+            raise IndexError(f"Spintax variant {index} out of range (0..{self._root.count - 1}).")
+        out: List[str] = []
+        _render_spin(self._root, index, out)
+        return "".join(out)
+
+    def random(self, rng: Optional[random.Random] = None) -> str:
+        # Uniform over distinct expansion paths, not per-brace coin flips.
+        return self.nth((rng or random).randrange(self._root.count))
+
+    def expand(self, start: int = 0, stop: Optional[int] = None) -> Iterator[str]:
+        stop = self._root.count if stop is None else min(stop, self._root.count)
+        for index in range(start, stop):
+            yield self.nth(index)
+
+    def __iter__(self) -> Iterator[str]:
+        return self.expand()
+
+
+def spin(text: str, rng: Optional[random.Random] = None) -> str:
+    """Return one random variant of ``text``; plain or malformed spintax comes back unchanged."""
+    if not text or SPIN_OPEN not in text:
+        return text
+    try:
+        return Spintax(text).random(rng)
+    except ValueError:
+        return text
+
+
 # =========================
 # Generators (rule-based)
 # =========================
 
+def split_benefit(raw: str) -> Tuple[str, str]:
+    """Split "save money (hundreds a month)" into ("save money", "hundreds a month")."""
+    raw = raw.strip()
+    short, detail = raw, ""
+    if "(" in raw and ")" in raw:
+        before = raw.split("(", 1)[0].strip()
+        inside = raw.split("(", 1)[1].split(")", 1)[0].strip()
+        if before:
+            short = before
+        detail = inside
+    return short, detail
+
+
 def generate_rule_based_copy(
     product_name: str,
     product_desc: str,
@@ -600,18 +1218,11 @@ def generate_rule_based_copy(
         _, niche_benefits = choose_niche_defaults(niche)
         benefits_list = niche_benefits
 
-    raw_base = benefits_list[0].strip()
-    base_benefit_short = raw_base
-    base_benefit_detail = ""
-    if "(" in raw_base and ")" in raw_base:
-        before = raw_base.split("(", 1)[0].strip()
-        inside = raw_base.split("(", 1)[1].split(")", 1)[0].strip()
-        if before:
-            base_benefit_short = before
-        base_benefit_detail = inside
+    base_benefit_short, base_benefit_detail = split_benefit(benefits_list[0])
 
     audience_short = normalize_audience(audience)
-    style_flavor = MASTER_FLAVORS.get(master_style, "direct-response style tuned for conversions")
+    style = style_pack(master_style)
+    style_flavor = style["flavor"]
     awareness_angle = AWARENESS_ANGLE.get(
         awareness, "meet them where they are and lead them step-by-step to a decision"
     )
@@ -641,19 +1252,7 @@ def generate_rule_based_copy(
     }
     cta_phrase = cta_map.get(niche, "Take action now while you’re still thinking about it.")
 
-    emotion_intro = {
-        "Gary Halbert": "Let’s cut through the noise for a second.",
-        "David Ogilvy": "Here’s a fact few advertisers ever admit.",
-        "Dan Kennedy": "I’ll be blunt — most people get this part completely wrong.",
-        "Joe Sugarman": "Let me tell you a quick story that changed everything.",
-        "Eugene Schwartz": "The key isn’t desire — it’s understanding where that desire already lives.",
-        "John Carlton": "Here’s the ugly little truth nobody else will say out loud.",
-        "Jay Abraham": "If you’re serious about leverage, this next part matters.",
-        "Robert Bly": "Let’s break this down like a classic direct-response pro.",
-        "Neville Medhora": "Okay, here’s the simple version no one is telling you.",
-        "Joanna Wiebe": "Let’s talk about what your customers are actually saying in their heads.",
-        "Hybrid Mix": "Let’s mix hard-hitting direct response with what your market really cares about.",
-    }.get(master_style, "Here’s the real story no one else is telling you.")
+    emotion_intro = style["intro"]
 
     bullets = "\n".join([f"- {b}" for b in benefits_list])
     detail_sentence = f" In plain English: it {base_benefit_detail}." if base_benefit_detail else ""
@@ -710,6 +1309,150 @@ def generate_rule_based_copy(
     return headlines, sales_copy
 
 
+# =========================
+# Headline engine
+# =========================
+
+# Classic headline formulas. Each formula is expanded only over the fields it
+# actually uses, then crossed with HEADLINE_TAILS, so a 3–4 benefit brief yields
+# on the order of a thousand distinct candidates.
+
+HEADLINE_FORMULAS: List[str] = [
+    "How To {Benefit}",
+    "How To {Benefit} In {timeframe}",
+    "How {Audience} Can {Benefit} With {product}",
+    "Do You Make These {number} Mistakes When Trying To {Benefit}?",
+    "Do You Make These Mistakes When You Try To {Benefit}?",
+    "Finally: {product} That Helps You {Benefit}",
+    "Finally: A Simple Way To {Benefit}",
+    "The Secret To {Benefit} In Just {timeframe}",
+    "{number} Little-Known Ways To {Benefit}",
+    "{number} Proven Steps To {Benefit}",
+    "Why Most People Never {Benefit} — And How You Can",
+    "Who Else Wants To {Benefit}?",
+    "Warning: Don’t Try To {Benefit} Until You Read This",
+    "{product}: The Fast, Easy Way To {Benefit}",
+    "Give Me {timeframe} And I’ll Show You How To {Benefit}",
+    "The Lazy Way To {Benefit}",
+    "They Laughed When I Said I Could {Benefit}… Until Now",
+    "Is {product} The Breakthrough That Finally Helps You {Benefit}?",
+    "{Benefit} In {timeframe} — Guaranteed",
+    "What Everybody Ought To Know About How To {Benefit}",
+]
+
+HEADLINE_TAILS: List[str] = [
+    "",
+    " (Starting Today)",
+    " — Without The Struggle",
+    " — Even If Nothing Else Worked",
+    " — No Guesswork Required",
+]
+
+HEADLINE_NUMBERS: List[str] = ["3", "5", "7", "9", "11"]
+HEADLINE_TIMEFRAMES: List[str] = ["7 Days", "14 Days", "21 Days", "30 Days", "One Weekend", "One Week"]
+
+# Precompiled lexicons shared with analyze_copy_score, so ranking a thousand
+# candidates is one regex pass each instead of a substring scan per trigger.
+_TRIGGER_RE = re.compile(
+    r"\b(?:" + "|".join(re.escape(t) for t in sorted(EMOTIONAL_TRIGGERS, key=len, reverse=True)) + r")\b"
+)
+_SPECIFIC_RE = re.compile(r"\d+%?|\$|\b(?:days?|weeks?|months?|weekend)\b")
+_HEADLINE_CUE_RE = re.compile(r"^(?:how|why|who|what|finally|warning|the secret|discover)\b|\?$")
+_YOU_RE = re.compile(r"\byou(?:r|’ve|'ve)?\b")
+
+
+def score_headline(headline: str) -> float:
+    low = headline.lower()
+    n_words = len(headline.split())
+
+    emo_score = min(len(set(_TRIGGER_RE.findall(low))) / 3.0, 1.0) * 35
+    spec_score = min(len(_SPECIFIC_RE.findall(low)) / 2.0, 1.0) * 25
+    if 6 <= n_words <= 12:
+        length_score = 20.0
+    elif 4 <= n_words <= 16:
+        length_score = 10.0
+    else:
+        length_score = 0.0
+    cue_score = 10.0 if _HEADLINE_CUE_RE.search(low) else 0.0
+    you_score = 10.0 if _YOU_RE.search(low) else 0.0
+    return round(emo_score + spec_score + length_score + cue_score + you_score, 1)
+
+
+def generate_headline_candidates(product_name: str, audience: str, benefits_list: List[str]) -> Iterator[str]:
+    audience_line = audience.splitlines()[0].strip() if audience.strip() else "people like you"
+    if re.match(r"^\d", audience_line):
+        audience_line = f"people aged {audience_line}"
+    base = {"product": product_name.strip(), "Audience": audience_line[:1].upper() + audience_line[1:]}
+    pools = {"number": HEADLINE_NUMBERS, "timeframe": HEADLINE_TIMEFRAMES}
+
+    for raw_benefit in benefits_list:
+        short, _ = split_benefit(raw_benefit)
+        if not short:
+            continue
+        fields = dict(base, Benefit=short[:1].upper() + short[1:])
+        for formula in HEADLINE_FORMULAS:
+            used = [f for _, f, _, _ in string.Formatter().parse(formula) if f in pools]
+            combos = [dict(zip(used, values)) for values in _product_of([pools[f] for f in used])]
+            for combo in combos:
+                head = formula.format(**fields, **combo)
+                for tail in HEADLINE_TAILS:
+                    if tail and (head.endswith("?") or "—" in head):
+                        continue
+                    yield head + tail
+
+
+def _product_of(pools: List[List[str]]) -> Iterator[Tuple[str, ...]]:
+    if not pools:
+        yield ()
+        return
+    for first in pools[0]:
+        for rest in _product_of(pools[1:]):
+            yield (first,) + rest
+
+
+_HEADLINE_TAIL_RE = re.compile("(?:" + "|".join(re.escape(t) for t in HEADLINE_TAILS if t) + ")$")
+_HEADLINE_SLOT_RE = re.compile("|".join(re.escape(t) for t in HEADLINE_TIMEFRAMES) + r"|\b\d+\b")
+
+
+def headline_family(headline: str) -> str:
+    """Headlines that differ only by number, timeframe, or tail share a family."""
+    return _HEADLINE_SLOT_RE.sub("#", _HEADLINE_TAIL_RE.sub("", headline))
+
+
+def rank_headlines(candidates: Iterator[str], k: int = 10) -> Tuple[List[Tuple[float, str]], int]:
+    """
+    Keep the top-k scored headlines in a min-heap and return (best first, candidates seen).
+
+    The heap holds at most one headline per family, so the winners are k different
+    angles rather than one formula with k different numbers. Memory is O(k).
+    """
+    heap: List[Tuple[float, int, str]] = []
+    by_family: Dict[str, Tuple[float, int, str]] = {}
+    seen = 0
+    for seen, headline in enumerate(candidates, start=1):
+        # Earlier candidates win ties, which keeps plain formulas ahead of their tails.
+        item = (score_headline(headline), -seen, headline)
+        family = headline_family(headline)
+        current = by_family.get(family)
+        if current is not None:
+            if item > current:
+                heap[heap.index(current)] = item
+                heapq.heapify(heap)
+                by_family[family] = item
+        elif len(heap) < k:
+            heapq.heappush(heap, item)
+            by_family[family] = item
+        elif item > heap[0]:
+            dropped = heapq.heapreplace(heap, item)
+            del by_family[headline_family(dropped[2])]
+            by_family[family] = item
+    ranked = [(score, headline) for score, _, headline in sorted(heap, reverse=True)]
+    return ranked, seen
+
+
+_SUBJECT_SLOT = "\x00subject\x00"
+
+
 def generate_email_sequence(
     product_name: str,
     product_desc: str,
@@ -718,7 +1461,9 @@ def generate_email_sequence(
     master_style: str,
     awareness: str,
     num_emails: int = 5,
+    seed: Optional[int] = None,
 ) -> List[Dict[str, str]]:
+    rng = random.Random(seed)
     if not benefits_list:
         benefits_list = [
             "get real, measurable results",
@@ -731,10 +1476,10 @@ def generate_email_sequence(
     main_benefit = benefits_list[0]
     seq: List[Dict[str, str]] = []
 
-    subject1 = f"[{master_style}] The painful mistake your {product_name} solves"
+    subject1 = spin(f"[{master_style}] The painful mistake your {product_name} solves", rng)
     body1 = textwrap.dedent(
         f"""
-        Subject: {subject1}
+        Subject: {_SUBJECT_SLOT}
 
         Hey,
 
@@ -765,10 +1510,10 @@ def generate_email_sequence(
     ).strip()
     seq.append({"subject": subject1, "body": body1})
 
-    subject2 = f"That moment when you almost gave up on {main_benefit.lower()}…"
+    subject2 = spin(f"That moment when you almost gave up on {main_benefit.lower()}…", rng)
     body2 = textwrap.dedent(
         f"""
-        Subject: {subject2}
+        Subject: {_SUBJECT_SLOT}
 
         Hey,
 
@@ -795,10 +1540,10 @@ def generate_email_sequence(
     ).strip()
     seq.append({"subject": subject2, "body": body2})
 
-    subject3 = f"How {product_name} helps you {main_benefit.lower()} (without the usual grind)"
+    subject3 = spin(f"How {product_name} helps you {main_benefit.lower()} (without the usual grind)", rng)
     body3 = textwrap.dedent(
         f"""
-        Subject: {subject3}
+        Subject: {_SUBJECT_SLOT}
 
         Hey,
 
@@ -820,10 +1565,10 @@ def generate_email_sequence(
     ).strip()
     seq.append({"subject": subject3, "body": body3})
 
-    subject4 = f"Ready to actually {main_benefit.lower()} with {product_name}?"
+    subject4 = spin(f"Ready to actually {main_benefit.lower()} with {product_name}?", rng)
     body4 = textwrap.dedent(
         f"""
-        Subject: {subject4}
+        Subject: {_SUBJECT_SLOT}
 
         Hey,
 
@@ -843,10 +1588,10 @@ def generate_email_sequence(
     ).strip()
     seq.append({"subject": subject4, "body": body4})
 
-    subject5 = f"Last call: your next shot at {main_benefit.lower()}"
+    subject5 = spin(f"Last call: your next shot at {main_benefit.lower()}", rng)
     body5 = textwrap.dedent(
         f"""
-        Subject: {subject5}
+        Subject: {_SUBJECT_SLOT}
 
         Hey,
 
@@ -870,55 +1615,206 @@ def generate_email_sequence(
         """
     ).strip()
     seq.append({"subject": subject5, "body": body5})
-    return seq[:num_emails]
+    # Bodies are spun with a placeholder for the subject and the already spun subject is
+    # put back afterwards, so the "Subject:" line isn't spun (or unescaped) a second time.
+    return [
+        {"subject": e["subject"], "body": spin(e["body"], rng).replace(_SUBJECT_SLOT, e["subject"], 1)}
+        for e in seq[:num_emails]
+    ]
 
 
-def generate_classified_ads(
+# Classified ads are assembled from independent slots (hook, description cut,
+# audience line, urgency line, CTA). A variant is one index into the mixed-radix
+# product of those slots, so the space is counted and sampled without ever
+# being enumerated.
+
+CLASSIFIED_HOOK_TEMPLATES: List[str] = [
+    "{product_name} For {niche}: Limited Spots.",
+    "New: {product_name} For {aud_cap}",
+    "Finally — {product_name} That Actually Works",
+    "Tired Of Guessing? Try {product_name}",
+    "{niche}: The Simple Fix Most People Miss",
+    "Little-Known {product_name} Is Turning Heads",
+    "Wanted: {aud_cap} Ready For Real Results",
+    "Free Details: {product_name}",
+]
+
+CLASSIFIED_AUDIENCE_LINES: List[str] = [
+    "Built for {aud_short} who want real results, not theory.",
+    "Made for {aud_short} who are done with guesswork.",
+    "If you're {aud_short}, this was made for you.",
+    "Perfect for {aud_short} who want a simple plan that works.",
+    "Designed for {aud_short} — no fluff, no hype.",
+    "Ideal for {aud_short} who want to start today.",
+]
+
+CLASSIFIED_URGENCY_LINES: List[str] = [
+    "",
+    "Spots are limited.",
+    "This listing won’t stay up long.",
+    "Takes less than 2 minutes to get started.",
+    "No risk — see if it’s right for you.",
+    "Hundreds have already started this month.",
+]
+
+CLASSIFIED_CTA_TEMPLATES: List[str] = [
+    "{cta}.",
+    "{cta} today.",
+    "{cta} — details inside.",
+    "{cta} while spots last.",
+    "{cta} now.",
+]
+
+
+def _description_cuts(product_desc: str, limit: int = 220) -> List[str]:
+    desc = " ".join(product_desc.split())
+    if SPIN_OPEN in desc:
+        # Cutting through spintax would unbalance its braces; the spin itself varies it.
+        return [desc]
+    sentences = [s for s in re.split(r"(?<=[.!?])\s+", desc) if s]
+    candidates = [desc]
+    if sentences:
+        candidates.append(sentences[0])
+        candidates.append(" ".join(sentences[:2]))
+    if len(desc) > 120:
+        candidates.append(desc[:117].rsplit(" ", 1)[0].rstrip(",;:") + "...")
+
+    cuts: List[str] = []
+    for c in candidates:
+        if len(c) > limit:
+            c = c[: limit - 3].rstrip() + "..."
+        if c and c not in cuts:
+            cuts.append(c)
+    return cuts or [desc]
+
+
+def build_classified_variant_slots(
     product_name: str,
     product_desc: str,
     audience: str,
     niche: str,
     master_style: str,
     cta: str,
-    num_ads: int = 3,
-) -> List[str]:
+) -> List[List[str]]:
     if not audience.strip():
         audience, _ = choose_niche_defaults(niche)
     aud_short = normalize_audience(audience)
-    desc_short = product_desc.strip()
-    if len(desc_short) > 220:
-        desc_short = desc_short[:217].rstrip() + "..."
-    out: List[str] = []
+    fields = {
+        "product_name": product_name.strip(),
+        "niche": niche,
+        "aud_short": aud_short,
+        "aud_cap": aud_short[:1].upper() + aud_short[1:],
+        "aud_sentence": aud_short.capitalize(),
+        "cta": cta.strip().rstrip(".") or "Click here to learn more",
+    }
 
-    for _ in range(num_ads):
-        if master_style == "Gary Halbert":
-            hook = f"STOP: {product_name} For {aud_short.capitalize()}"
-        elif master_style == "David Ogilvy":
-            hook = f"{product_name}: The {niche} Breakthrough You Haven’t Tried Yet"
-        elif master_style == "Dan Kennedy":
-            hook = f"Serious About {niche}? Read This Before You Waste Another Dollar."
-        elif master_style == "Joe Sugarman":
-            hook = f"It Started With One Simple {product_name}..."
-        elif master_style == "Eugene Schwartz":
-            hook = f"Already Tried Everything In {niche}? This Is Different."
-        else:
-            hook = f"{product_name} For {niche}: Limited Spots."
+    def fill(templates: List[str]) -> List[str]:
+        seen: List[str] = []
+        for t in templates:
+            line = t.format(**fields)
+            if line not in seen:
+                seen.append(line)
+        return seen
+
+    style_hook = style_pack(master_style)["classified_hook"].format(**fields)
+    hooks = [style_hook] + [h for h in fill(CLASSIFIED_HOOK_TEMPLATES) if h != style_hook]
+    return [
+        hooks,
+        _description_cuts(product_desc),
+        fill(CLASSIFIED_AUDIENCE_LINES),
+        fill(CLASSIFIED_URGENCY_LINES),
+        fill(CLASSIFIED_CTA_TEMPLATES),
+    ]
 
-        body = textwrap.dedent(
-            f"""
-            {hook}
 
-            {desc_short}
+def build_classified_variant_space(
+    product_name: str,
+    product_desc: str,
+    audience: str,
+    niche: str,
+    master_style: str,
+    cta: str,
+) -> "Spintax":
+    hooks, cuts, aud_lines, urgency, ctas = build_classified_variant_slots(
+        product_name, product_desc, audience, niche, master_style, cta
+    )
+    # Slot 0 varies slowest, so index 0 is the master's "classic" ad. Any spintax
+    # inside the brief (e.g. "{Stop|Quit} wasting money") nests into the same space.
+    return Spintax.from_slots(
+        [
+            [h + "\n\n" for h in hooks],
+            [c + "\n\n" for c in cuts],
+            [a + "\n\n" for a in aud_lines],
+            [u + " " if u else "" for u in urgency],
+            ctas,
+        ]
+    )
+
 
-            Built for {aud_short} who want real results, not theory.
+def count_classified_variants(space: "Spintax") -> int:
+    return space.count
 
-            {cta.strip().rstrip('.')}.
-            """
-        ).strip()
-        out.append(body)
+
+def iter_variant_indices(total: int, k: int, rng: random.Random) -> Iterator[int]:
+    """Yield distinct indices in [0, total) in random order (sampling without replacement)."""
+    if total <= 2 * k:
+        order = list(range(total))
+        rng.shuffle(order)
+        yield from order
+        return
+    # Sparse draw: the space is much larger than the request, so rejection is cheap
+    # and memory stays proportional to what we actually emit.
+    seen = set()
+    while len(seen) < total:
+        i = rng.randrange(total)
+        if i not in seen:
+            seen.add(i)
+            yield i
+
+
+def sample_unique_variants(
+    space: "Spintax",
+    k: int,
+    seed: Optional[int] = None,
+    first_index: Optional[int] = None,
+) -> List[str]:
+    total = space.count
+    rng = random.Random(seed)
+    out: List[str] = []
+    digests = set()
+
+    def take(index: int) -> None:
+        text = space.nth(index)
+        digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+        if digest not in digests:
+            digests.add(digest)
+            out.append(text)
+
+    if first_index is not None and total and k > 0:
+        take(first_index)
+    for index in iter_variant_indices(total, k, rng):
+        if len(out) >= k:
+            break
+        if index != first_index:
+            take(index)
     return out
 
 
+def generate_classified_ads(
+    product_name: str,
+    product_desc: str,
+    audience: str,
+    niche: str,
+    master_style: str,
+    cta: str,
+    num_ads: int = 3,
+    seed: Optional[int] = None,
+) -> List[str]:
+    space = build_classified_variant_space(product_name, product_desc, audience, niche, master_style, cta)
+    # Lead with the master's signature ad, then fill with unique random variants.
+    return sample_unique_variants(space, num_ads, seed=seed, first_index=0)
+
+
 def generate_vsl_webinar_script(
     product_name: str,
     product_desc: str,
@@ -937,25 +1833,19 @@ def generate_vsl_webinar_script(
         benefits_list = niche_b
     main_benefit = benefits_list[0]
     extra_bullets = "\n".join([f"- {b}" for b in benefits_list])
-    style_flavor = MASTER_FLAVORS.get(master_style, "direct-response style tuned for conversions")
+    style = style_pack(master_style)
+    style_flavor = style["flavor"]
     awareness_angle = AWARENESS_ANGLE.get(
         awareness, "meet them where they are and lead them step-by-step to a decision"
     )
 
-    if master_style == "Gary Halbert":
-        hook_line = "Let me start with a simple, slightly uncomfortable truth."
-    elif master_style == "David Ogilvy":
-        hook_line = "If you care about results, the next few minutes deserve your full attention."
-    elif master_style == "Dan Kennedy":
-        hook_line = "I’m not here to entertain you. I’m here to show you how to make more money."
-    elif master_style == "Joe Sugarman":
-        hook_line = "This story starts with something small, almost trivial… and turns into a complete turning point."
-    elif master_style == "Eugene Schwartz":
-        hook_line = "Right now, there is a powerful desire already burning in your market."
-    elif master_style == "John Carlton":
-        hook_line = "Here’s the ugly truth no one else will say out loud."
-    else:
-        hook_line = "Let’s cut through the noise and talk about what actually matters."
+    hook_line = style["vsl_hook"].format(
+        product_name=product_name,
+        niche=niche,
+        aud_short=aud_short,
+        aud_cap=aud_short[:1].upper() + aud_short[1:],
+        aud_sentence=aud_short.capitalize(),
+    )
 
     secrets_block = "\n".join([f"Secret #{i+1}: {b}" for i, b in enumerate(benefits_list[:3])])
 
@@ -1095,6 +1985,145 @@ def render_header():
     st.markdown("---")
 
 
+# =========================
+# Reference directories
+# =========================
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+
+@st.cache_data(show_spinner=False)
+def load_reference_data(name: str) -> Dict:
+    with open(os.path.join(DATA_DIR, f"{name}.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+@st.cache_data(show_spinner=False)
+def link_list_markdown(name: str, section_id: str) -> str:
+    section = next(s for s in load_reference_data(name)["sections"] if s["id"] == section_id)
+    return "\n".join(f"- [{n['name']}]({n['url']}) – {n['note']}" for n in section["items"])
+
+
+TRAFFIC_BANDS: List[Tuple[str, int]] = [
+    ("100M+", 100_000_000),
+    ("10M–100M", 10_000_000),
+    ("1M–10M", 1_000_000),
+    ("Under 1M", 0),
+]
+
+SITE_SORTS: Dict[str, Callable[[Dict], object]] = {
+    "List order": lambda s: s["rank"],
+    "Most traffic": lambda s: (-s["visits"], s["rank"]),
+    "Name (A–Z)": lambda s: s["name"].lower(),
+}
+
+_SITE_WORD_RE = re.compile(r"[a-z0-9]+")
+_SITE_STOP_WORDS = {"http", "https", "www"}
+
+
+def traffic_band(visits: int) -> str:
+    return next(label for label, floor in TRAFFIC_BANDS if visits >= floor)
+
+
+class SiteDirectory:
+    """
+    Classified sites with inverted indexes on tag, region, traffic band and list,
+    plus a sorted token vocabulary for prefix search. Built once per process.
+    """
+
+    FACETS = ("tag", "region", "band", "section")
+
+    def __init__(self, data: Dict):
+        self.sites: List[Dict] = []
+        self.index: Dict[str, Dict[str, set]] = {facet: {} for facet in self.FACETS}
+        self.section_titles = {s["id"]: s["title"] for s in data["sections"]}
+        tokens: Dict[str, set] = {}
+        for section in data["sections"]:
+            for site in section["sites"]:
+                i = len(self.sites)
+                site = dict(site, band=traffic_band(site["visits"]), section=section["id"])
+                self.sites.append(site)
+                for tag in site["tags"]:
+                    self.index["tag"].setdefault(tag, set()).add(i)
+                for facet in ("region", "band", "section"):
+                    self.index[facet].setdefault(site[facet], set()).add(i)
+                words = _SITE_WORD_RE.findall(f"{site['name']} {site['url']} {site['region']}".lower())
+                for word in set(words) - _SITE_STOP_WORDS:
+                    tokens.setdefault(word, set()).add(i)
+        self.priority = {i for i, s in enumerate(self.sites) if s["priority"]}
+        self._tokens = tokens
+        self._vocab = sorted(tokens)
+        # Rank of every site under each sort, so results sort without re-deriving keys.
+        self._positions: Dict[str, List[int]] = {}
+        for name, key in SITE_SORTS.items():
+            positions = [0] * len(self.sites)
+            for pos, i in enumerate(sorted(range(len(self.sites)), key=lambda i: key(self.sites[i]))):
+                positions[i] = pos
+            self._positions[name] = positions
+
+    def options(self, facet: str) -> List[str]:
+        if facet == "band":
+            return [label for label, _ in TRAFFIC_BANDS if label in self.index["band"]]
+        if facet == "section":
+            return [sid for sid in self.section_titles if sid in self.index["section"]]
+        return sorted(self.index[facet])
+
+    def _prefix_ids(self, prefix: str) -> set:
+        ids: set = set()
+        for pos in range(bisect.bisect_left(self._vocab, prefix), len(self._vocab)):
+            word = self._vocab[pos]
+            if not word.startswith(prefix):
+                break
+            ids |= self._tokens[word]
+        return ids
+
+    def query(
+        self,
+        text: str = "",
+        filters: Optional[Dict[str, List[str]]] = None,
+        priority_only: bool = False,
+        sort: str = "List order",
+    ) -> List[Dict]:
+        """Values within a facet are OR'ed, facets and search words are AND'ed."""
+        matched: Optional[set] = None
+
+        def narrow(ids: set):
+            nonlocal matched
+            matched = set(ids) if matched is None else matched & ids
+
+        for facet, values in (filters or {}).items():
+            if values:
+                narrow(set().union(*(self.index[facet].get(v, set()) for v in values)))
+        if priority_only:
+            narrow(self.priority)
+        for word in _SITE_WORD_RE.findall(text.lower()):
+            narrow(self._prefix_ids(word))
+
+        ids = range(len(self.sites)) if matched is None else matched
+        return [self.sites[i] for i in sorted(ids, key=self._positions[sort].__getitem__)]
+
+
+@st.cache_resource(show_spinner=False)
+def get_site_directory() -> SiteDirectory:
+    return SiteDirectory(load_reference_data("classified_sites"))
+
+
+@st.cache_data(show_spinner=False)
+def classified_section_markdown(section_id: str) -> str:
+    data = load_reference_data("classified_sites")
+    if section_id == "tools":
+        lines = []
+        for tool in data["tools"]["items"]:
+            line = f"- **{tool['name']}** – {tool['note']}  "
+            if tool.get("url"):
+                line += f"\n  👉 <{tool['url']}>  "
+            lines.append(line)
+        return "\n\n".join(lines)
+    return "\n".join(
+        f"{i}. **{tip['title']}** – {tip['text']}  " for i, tip in enumerate(data["tips"]["items"], start=1)
+    )
+
+
 # =========================
 # Pages
 # =========================
@@ -1172,56 +2201,132 @@ def page_generate_copy():
         index=0,
     )
 
+    shared = shared_brief()
+    niches = list(NICHE_DEFAULTS.keys())
+    styles = style_names()
+    tones = ["Direct & No-BS", "Friendly & Conversational", "High-End / Premium", "Urgent & Hypey", "Calm & Professional"]
     col_top1, col_top2, col_top3 = st.columns(3)
     with col_top1:
-        niche = st.selectbox("Primary Niche", list(NICHE_DEFAULTS.keys()), index=0)
+        niche = st.selectbox("Primary Niche", niches, index=brief_option_index(niches, "niche"))
     with col_top2:
-        master_style = st.selectbox("Master Style Influence", list(MASTER_FLAVORS.keys()), index=0)
+        master_style = st.selectbox("Master Style Influence", styles, index=brief_option_index(styles, "master_style"))
     with col_top3:
         awareness = st.selectbox(
             "Audience Awareness (Eugene Schwartz)",
-            ["Unaware", "Problem-aware", "Solution-aware", "Product-aware", "Most-aware"],
-            index=2,
+            AWARENESS_LEVELS,
+            index=brief_option_index(AWARENESS_LEVELS, "awareness", 2),
         )
 
     st.markdown("---")
     st.markdown("### ✍️ Copy Brief")
 
     with st.form("copy_brief_form"):
-        product_name = st.text_input("Product / Service Name", "")
-        product_desc = st.text_area("Product / Service Description", "")
-        audience = st.text_area("Target Audience", "")
-        tone = st.selectbox(
-            "Desired Tone",
-            ["Direct & No-BS", "Friendly & Conversational", "High-End / Premium", "Urgent & Hypey", "Calm & Professional"],
-            index=0,
-        )
-        benefits_text = st.text_area("Key Benefits & USPs (one per line)", "")
-        cta = st.text_input("Primary Call To Action (CTA)", "Click here to get started")
+        product_name = st.text_input("Product / Service Name", shared.get("product_name", ""))
+        product_desc = st.text_area("Product / Service Description", shared.get("product_desc", ""))
+        audience = st.text_area("Target Audience", shared.get("audience", ""))
+        tone = st.selectbox("Desired Tone", tones, index=brief_option_index(tones, "tone"))
+        benefits_text = st.text_area("Key Benefits & USPs (one per line)", shared.get("benefits_text", ""))
+        cta = st.text_input("Primary Call To Action (CTA)", shared.get("cta", "Click here to get started"))
+        top_k = st.slider("Top-ranked headlines to keep", 5, 25, 10)
         submitted = st.form_submit_button("⚡ Generate Headlines & Sales Copy")
 
-    if not submitted:
+    if submitted:
+        if not product_name or not product_desc:
+            st.error("Please provide at least a product name and description.")
+            return
+        update_shared_brief(
+            niche=niche,
+            master_style=master_style,
+            awareness=awareness,
+            tone=tone,
+            product_name=product_name,
+            product_desc=product_desc,
+            audience=audience,
+            benefits_text=benefits_text,
+            cta=cta,
+        )
+        brief = {
+            "niche": niche,
+            "master_style": master_style,
+            "awareness": awareness,
+            "tone": tone,
+            "product_name": product_name,
+            "product_desc": product_desc,
+            "audience": audience,
+            "benefits_list": parse_benefits(benefits_text),
+            "cta": cta,
+            "top_k": top_k,
+        }
+        store_session_result("copy_results", brief, lambda: build_copy_result(brief))
+
+    # Results live in session state, so reruns from other widgets re-render them
+    # instead of dropping back to an empty page or regenerating.
+    result = active_session_result("copy_results")
+    if result is None:
         st.info("Fill in the brief above and hit **Generate** to see copy.")
         return
-    if not product_name or not product_desc:
-        st.error("Please provide at least a product name and description.")
-        return
-
-    benefits_list = [ln.strip() for ln in benefits_text.splitlines() if ln.strip()]
-    headlines, sales_copy = generate_rule_based_copy(
-        product_name, product_desc, audience, tone, benefits_list, cta, awareness, master_style, niche
-    )
+    if not submitted:
+        st.caption(f"Showing your last generated brief: **{result['brief']['product_name']}**.")
 
     st.markdown("### 🎯 Headline Variations")
-    for i, h in enumerate(headlines, start=1):
+    for i, h in enumerate(result["headlines"], start=1):
         st.markdown(f"**{i}. {h}**")
 
+    st.markdown("### 🏆 Top-Ranked Headlines")
+    st.caption(
+        f"Best {len(result['ranked'])} of {result['n_candidates']:,} formula × benefit candidates, "
+        "scored for headline pull."
+    )
+    for i, (score, h) in enumerate(result["ranked"], start=1):
+        st.markdown(f"**{i}. {h}** — `{score:.1f}`")
+
     st.markdown("### 📜 Sales Copy Draft")
-    st.markdown(sales_copy)
+    st.markdown(result["sales_copy"])
 
     st.markdown("---")
-    st.markdown("### 🔍 Conversion Potential (Heuristic Score)")
-    analysis = analyze_copy_score(sales_copy)
+    render_copy_score_panel(st.session_state["copy_results_active"])
+
+    st.markdown("---")
+    render_enhance_panel(st.session_state["copy_results_active"])
+
+
+def build_copy_result(brief: Dict) -> Dict:
+    headlines, sales_copy = generate_rule_based_copy(
+        brief["product_name"],
+        brief["product_desc"],
+        brief["audience"],
+        brief["tone"],
+        brief["benefits_list"],
+        brief["cta"],
+        brief["awareness"],
+        brief["master_style"],
+        brief["niche"],
+    )
+    ranked, n_candidates = rank_headlines(
+        generate_headline_candidates(
+            brief["product_name"],
+            brief["audience"],
+            brief["benefits_list"] or choose_niche_defaults(brief["niche"])[1],
+        ),
+        brief["top_k"],
+    )
+    return {
+        "brief": brief,
+        "headlines": headlines,
+        "ranked": ranked,
+        "n_candidates": n_candidates,
+        "sales_copy": sales_copy,
+        "scores": {"Sales Copy Draft": timed_score(sales_copy)},
+        "enhanced": {},
+    }
+
+
+def timed_score(text: str) -> Dict[str, float]:
+    with timed("score"):
+        return analyze_copy_score(text)
+
+
+def render_score_metrics(analysis: Dict[str, float]):
     col_a, col_b, col_c = st.columns(3)
     with col_a:
         st.metric("Overall Score", f"{analysis['total_score']} / 100")
@@ -1233,36 +2338,45 @@ def page_generate_copy():
         st.metric("CTAs & Closers", f"{analysis['cta_score']:.1f}")
         st.metric("Specificity & Proof", f"{analysis['specificity_score']:.1f}")
 
-    st.markdown("---")
-    st.markdown("### 🧠 Smart Rewrite (AI-Enhanced)")
 
-    provider = st.selectbox(
-        "Enhance with",
-        ["OpenAI", "Claude (Anthropic)", "Groq (Llama)", "Cohere"],
-        index=1,
-        help="Select a model provider to rewrite and strengthen your copy (requires API key in secrets).",
-    )
-
-    if st.button("✨ Enhance This Copy"):
-        brief = f"""
-Niche: {niche}
-Master Style: {master_style}
-Awareness Level: {awareness}
-Desired Tone: {tone}
-Product: {product_name}
-Description: {product_desc}
-Audience: {audience}
-Benefits: {benefits_list}
-CTA: {cta}
+@st.fragment
+def render_copy_score_panel(key: str):
+    result = st.session_state.get("copy_results", {}).get(key)
+    if result is None:
+        return
+    st.markdown("### 🔍 Conversion Potential (Heuristic Score)")
+    versions = ["Sales Copy Draft"] + [f"AI-Enhanced ({p})" for p in result["enhanced"]]
+    version = st.radio("Score version", versions, horizontal=True, key=f"score_version_{key}")
+    if version not in result["scores"]:
+        provider = version[len("AI-Enhanced (") : -1]
+        result["scores"][version] = timed_score(result["enhanced"][provider])
+        emit_event(
+            "copy.scored",
+            {"product_name": result["brief"]["product_name"], "version": version, "score": dict(result["scores"][version])},
+        )
+    render_score_metrics(result["scores"][version])
+
+
+def build_enhance_prompt(brief: Dict, sales_copy: str) -> str:
+    brief_text = f"""
+Niche: {brief['niche']}
+Master Style: {brief['master_style']}
+Awareness Level: {brief['awareness']}
+Desired Tone: {brief['tone']}
+Product: {brief['product_name']}
+Description: {brief['product_desc']}
+Audience: {brief['audience']}
+Benefits: {brief['benefits_list']}
+CTA: {brief['cta']}
 """.strip()
 
-        prompt = f"""
+    return f"""
 You are a world-class direct-response copywriter.
 
 You will be given a brief and a sales page draft.
 
 <BRIEF>
-{brief}
+{brief_text}
 </BRIEF>
 
 <DRAFT>
@@ -1270,57 +2384,107 @@ You will be given a brief and a sales page draft.
 </DRAFT>
 
 Rewrite ONLY the draft to be clearer, more emotionally compelling, more specific (numbers, proof),
-and stronger in direct response persuasion (AIDA, PAS, strong CTAs). Maintain the style influence of {master_style},
-the niche {niche}, and the awareness level {awareness}. Do NOT include the brief or any commentary—return the improved copy only.
+and stronger in direct response persuasion (AIDA, PAS, strong CTAs). Maintain the style influence of {brief['master_style']},
+the niche {brief['niche']}, and the awareness level {brief['awareness']}. Do NOT include the brief or any commentary—return the improved copy only.
 """.strip()
 
-        if provider == "OpenAI":
-            ok, result = call_llm_openai(prompt)
-        elif provider == "Claude (Anthropic)":
-            ok, result = call_llm_claude(prompt)
-        elif provider == "Groq (Llama)":
-            ok, result = call_llm_groq(prompt)
-        else:
-            ok, result = call_llm_cohere(prompt)
 
-        if ok and result:
-            st.success(f"{provider} enhancement complete.")
-            st.markdown("#### 🧠 AI-Enhanced Version")
-            st.markdown(result)
+@st.fragment
+def render_enhance_panel(key: str):
+    result = st.session_state.get("copy_results", {}).get(key)
+    if result is None:
+        return
+    st.markdown("### 🧠 Smart Rewrite (AI-Enhanced)")
+
+    provider = st.selectbox(
+        "Enhance with",
+        ["OpenAI", "Claude (Anthropic)", "Groq (Llama)", "Cohere"],
+        index=1,
+        help="Select a model provider to rewrite and strengthen your copy (requires API key in secrets).",
+        key=f"enhance_provider_{key}",
+    )
+
+    done = st.session_state.pop(f"enhance_done_{key}", None)
+    if done:
+        st.success(f"{done} enhancement complete.")
+
+    if st.button("✨ Enhance This Copy", key=f"enhance_btn_{key}"):
+        prompt = build_enhance_prompt(result["brief"], result["sales_copy"])
+        with timed(f"llm:{provider}"):
+            if provider == "OpenAI":
+                ok, text = call_llm_openai(prompt)
+            elif provider == "Claude (Anthropic)":
+                ok, text = call_llm_claude(prompt)
+            elif provider == "Groq (Llama)":
+                ok, text = call_llm_groq(prompt)
+            else:
+                ok, text = call_llm_cohere(prompt)
+
+        if ok and text:
+            result["enhanced"][provider] = text
+            result["scores"].pop(f"AI-Enhanced ({provider})", None)
+            emit_event("copy.enhanced", {"product_name": result["brief"]["product_name"], "provider": provider, "copy": text})
+            # The score panel is its own fragment; a full rerun adds the new version to its choices.
+            st.session_state[f"enhance_done_{key}"] = provider
+            st.rerun(scope="app")
         else:
-            st.error(result or "Enhancement failed.")
+            st.error(text or "Enhancement failed.")
+
+    if provider in result["enhanced"]:
+        st.markdown("#### 🧠 AI-Enhanced Version")
+        st.markdown(result["enhanced"][provider])
 
 
 def page_email_sequences():
     render_header()
     st.subheader("📧 Email Sequences")
     st.markdown("Turn your core sales message into a multi-email sequence designed to warm up cold leads.")
+    st.caption("Spintax such as `{Stop|Quit|Don't} wasting money` is supported in every field.")
 
+    shared = shared_brief()
+    styles = style_names()
     with st.form("email_seq_form"):
-        product_name = st.text_input("Product / Service Name", "")
-        product_desc = st.text_area("Product / Service Description", "")
-        audience = st.text_area("Audience (copy from Generate Copy if you like)", "")
-        benefits_text = st.text_area("Key Benefits (one per line)", "")
-        master_style = st.selectbox("Master Style Influence", list(MASTER_FLAVORS.keys()), index=0)
+        product_name = st.text_input("Product / Service Name", shared.get("product_name", ""))
+        product_desc = st.text_area("Product / Service Description", shared.get("product_desc", ""))
+        audience = st.text_area("Audience (copy from Generate Copy if you like)", shared.get("audience", ""))
+        benefits_text = st.text_area("Key Benefits (one per line)", shared.get("benefits_text", ""))
+        master_style = st.selectbox("Master Style Influence", styles, index=brief_option_index(styles, "master_style"))
         awareness = st.selectbox(
             "Audience Awareness Level",
-            ["Unaware", "Problem-aware", "Solution-aware", "Product-aware", "Most-aware"],
-            index=2,
+            AWARENESS_LEVELS,
+            index=brief_option_index(AWARENESS_LEVELS, "awareness", 2),
         )
         num_emails = st.slider("Number of emails", 3, 10, 5)
         submitted = st.form_submit_button("📨 Generate Email Sequence")
 
-    if not submitted:
+    if submitted:
+        if not product_name or not product_desc:
+            st.error("Please enter at least a product name and description.")
+            return
+        update_shared_brief(
+            product_name=product_name,
+            product_desc=product_desc,
+            audience=audience,
+            benefits_text=benefits_text,
+            master_style=master_style,
+            awareness=awareness,
+        )
+        params = {
+            "product_name": product_name,
+            "product_desc": product_desc,
+            "audience": audience,
+            "benefits_list": parse_benefits(benefits_text),
+            "master_style": master_style,
+            "awareness": awareness,
+            "num_emails": num_emails,
+        }
+        store_session_result("email_results", params, lambda: generate_email_sequence(**params))
+
+    seq = active_session_result("email_results")
+    if seq is None:
         st.info("Fill in the fields and click **Generate Email Sequence**.")
         return
-    if not product_name or not product_desc:
-        st.error("Please enter at least a product name and description.")
-        return
 
-    benefits_list = [ln.strip() for ln in benefits_text.splitlines() if ln.strip()]
-    seq = generate_email_sequence(
-        product_name, product_desc, audience, benefits_list, master_style, awareness, num_emails
-    )
     st.markdown("### ✉️ Generated Emails")
     for idx, email in enumerate(seq, start=1):
         with st.expander(f"Email {idx}: {email['subject']}"):
@@ -1333,38 +2497,60 @@ def page_vsl_webinar():
     st.subheader("🎥 VSL & Webinar Scripts")
     st.markdown("Generate long-form VSL or webinar scripts inspired by the masters.")
 
+    shared = shared_brief()
+    niches = list(NICHE_DEFAULTS.keys())
+    styles = style_names()
     col1, col2, col3 = st.columns(3)
     with col1:
         script_type = st.selectbox("Script Type", ["VSL Script", "Webinar Script"], index=0)
     with col2:
-        niche = st.selectbox("Primary Niche", list(NICHE_DEFAULTS.keys()), index=0)
+        niche = st.selectbox("Primary Niche", niches, index=brief_option_index(niches, "niche"))
     with col3:
-        master_style = st.selectbox("Master Style Influence", list(MASTER_FLAVORS.keys()), index=0)
+        master_style = st.selectbox("Master Style Influence", styles, index=brief_option_index(styles, "master_style"))
 
     st.markdown("---")
     with st.form("vsl_webinar_form"):
-        product_name = st.text_input("Product / Offer Name", "")
-        product_desc = st.text_area("Product / Offer Description", "")
-        audience = st.text_area("Target Audience", "")
-        benefits_text = st.text_area("Core Benefits (one per line)", "")
+        product_name = st.text_input("Product / Offer Name", shared.get("product_name", ""))
+        product_desc = st.text_area("Product / Offer Description", shared.get("product_desc", ""))
+        audience = st.text_area("Target Audience", shared.get("audience", ""))
+        benefits_text = st.text_area("Core Benefits (one per line)", shared.get("benefits_text", ""))
         awareness = st.selectbox(
             "Audience Awareness Level",
-            ["Unaware", "Problem-aware", "Solution-aware", "Product-aware", "Most-aware"],
-            index=2,
+            AWARENESS_LEVELS,
+            index=brief_option_index(AWARENESS_LEVELS, "awareness", 2),
         )
         submitted = st.form_submit_button("🎬 Generate Script")
 
-    if not submitted:
+    if submitted:
+        if not product_name or not product_desc:
+            st.error("Please add at least a product name and description.")
+            return
+        update_shared_brief(
+            niche=niche,
+            master_style=master_style,
+            product_name=product_name,
+            product_desc=product_desc,
+            audience=audience,
+            benefits_text=benefits_text,
+            awareness=awareness,
+        )
+        params = {
+            "product_name": product_name,
+            "product_desc": product_desc,
+            "audience": audience,
+            "benefits_list": parse_benefits(benefits_text),
+            "master_style": master_style,
+            "awareness": awareness,
+            "niche": niche,
+            "script_type": script_type,
+        }
+        store_session_result("vsl_results", params, lambda: generate_vsl_webinar_script(**params))
+
+    script = active_session_result("vsl_results")
+    if script is None:
         st.info("Fill out the fields and click **Generate Script**.")
         return
-    if not product_name or not product_desc:
-        st.error("Please add at least a product name and description.")
-        return
 
-    benefits_list = [ln.strip() for ln in benefits_text.splitlines() if ln.strip()]
-    script = generate_vsl_webinar_script(
-        product_name, product_desc, audience, benefits_list, master_style, awareness, niche, script_type
-    )
     st.markdown("### 📜 Script Draft")
     st.text(script)
 
@@ -1373,34 +2559,156 @@ def page_classified_writer():
     render_header()
     st.subheader("📢 Classified Ad Writer")
     st.markdown("Create punchy classified ads tuned to your niche and master’s style.")
+    st.caption("Spintax such as `{Stop|Quit|Don't} wasting money` is supported in every field.")
 
+    shared = shared_brief()
+    niches = list(NICHE_DEFAULTS.keys())
+    styles = style_names()
     col_top1, col_top2 = st.columns(2)
     with col_top1:
-        niche = st.selectbox("Niche / Category", list(NICHE_DEFAULTS.keys()), index=0)
+        niche = st.selectbox("Niche / Category", niches, index=brief_option_index(niches, "niche"))
     with col_top2:
-        master_style = st.selectbox("Master Style Influence", list(MASTER_FLAVORS.keys()), index=0)
+        master_style = st.selectbox("Master Style Influence", styles, index=brief_option_index(styles, "master_style"))
 
     with st.form("classified_form"):
-        product_name = st.text_input("Product / Offer Name", "")
-        product_desc = st.text_area("Short Product Description", "")
-        audience = st.text_area("Audience (optional)", "")
-        cta = st.text_input("Call to Action", "Click here to learn more")
-        num_ads = st.slider("Number of variations", 1, 10, 3)
+        product_name = st.text_input("Product / Offer Name", shared.get("product_name", ""))
+        product_desc = st.text_area("Short Product Description", shared.get("product_desc", ""))
+        audience = st.text_area("Audience (optional)", shared.get("audience", ""))
+        cta = st.text_input("Call to Action", shared.get("cta", "Click here to learn more"))
+        num_ads = st.slider("Number of variations", 1, 25, 3)
+        bulk_count = st.number_input(
+            "Bulk export (unique ads for multi-site posting)", min_value=0, max_value=10000, step=100, value=0
+        )
+        st.markdown("**📍 Geo-Localized Bulk Mode (optional)**")
+        geo_file = st.file_uploader(
+            "City / region list (CSV: city, region; UTF-8 or Windows/Excel encoding)", type=["csv", "txt"]
+        )
+        geo_col1, geo_col2 = st.columns(2)
+        with geo_col1:
+            geo_fmt = st.selectbox("Output format", ["csv", "jsonl"], index=0)
+        with geo_col2:
+            geo_per_location = st.number_input("Ads per location", min_value=1, max_value=10, step=1, value=1)
         submitted = st.form_submit_button("📝 Generate Classified Ads")
 
-    if not submitted:
+    if submitted:
+        if not product_name or not product_desc:
+            st.error("You need at least a product name and description.")
+            return
+        update_shared_brief(
+            niche=niche,
+            master_style=master_style,
+            product_name=product_name,
+            product_desc=product_desc,
+            audience=audience,
+            cta=cta,
+        )
+        params = {
+            "product_name": product_name,
+            "product_desc": product_desc,
+            "audience": audience,
+            "niche": niche,
+            "master_style": master_style,
+            "cta": cta,
+        }
+        store_session_result(
+            "classified_results",
+            dict(params, num_ads=num_ads),
+            lambda: {
+                "ads": generate_classified_ads(num_ads=num_ads, **params),
+                "space": build_classified_variant_space(**params),
+            },
+        )
+
+    result = active_session_result("classified_results")
+    if result is None:
         st.info("Fill in the fields and click **Generate Classified Ads**.")
         return
-    if not product_name or not product_desc:
-        st.error("You need at least a product name and description.")
-        return
 
-    ads = generate_classified_ads(product_name, product_desc, audience, niche, master_style, cta, num_ads)
+    space = result["space"]
     st.markdown("### 🧾 Classified Ad Variations")
-    for i, ad in enumerate(ads, start=1):
+    st.caption(f"Variant space for this offer: {count_classified_variants(space):,} unique combinations.")
+    for i, ad in enumerate(result["ads"], start=1):
         with st.expander(f"Classified Ad {i}"):
             st.text(ad)
 
+    # Exports are one-off downloads, so they only run on an explicit submit.
+    if not submitted:
+        return
+    if bulk_count:
+        bulk = sample_unique_variants(space, int(bulk_count), first_index=0)
+        st.download_button(
+            f"⬇️ Download {len(bulk):,} Unique Ads (.txt)",
+            data="\n\n-----\n\n".join(bulk),
+            file_name="classified_ads_bulk.txt",
+            mime="text/plain",
+        )
+
+    if geo_file is not None:
+        render_geo_bulk_export(space, geo_file, geo_fmt, int(geo_per_location))
+
+
+GEO_BASE_AD_POOL = 250
+
+
+def upload_encoding(f, chunk_size: int = 1 << 20) -> str:
+    """"utf-8-sig" if the whole upload decodes as UTF-8, else "cp1252" (Excel's usual CSV export)."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    try:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            decoder.decode(chunk)
+        decoder.decode(b"", final=True)
+        return "utf-8-sig"
+    except UnicodeDecodeError:
+        return "cp1252"
+    finally:
+        f.seek(0)
+
+
+def render_geo_bulk_export(space: "Spintax", geo_file, fmt: str, per_location: int):
+    st.markdown("### 📍 Geo-Localized Ads")
+    base_ads = sample_unique_variants(space, GEO_BASE_AD_POOL, first_index=0)
+    status = st.empty()
+
+    def on_progress(done: int) -> None:
+        status.caption(f"Localized {done:,} locations…")
+
+    # Stream gzip-compressed to a per-run temp file so concurrent sessions never share an
+    # output path; the download is served from memory, and localized ads compress ~10x.
+    fd, out_path = tempfile.mkstemp(suffix=f".{fmt}.gz", prefix="classified_geo_")
+    os.close(fd)
+    try:
+        encoding = upload_encoding(geo_file)
+        try:
+            with gzip.open(out_path, "wt", encoding="utf-8", newline="") as out:
+                reader = io.TextIOWrapper(geo_file, encoding=encoding, errors="replace", newline="")
+                n_locations = geo_bulk.stream_localized_ads(
+                    base_ads,
+                    geo_bulk.read_locations(reader),
+                    out,
+                    fmt=fmt,
+                    per_location=per_location,
+                    progress=on_progress,
+                )
+        except (UnicodeDecodeError, csv.Error) as e:
+            status.empty()
+            st.error(f"Couldn't read that location file: {e}")
+            return
+
+        if not n_locations:
+            status.empty()
+            st.warning("No locations found in that file. Expected a CSV with a city column (and optional region).")
+            return
+        status.success(f"Localized {n_locations:,} locations × {per_location} ad(s) → {fmt.upper()} (gzip).")
+        with open(out_path, "rb") as f:
+            st.download_button(
+                f"⬇️ Download Geo-Localized Ads (.{fmt}.gz)",
+                data=f,
+                file_name=f"classified_ads_geo.{fmt}.gz",
+                mime="application/gzip",
+            )
+    finally:
+        os.remove(out_path)
+
 
 def page_manual_assets():
     render_header()
@@ -1441,6 +2749,73 @@ def page_manual_assets():
             ]
             for i, item in enumerate(outline, start=1):
                 st.write(f"{i}. {item}")
+            st.session_state["lead_magnet"] = {"title": title, "outline": outline}
+
+    st.markdown("### 📘 Copy Master Manual")
+    if package_builder is None:
+        st.info("Install `reportlab` to download the manual as a PDF.")
+        return
+    st.caption("Built in memory when you click, so every download is fresh and nothing is written to the server.")
+    col1, col2 = st.columns(2)
+    # Callables defer the build to the click instead of every rerun.
+    col1.download_button(
+        "⬇️ Download Manual (PDF)",
+        data=package_builder.pdf_bytes,
+        file_name=package_builder.PDF_NAME,
+        mime="application/pdf",
+        on_click="ignore",
+    )
+    col2.download_button(
+        "⬇️ Download Package (ZIP)",
+        data=package_builder.package_bytes,
+        file_name=package_builder.PACKAGE_ZIP_NAME,
+        mime="application/zip",
+        on_click="ignore",
+    )
+    render_campaign_manual()
+
+
+def campaign_manual_sections() -> List[Dict]:
+    """Manual sections from everything generated this session (latest brief per generator)."""
+    sections: List[Dict] = []
+    copy_result = active_session_result("copy_results")
+    if copy_result:
+        sections.append({"kind": "headlines", "title": "Headlines", "content": copy_result["headlines"]})
+        sections.append(
+            {"kind": "headlines", "title": "Top-Ranked Headlines", "content": [h for _, h in copy_result["ranked"]]}
+        )
+        sections.append({"kind": "sales_copy", "title": "Sales Copy", "content": copy_result["sales_copy"]})
+        for provider, text in copy_result["enhanced"].items():
+            sections.append({"kind": "sales_copy", "title": f"Sales Copy (AI-Enhanced, {provider})", "content": text})
+    emails = active_session_result("email_results")
+    if emails:
+        sections.append({"kind": "emails", "title": "Email Sequence", "content": emails})
+    script = active_session_result("vsl_results")
+    if script:
+        sections.append({"kind": "vsl", "title": "VSL / Webinar Script", "content": script})
+    classified = active_session_result("classified_results")
+    if classified:
+        sections.append({"kind": "classified", "title": "Classified Ads", "content": classified["ads"]})
+    lead_magnet = st.session_state.get("lead_magnet")
+    if lead_magnet:
+        sections.append({"kind": "lead_magnet", "title": "Lead Magnet", "content": lead_magnet})
+    return sections
+
+
+def render_campaign_manual():
+    sections = campaign_manual_sections()
+    if not sections:
+        st.caption("Generate copy, emails, scripts, ads or a lead magnet to add them to a full campaign manual.")
+        return
+    product = shared_brief().get("product_name") or "Your Offer"
+    st.caption("Campaign manual sections: " + ", ".join(s["title"] for s in sections) + ".")
+    st.download_button(
+        "⬇️ Download Campaign Manual (PDF)",
+        data=lambda: package_builder.manual_bytes(sections, title=product, subtitle="Campaign Manual"),
+        file_name=f"{re.sub(r'[^A-Za-z0-9]+', '_', product).strip('_') or 'Campaign'}_Manual.pdf",
+        mime="application/pdf",
+        on_click="ignore",
+    )
 
 
 def page_traffic_networks():
@@ -1450,40 +2825,11 @@ def page_traffic_networks():
         "Links to affiliate networks, banner/solo ad platforms, and free classified sites (low/no special approval)."
     )
 
-    st.markdown("### 💰 Affiliate Networks")
-    affiliate_networks = [
-        {"name": "ClickBank", "url": "https://accounts.clickbank.com/signup/", "note": "Huge digital marketplace."},
-        {"name": "JVZoo", "url": "https://www.jvzoo.com/register", "note": "Digital products, IM, software."},
-        {"name": "WarriorPlus", "url": "https://warriorplus.com/user/new", "note": "IM and biz-op offers."},
-        {"name": "Digistore24", "url": "https://www.digistore24.com/signup", "note": "Global marketplace."},
-        {
-            "name": "MaxBounty",
-            "url": "https://affiliates.maxbounty.com/register",
-            "note": "Top CPA network (application required).",
-        },
-        {"name": "CJ", "url": "https://signup.cj.com/member/signup/publisher/", "note": "Big brand offers."},
-        {"name": "Impact", "url": "https://impact.com/partners/affiliate-partners/", "note": "Many major brands."},
-        {"name": "PartnerStack", "url": "https://dash.partnerstack.com/", "note": "SaaS and software programs."},
-    ]
-    for n in affiliate_networks:
-        st.markdown(f"- [{n['name']}]({n['url']}) – {n['note']}")
-
-    st.markdown("---")
-    st.markdown("### 📊 Banner & Solo Ad / Traffic Platforms")
-    traffic_platforms = [
-        {"name": "Udimi (Solo Ads)", "url": "https://udimi.com/signup", "note": "Buy solo ads from list owners."},
-        {"name": "TrafficForMe", "url": "https://www.trafficforme.net/", "note": "Managed email traffic."},
-        {"name": "PropellerAds", "url": "https://partners.propellerads.com/#/auth/signUp", "note": "Push, pop, display."},
-        {"name": "Adsterra", "url": "https://adsterra.com/", "note": "Global ad network."},
-        {"name": "RichAds", "url": "https://my.richads.com/signup", "note": "Push, pops, and more."},
-        {"name": "HilltopAds", "url": "https://hilltopads.com/signup", "note": "Display formats network."},
-        {"name": "7Search PPC", "url": "https://www.7searchppc.com/", "note": "Self-service PPC network."},
-        {"name": "20DollarBanners", "url": "https://www.20dollarbanners.com/", "note": "Affordable custom banner design."},
-    ]
-    for p in traffic_platforms:
-        st.markdown(f"- [{p['name']}]({p['url']}) – {p['note']}")
+    for section in load_reference_data("traffic_networks")["sections"]:
+        st.markdown(f"### {section['title']}")
+        st.markdown(link_list_markdown("traffic_networks", section["id"]))
+        st.markdown("---")
 
-    st.markdown("---")
     st.markdown(
         "### 📦 Lead Magnet Hosting\n"
         "- **MediaFire** – free file hosting for your PDFs: "
@@ -1500,455 +2846,578 @@ def page_classified_sites():
         "organized by section so you can turn offers into a serious distribution machine."
     )
 
-    with st.expander("📊 Top 20 Global High-Traffic Sites", expanded=True):
-        st.markdown(
-            """
-1. ⭐ **Craigslist** – GENERAL, HEALTH, LOCAL – ~157M visits  
-   👉 <https://www.craigslist.org>  
-
-2. ⭐ **Facebook Marketplace** – GENERAL, HEALTH, LOCAL – ~1.2B users  
-   👉 <https://www.facebook.com/marketplace>  
-
-3. **eBay Classifieds** – GENERAL – 50M+ visits  
-   👉 <https://www.ebay.com/classifieds>  
-
-4. ⭐ **Oodle** – GENERAL, HEALTH – 15M+ visits  
-   👉 <https://www.oodle.com>  
-
-5. **Gumtree (UK/AU)** – GENERAL – 30M+ visits  
-   👉 <https://www.gumtree.com>  
-
-6. **Locanto** – GENERAL – 8M+ visits  
-   👉 <https://www.locanto.com>  
-
-7. **Geebo** – GENERAL – 2M+ visits  
-   👉 <https://www.geebo.com>  
-
-8. **ClassifiedAds** – GENERAL – 5M+ visits  
-   👉 <https://www.classifiedads.com>  
-
-9. **Hoobly** – GENERAL – 3M+ visits  
-   👉 <https://www.hoobly.com>  
-
-10. **PennySaverUSA** – GENERAL – 4M+ visits  
-    👉 <https://www.pennysaverusa.com>  
-
-11. **Advertise Era** – GENERAL – 1M+ visits  
-    👉 <https://www.advertiseera.com>  
-
-12. **WallClassifieds** – GENERAL – 800K+ visits  
-    👉 <https://www.wallclassifieds.com>  
-
-13. **AdPost** – GENERAL – 2M+ visits  
-    👉 <https://www.adpost.com>  
-
-14. **DomesticSale** – GENERAL – 1.5M+ visits  
-    👉 <https://www.domesticsale.com>  
-
-15. **Recycler** – GENERAL – 3M+ visits  
-    👉 <https://www.recycler.com>  
-
-16. **Bedpage** – GENERAL – 10M+ visits  
-    👉 <https://www.bedpage.com>  
-
-17. **ClassifiedsFactor** – GENERAL – 500K+ visits  
-    👉 <https://www.classifiedsfactor.com>  
-
-18. **USNetAds** – GENERAL – 1M+ visits  
-    👉 <https://www.usnetads.com>  
-
-19. **Yakaz** – GENERAL – 2M+ visits  
-    👉 <https://www.yakaz.com>  
-
-20. **eBizMBA** – SERVICES – 500K+ visits  
-    👉 <https://www.ebizmba.com>  
-            """
-        )
-
-    with st.expander("🇺🇸 USA-Focused Classified Sites (21–40)"):
-        st.markdown(
-            """
-21. ⭐ **OfferUp** – GENERAL, HEALTH, LOCAL – 20M+ visits  
-    👉 <https://offerup.com>  
-
-22. **5Miles** – GENERAL, LOCAL – 5M+ visits  
-    👉 <https://www.5miles.com>  
-
-23. ⭐ **VarageSale** – GENERAL, HEALTH, LOCAL – 3M+ visits  
-    👉 <https://www.varagesale.com>  
-
-24. **Trovit** – GENERAL – 15M+ visits  
-    👉 <https://www.trovit.com>  
-
-25. **Vast** – GENERAL – 2M+ visits  
-    👉 <https://www.vast.com>  
-
-26. **AdLandPro** – SERVICES – 800K+ visits  
-    👉 <https://www.adlandpro.com>  
-
-27. **USFreeAds** – GENERAL – 1.5M+ visits  
-    👉 <https://www.usfreeads.com>  
-
-28. **AmericanListed** – GENERAL – 2M+ visits  
-    👉 <https://www.americanlisted.com>  
-
-29. **FreeAdsTime** – GENERAL – 600K+ visits  
-    👉 <https://www.freeadstime.org>  
-
-30. **Classi4U** – GENERAL – 400K+ visits  
-    👉 <https://www.classi4u.com>  
-
-31. **Adoos** – GENERAL – 1M+ visits  
-    👉 <https://www.adoos.com>  
-
-32. **Click.in** – GENERAL – 5M+ visits  
-    👉 <https://www.click.in>  
-
-33. **BuySellCommunity** – GENERAL – 300K+ visits  
-    👉 <https://www.buysellcommunity.com>  
-
-34. **iNetGiant** – GENERAL – 800K+ visits  
-    👉 <https://www.inetgiant.com>  
-
-35. **SaleSpider** – SERVICES – 500K+ visits  
-    👉 <https://www.salespider.com>  
-
-36. **Kugli** – GENERAL – 600K+ visits  
-    👉 <https://www.kugli.com>  
-
-37. **BackPageAd** – GENERAL – 2M+ visits  
-    👉 <https://www.backpagead.com>  
-
-38. **ClassifiedSubmissions** – GENERAL – 400K+ visits  
-    👉 <https://www.classifiedsubmissions.com>  
-
-39. **AdsGlobe** – GENERAL – 500K+ visits  
-    👉 <https://www.adsglobe.com>  
-
-40. **FreeClassifiedsSite** – GENERAL – 300K+ visits  
-    👉 <https://www.freeclassifiedssite.com>  
-            """
-        )
-
-    with st.expander("🌍 International Classified Sites (41–55)"):
-        st.markdown(
-            """
-41. **OLX (Global)** – GENERAL – 300M+ visits  
-    👉 <https://www.olx.com>  
-
-42. **Quikr (India)** – GENERAL – 30M+ visits  
-    👉 <https://www.quikr.com>  
-
-43. **Vivastreet** – GENERAL – 25M+ visits  
-    👉 <https://www.vivastreet.com>  
+    # Only the chosen section is sent to the browser; the rest of the directory stays server-side.
+    data = load_reference_data("classified_sites")
+    titles = {
+        "directory": "🔎 Site Directory",
+        "tools": data["tools"]["title"],
+        "tips": data["tips"]["title"],
+    }
+    section_id = st.radio(
+        "Section",
+        list(titles),
+        format_func=titles.get,
+        horizontal=True,
+        label_visibility="collapsed",
+        key="classified_sites_section",
+    )
+    st.markdown(f"#### {titles[section_id]}")
+    if section_id == "directory":
+        render_site_directory()
+    else:
+        st.markdown(classified_section_markdown(section_id))
+
+
+@st.fragment
+def render_site_directory():
+    directory = get_site_directory()
+    text = st.text_input("Search sites", "", placeholder="e.g. gumtree, uk, freeads", key="site_search")
+    c1, c2, c3, c4 = st.columns(4)
+    filters = {
+        "tag": c1.multiselect("Category", directory.options("tag"), key="site_tags"),
+        "region": c2.multiselect("Region", directory.options("region"), key="site_regions"),
+        "band": c3.multiselect("Traffic", directory.options("band"), key="site_bands"),
+        "section": c4.multiselect(
+            "List",
+            directory.options("section"),
+            format_func=directory.section_titles.get,
+            key="site_sections",
+        ),
+    }
+    c5, c6 = st.columns([1, 2])
+    priority_only = c5.checkbox("⭐ Start-here sites only", key="site_priority")
+    sort = c6.selectbox("Sort by", list(SITE_SORTS), key="site_sort")
+
+    sites = directory.query(text, filters, priority_only, sort)
+    st.caption(f"{len(sites)} of {len(directory.sites)} sites · ⭐ = start here")
+    if not sites:
+        st.info("No sites match these filters.")
+        return
+    st.dataframe(
+        [
+            {
+                "#": s["rank"],
+                "⭐": "⭐" if s["priority"] else "",
+                "Site": s["name"],
+                "Category": ", ".join(s["tags"]),
+                "Region": s["region"],
+                "Traffic": s["traffic"],
+                "Link": s["url"],
+            }
+            for s in sites
+        ],
+        column_config={"Link": st.column_config.LinkColumn("Link")},
+        hide_index=True,
+    )
 
-44. **Expatriates** – GENERAL – 2M+ visits  
-    👉 <https://www.expatriates.com>  
 
-45. **AddonFace** – GENERAL – 500K+ visits  
-    👉 <https://www.addonface.com>  
+AB_TEST_TYPES = ["Headline", "Sales Page / VSL", "Email Subject", "Display Ad / Banner", "Classified Ad", "Other"]
+AB_COUNT_COLUMNS = ["Impressions", "Clicks", "Conversions"]
+AB_DRAWS = 1_000_000
 
-46. **Cifiyah** – GENERAL – 400K+ visits  
-    👉 <https://www.cifiyah.com>  
 
-47. **Kijiji (Canada)** – GENERAL – 20M+ visits  
-    👉 <https://www.kijiji.ca>  
+def ab_default_variants(test_type: str) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "Name": [f"{test_type} A", f"{test_type} B"],
+            "Copy / Notes": ["", ""],
+            "Impressions": [0, 0],
+            "Clicks": [0, 0],
+            "Conversions": [0, 0],
+            "Cost ($)": [0.0, 0.0],
+            "Revenue ($)": [0.0, 0.0],
+        }
+    )
 
-48. **FreeAdsUK** – GENERAL – 1M+ visits  
-    👉 <https://www.freeadsuk.co.uk>  
 
-49. **Friday-Ad (UK)** – GENERAL – 2M+ visits  
-    👉 <https://www.friday-ad.co.uk>  
+def ab_column_config() -> Dict:
+    config = {col: st.column_config.NumberColumn(col, min_value=0, step=1) for col in AB_COUNT_COLUMNS}
+    for col in ("Cost ($)", "Revenue ($)"):
+        config[col] = st.column_config.NumberColumn(col, min_value=0.0, format="$%.2f")
+    return config
 
-50. **AdTrader (UK)** – GENERAL – 1.5M+ visits  
-    👉 <https://www.adtrader.co.uk>  
 
-51. **FreeAds (UK)** – GENERAL – 3M+ visits  
-    👉 <https://www.freeads.co.uk>  
+def page_ab_split_tester():
+    render_header()
+    st.subheader("🧪 A/B Split Tester")
+    st.markdown("Compare two or more variants with CTR, CVR, EPC, and ROI — and whether the difference is real.")
 
-52. **PostAdverts (UK)** – GENERAL – 800K+ visits  
-    👉 <https://www.postadverts.com>  
+    results_tab, planner_tab, bandit_tab, sequential_tab = st.tabs(
+        ["📊 Test Results", "📐 Sample Size Planner", "🎰 Live Traffic Allocator", "📡 Sequential Test"]
+    )
+    with results_tab:
+        render_ab_results()
+    with planner_tab:
+        render_sample_size_planner()
+    with bandit_tab:
+        render_bandit_allocator()
+    with sequential_tab:
+        render_sequential_test()
 
-53. **Gumtree Australia** – GENERAL – 15M+ visits  
-    👉 <https://www.gumtree.com.au>  
 
-54. **TradeMe (New Zealand)** – GENERAL – 5M+ visits  
-    👉 <https://www.trademe.co.nz>  
+def render_ab_results():
+    test_type = st.selectbox("Test Type", AB_TEST_TYPES, index=0)
 
-55. **DealMarkaz (Pakistan)** – GENERAL – 1M+ visits  
-    👉 <https://www.dealmarkaz.pk>  
-            """
+    with st.form("ab_test_form"):
+        st.markdown("### Variant Details")
+        st.caption("The first row is the control. Add rows to test more than two variants.")
+        variants = st.data_editor(
+            ab_default_variants(test_type),
+            num_rows="dynamic",
+            hide_index=True,
+            column_config=ab_column_config(),
+            key=f"ab_variants_{test_type}",
         )
+        c1, c2 = st.columns(2)
+        metric = c1.selectbox("Metric to test", list(ab_testing.RATE_METRICS), index=0)
+        confidence = c2.select_slider("Confidence", [90, 95, 99], value=95, format_func=lambda v: f"{v}%")
+        submitted = st.form_submit_button("📊 Calculate A/B Results")
 
-    with st.expander("💼 Business & Services Directories (56–70)"):
-        st.markdown(
-            """
-56. **Sulekha** – SERVICES – 5M+ visits  
-    👉 <https://www.sulekha.com>  
-
-57. **Thumbtack** – SERVICES – 30M+ visits  
-    👉 <https://www.thumbtack.com>  
-
-58. **Angie's List** – SERVICES – 10M+ visits  
-    👉 <https://www.angieslist.com>  
-
-59. **Bark** – SERVICES – 8M+ visits  
-    👉 <https://www.bark.com>  
-
-60. **HomeAdvisor** – SERVICES – 25M+ visits  
-    👉 <https://www.homeadvisor.com>  
-
-61. **Porch** – SERVICES – 5M+ visits  
-    👉 <https://www.porch.com>  
-
-62. **Houzz** – SERVICES – 40M+ visits  
-    👉 <https://www.houzz.com>  
-
-63. **ServiceMagic** – SERVICES – 3M+ visits  
-    👉 <https://www.servicemagic.com>  
-
-64. **Guru** – SERVICES – 2M+ visits  
-    👉 <https://www.guru.com>  
-
-65. **Freelancer** – SERVICES – 50M+ visits  
-    👉 <https://www.freelancer.com>  
-
-66. **Upwork** – SERVICES – 70M+ visits  
-    👉 <https://www.upwork.com>  
+    if not submitted:
+        st.info("Fill in the numbers for each variant, then click **Calculate**.")
+        return
 
-67. **Fiverr** – SERVICES – 80M+ visits  
-    👉 <https://www.fiverr.com>  
+    variants = variants.dropna(subset=["Name"]).fillna(0).reset_index(drop=True)
+    if len(variants) < 2:
+        st.error("Add at least two variants.")
+        return
+    successes_col, trials_col = ab_testing.RATE_METRICS[metric]
+    x = variants[successes_col].to_numpy(dtype="int64")
+    n = variants[trials_col].to_numpy(dtype="int64")
+    if (x > n).any():
+        st.error(f"{successes_col} can't exceed {trials_col} for any variant.")
+        return
 
-68. **PeoplePerHour** – SERVICES – 3M+ visits  
-    👉 <https://www.peopleperhour.com>  
+    kpis = ab_testing.variant_kpis(
+        variants["Impressions"], variants["Clicks"], variants["Conversions"], variants["Cost ($)"], variants["Revenue ($)"]
+    )
+    st.markdown("### 📋 Variant KPIs")
+    st.dataframe(
+        pd.DataFrame({"Variant": variants["Name"], **{k: v.round(2) for k, v in kpis.items()}}),
+        hide_index=True,
+    )
 
-69. **TaskRabbit** – SERVICES – 5M+ visits  
-    👉 <https://www.taskrabbit.com>  
+    with timed("ab:significance"):
+        freq = ab_testing.z_test_vs_control(x, n)
+        bayes = ab_testing.bayes_vs_control(x, n, draws=AB_DRAWS)
+    # Bonferroni: every challenger is compared with the control.
+    alpha = (1 - confidence / 100) / (len(variants) - 1)
+    significant = freq["p"] < alpha
+
+    st.markdown(f"### 🔬 Significance ({metric})")
+    st.dataframe(
+        pd.DataFrame(
+            {
+                "Variant": variants["Name"],
+                f"{metric} %": (freq["rate"] * 100).round(3),
+                "Lift vs Control %": (freq["lift"] * 100).round(2),
+                "z": freq["z"].round(3),
+                "p-value": freq["p"].round(4),
+                "Significant": ["—"] + ["✅" if s else "❌" for s in significant[1:]],
+                "P(Beat Control)": bayes["p_beat_control"].round(4),
+                "P(Best)": bayes["p_best"].round(4),
+                "Expected Loss": bayes["expected_loss"].round(5),
+            }
+        ),
+        hide_index=True,
+    )
+    st.caption(
+        f"z-tests are two-sided against the control at α = {alpha:.4f}"
+        + (" (Bonferroni-adjusted for several challengers)" if len(variants) > 2 else "")
+        + f". Bayesian columns use Beta(1, 1) priors and {AB_DRAWS:,} posterior draws."
+    )
 
-70. **Zaarly** – SERVICES – 500K+ visits  
-    👉 <https://www.zaarly.com>  
-            """
+    winners = [i for i in range(1, len(variants)) if significant[i] and freq["lift"][i] > 0]
+    losers = [i for i in range(1, len(variants)) if significant[i] and freq["lift"][i] < 0]
+    if winners:
+        best = max(winners, key=lambda i: bayes["p_best"][i])
+        st.success(
+            f"🏆 **{variants['Name'][best]}** beats the control on {metric} "
+            f"(+{freq['lift'][best] * 100:.1f}%, p = {freq['p'][best]:.4f})."
         )
+    elif losers:
+        names = ", ".join(f"**{variants['Name'][i]}**" for i in losers)
+        st.warning(f"No challenger beats the control on {metric}; {names} did significantly worse.")
+    else:
+        st.info("No significant difference yet — keep the test running or send more traffic.")
 
-    with st.expander("🎯 Specialty / Niche & Local (71–80)"):
-        st.markdown(
-            """
-71. ⭐ **Nextdoor** – LOCAL, HEALTH – 37M+ visits  
-    👉 <https://www.nextdoor.com>  
-
-72. **Bookoo** – LOCAL – 2M+ visits  
-    👉 <https://www.bookoo.com>  
-
-73. **GarageSaleHunter** – LOCAL – 500K+ visits  
-    👉 <https://www.garagesalehunter.com>  
 
-74. **YardSaleSearch** – LOCAL – 800K+ visits  
-    👉 <https://www.yardsalesearch.com>  
+PLANNER_BASELINES = "1, 2, 3, 5, 8, 10"
+PLANNER_MDES = "5, 10, 15, 20, 30, 50"
+PLANNER_POWERS = [70, 80, 85, 90, 95]
 
-75. **PetClassifieds** – GENERAL – 300K+ visits  
-    👉 <https://www.petclassifieds.us>  
 
-76. **PuppyFind** – GENERAL – 2M+ visits  
-    👉 <https://www.puppyfind.com>  
+def parse_percent_list(text: str, upper: float = 100.0) -> List[float]:
+    """Comma/space-separated percentages as sorted unique fractions; bad or out-of-range entries are dropped."""
+    values = set()
+    for token in re.split(r"[,\s;]+", text):
+        try:
+            v = float(token.strip().rstrip("%"))
+        except ValueError:
+            continue
+        if 0 < v < upper:
+            values.add(v / 100)
+    return sorted(values)
 
-77. **ApartmentGuide** – SERVICES – 10M+ visits  
-    👉 <https://www.apartmentguide.com>  
 
-78. **Zillow** – SERVICES – 200M+ visits  
-    👉 <https://www.zillow.com>  
+@st.fragment
+def render_sample_size_planner():
+    st.markdown(
+        "How much traffic a test needs before the numbers mean anything. Every baseline × lift × power "
+        "combination is computed at once; change any input and the grid updates."
+    )
+    c1, c2 = st.columns(2)
+    baselines = parse_percent_list(c1.text_input("Baseline conversion rates %", PLANNER_BASELINES, key="plan_baselines"))
+    mdes = parse_percent_list(
+        c2.text_input("Minimum detectable lift % (relative)", PLANNER_MDES, key="plan_mdes"), upper=1000.0
+    )
+    c1, c2, c3, c4 = st.columns(4)
+    powers = sorted(c1.multiselect("Power %", PLANNER_POWERS, default=[80, 90], key="plan_powers"))
+    confidence = c2.select_slider("Confidence", [90, 95, 99], value=95, format_func=lambda v: f"{v}%", key="plan_conf")
+    variants = c3.number_input("Variants (incl. control)", min_value=2, max_value=20, value=2, key="plan_variants")
+    daily = c4.number_input("Daily visitors (all variants)", min_value=1, value=1000, step=100, key="plan_daily")
+    if not baselines or not mdes or not powers:
+        st.info("Enter at least one baseline rate, one lift and one power level.")
+        return
 
-79. **Trulia** – SERVICES – 30M+ visits  
-    👉 <https://www.trulia.com>  
+    with timed("ab:planner"):
+        n = ab_testing.sample_size_grid(baselines, mdes, [p / 100 for p in powers], confidence, int(variants))
+    b_idx, m_idx, p_idx = np.indices(n.shape).reshape(3, -1)
+    per_variant = n.ravel()
+    grid = pd.DataFrame(
+        {
+            "Baseline %": np.round(np.asarray(baselines)[b_idx] * 100, 3),
+            "Lift %": np.round(np.asarray(mdes)[m_idx] * 100, 2),
+            "Power %": np.asarray(powers)[p_idx],
+            "Per Variant": per_variant,
+            "Total": per_variant * variants,
+            "Days": np.ceil(per_variant * variants / daily),
+        }
+    )
 
-80. **Realtor.com** – SERVICES – 100M+ visits  
-    👉 <https://www.realtor.com>  
-            """
+    heat_power = st.selectbox("Heatmap power", powers, index=0, format_func=lambda v: f"{v}%", key="plan_heat_power")
+    heat = grid[grid["Power %"] == heat_power].dropna(subset=["Days"])
+    st.altair_chart(
+        alt.Chart(heat)
+        .mark_rect()
+        .encode(
+            x=alt.X("Lift %:O", title="Minimum detectable lift %"),
+            y=alt.Y("Baseline %:O", title="Baseline conversion rate %", sort="descending"),
+            color=alt.Color("Days:Q", scale=alt.Scale(type="log", scheme="orangered")),
+            tooltip=["Baseline %", "Lift %", "Per Variant", "Total", "Days"],
         )
+        + alt.Chart(heat)
+        .mark_text(fontSize=11)
+        .encode(x="Lift %:O", y=alt.Y("Baseline %:O", sort="descending"), text="Days:Q"),
+    )
+    st.dataframe(
+        grid,
+        hide_index=True,
+        column_config={
+            "Per Variant": st.column_config.NumberColumn(format="%d"),
+            "Total": st.column_config.NumberColumn(format="%d"),
+            "Days": st.column_config.NumberColumn(format="%d"),
+        },
+    )
+    st.caption(
+        "Two-sided two-proportion z-test"
+        + (f", α split across {variants - 1} challengers" if variants > 2 else "")
+        + ". Blank cells would push the rate past 100%. Sequential tests usually stop earlier on big lifts."
+    )
 
-    with st.expander("➕ Additional High-DA Sites (81–100)"):
-        st.markdown(
-            """
-81. **ClickIndia** – GENERAL – 5M+ visits  
-    👉 <https://www.clickindia.com>  
-
-82. **IndiaList** – GENERAL – 2M+ visits  
-    👉 <https://www.indialist.com>  
-
-83. **Khojle** – GENERAL – 1M+ visits  
-    👉 <https://www.khojle.in>  
-
-84. **PostJobFree** – SERVICES – 1.5M+ visits  
-    👉 <https://www.postjobfree.com>  
-
-85. **H1Ad** – GENERAL – 300K+ visits  
-    👉 <https://www.h1ad.com>  
-
-86. **GiganticList** – GENERAL – 600K+ visits  
-    👉 <https://www.giganticlist.com>  
-
-87. **Claz.org** – GENERAL – 400K+ visits  
-    👉 <https://www.claz.org>  
-
-88. **SaudiAds** – GENERAL – 800K+ visits  
-    👉 <https://www.saudiads.com>  
-
-89. **TuffClassified** – GENERAL – 500K+ visits  
-    👉 <https://www.tuffclassified.com>  
-
-90. **Classifieds24x7** – GENERAL – 300K+ visits  
-    👉 <https://www.classifieds24x7.com>  
-
-91. **MyFavoriteClassifieds** – GENERAL – 200K+ visits  
-    👉 <https://www.myfavoriteclassifieds.com>  
-
-92. **MaxBizPages** – SERVICES – 400K+ visits  
-    👉 <https://www.maxbizpages.com>  
-
-93. **AskAds** – GENERAL – 300K+ visits  
-    👉 <https://www.askads.com>  
-
-94. **WebClassifieds** – GENERAL – 250K+ visits  
-    👉 <https://www.webclassifieds.us>  
-
-95. **FreeAdsList** – GENERAL – 350K+ visits  
-    👉 <https://www.freeadslist.com>  
 
-96. **AdSitePro** – GENERAL – 200K+ visits  
-    👉 <https://www.adsitepro.com>  
+BANDIT_DEFAULT_ARMS = ["Variant A", "Variant B", "Variant C"]
 
-97. **ClickBazaar** – GENERAL – 500K+ visits  
-    👉 <https://www.clickbazaar.com>  
 
-98. **GlobalFreeClassifiedAds** – GENERAL – 300K+ visits  
-    👉 <https://www.globalfreeclassifiedads.com>  
+def bandit_arm_sources() -> Dict[str, List[str]]:
+    """Variants generated earlier this session, usable as bandit arms."""
+    sources: Dict[str, List[str]] = {}
+    copy_result = active_session_result("copy_results")
+    if copy_result:
+        sources["Top-ranked headlines"] = [h for _, h in copy_result["ranked"]]
+    emails = active_session_result("email_results")
+    if emails:
+        sources["Email subject lines"] = [e["subject"] for e in emails]
+    classified = active_session_result("classified_results")
+    if classified:
+        sources["Classified ad titles"] = [ad.split("\n", 1)[0] for ad in classified["ads"]]
+    return {label: list(dict.fromkeys(names)) for label, names in sources.items()}
 
-99. **TopClassifieds** – GENERAL – 250K+ visits  
-    👉 <https://www.topclassifieds.com>  
 
-100. **ClassifiedAdsUSA** – GENERAL – 400K+ visits  
-     👉 <https://www.classifiedadsusa.com>  
-            """
-        )
+def render_bandit_allocator():
+    st.markdown(
+        "Thompson sampling sends each next impression to the variant most likely to be best, "
+        "so losing variants get less spend as results come in. Enter results so far, then split the next batch."
+    )
+    sources = bandit_arm_sources()
+    source = st.selectbox("Arms", ["Manual"] + list(sources), key="bandit_source")
+    names = sources.get(source, BANDIT_DEFAULT_ARMS)
+    arms = st.data_editor(
+        pd.DataFrame({"Arm": names, "Impressions": [0] * len(names), "Conversions": [0] * len(names)}),
+        num_rows="dynamic",
+        hide_index=True,
+        column_config={
+            "Impressions": st.column_config.NumberColumn("Impressions", min_value=0, step=1),
+            "Conversions": st.column_config.NumberColumn("Conversions", min_value=0, step=1),
+        },
+        key=f"bandit_arms_{source}",
+    )
+    next_n = st.number_input("Impressions to allocate next", min_value=1, value=1000, step=100, key="bandit_next")
 
-    with st.expander("🤖 Automated Posting Tools & Software"):
-        st.markdown(
-            """
-- **ClassifiedSubmissions.com** – Web-based posting to 100+ sites, scheduling  
-  👉 <https://www.classifiedsubmissions.com>  
+    arms = arms.dropna(subset=["Arm"]).fillna(0).drop_duplicates("Arm").reset_index(drop=True)
+    if arms.empty:
+        st.info("Add at least one arm.")
+        return
+    shown = arms["Impressions"].to_numpy(dtype="int64")
+    won = arms["Conversions"].to_numpy(dtype="int64")
+    if (won > shown).any():
+        st.error("Conversions can't exceed impressions for any arm.")
+        return
 
-- **PostLister** – Desktop software, bulk posting, templates  
+    bandit = ab_testing.ThompsonBandit.from_counts(arms["Arm"].astype(str), won, shown - won)
+    # Same inputs give the same split, so unrelated reruns don't reshuffle the numbers.
+    seed = int(brief_key({"arms": arms.to_dict("records"), "n": int(next_n)}), 16)
+    with timed("ab:bandit"):
+        alloc = bandit.allocate(int(next_n), np.random.default_rng(seed))
+    st.dataframe(
+        pd.DataFrame(
+            {
+                "Arm": bandit.names,
+                "Posterior Mean %": (bandit.means() * 100).round(3),
+                "Share %": (alloc / alloc.sum() * 100).round(1),
+                "Next Impressions": alloc,
+            }
+        ),
+        hide_index=True,
+    )
 
-- **Claz Automated Poster** – Free basic posting, paid bulk options  
-  👉 <https://www.claz.org>  
 
-- **Classified Ad Posting Software (various)** – Multi-site posting, image mgmt  
+AB_EVENT_LOG = os.path.join(DATA_DIR, "ab_events.log")
+AB_EVENT_URL = f"http://127.0.0.1:{postback_receiver.DEFAULT_PORT}/events"
+AB_STREAM_REFRESH = 2.0
 
-- **Craigslist Auto Poster** – Use carefully (Craigslist is strict)  
 
-- **IFTTT** – Automation platform, can connect social to some sites  
-  👉 <https://ifttt.com>  
+def render_sequential_test():
+    st.markdown(
+        "Follow a running test from a live event feed. Counts update as events arrive and the "
+        "always-valid p-values can be checked after every batch, so the test stops as soon as there is an answer."
+    )
+    st.caption(
+        'One event per line: JSON like `{"variant": "B", "event": "click"}` or CSV like `B,click[,count]`. '
+        "Events are `impression`, `click` or `conversion`; the first variant seen is the control. "
+        "The postback receiver (`python postback_receiver.py`) serves hits that carry a `variant` on the default URL."
+    )
+    consumer = st.session_state.get("ab_stream")
+    running = consumer is not None and consumer.is_alive()
+
+    with st.form("ab_stream_form"):
+        c1, c2 = st.columns([1, 2])
+        kind = c1.radio("Feed", ["File tail", "HTTP endpoint"], key="ab_stream_kind")
+        path = c2.text_input("Event file", value=AB_EVENT_LOG, key="ab_stream_path")
+        url = c2.text_input("Endpoint URL (polled with ?since=<cursor>)", value=AB_EVENT_URL, key="ab_stream_url")
+        c1, c2, c3 = st.columns(3)
+        metric = c1.selectbox("Metric", list(ab_testing.RATE_METRICS), key="ab_stream_metric")
+        confidence = c2.select_slider("Confidence", [90, 95, 99], value=95, format_func=lambda v: f"{v}%", key="ab_stream_conf")
+        lift = c3.number_input("Expected lift %", min_value=1.0, max_value=500.0, value=20.0, step=5.0, key="ab_stream_lift")
+        control = st.text_input("Control variant (blank = first seen)", key="ab_stream_control")
+        start = st.form_submit_button("▶️ Start" if not running else "🔄 Restart")
+
+    if start:
+        if consumer is not None:
+            consumer.stop()
+        try:
+            source = ab_stream.FileTail(path) if kind == "File tail" else ab_stream.HttpPoller(url)
+        except RuntimeError as e:
+            st.error(str(e))
+            return
+        test = ab_testing.SequentialTest(metric, confidence, lift / 100, control.strip() or None)
+        consumer = st.session_state["ab_stream"] = ab_stream.SequentialConsumer(source, test, interval=1.0)
+        consumer.start()
+        running = True
+
+    if consumer is None:
+        st.info("Choose a feed and click **Start**.")
+        return
+    if running and st.button("⏹️ Stop", key="ab_stream_stop"):
+        consumer.stop()
+        consumer.join(timeout=2.0)
+        running = consumer.is_alive()
+    # Only poll the UI while the feed is live; a finished test renders once.
+    st.session_state["ab_stream_polling"] = running
+    st.fragment(render_sequential_status, run_every=AB_STREAM_REFRESH if running else None)()
+
+
+def render_sequential_status():
+    consumer = st.session_state.get("ab_stream")
+    if consumer is None:
+        return
+    snap = consumer.snapshot()
+    if not snap["running"] and st.session_state.get("ab_stream_polling"):
+        # The feed ended (decided or stopped) while polling; a full rerun turns the timer off.
+        st.session_state["ab_stream_polling"] = False
+        st.rerun(scope="app")
+    state = "running" if snap["running"] else "stopped"
+    st.caption(f"Feed {state} · {snap['events']:,} events in {snap['batches']:,} batches")
+    if snap["error"]:
+        st.warning(f"Feed error: {snap['error']}")
+    result = snap["result"]
+    if result is None:
+        st.info("Waiting for events…")
+        return
 
-- **Zapier** – Automation platform for workflows  
-  👉 <https://zapier.com>  
+    test = consumer.test
+    counts = np.asarray(snap["counts"], dtype="int64").reshape(-1, 3)
+    significant = result["significant"]
+    st.dataframe(
+        pd.DataFrame(
+            {
+                "Variant": snap["names"],
+                "Impressions": counts[:, 0],
+                "Clicks": counts[:, 1],
+                "Conversions": counts[:, 2],
+                f"{test.metric} %": (result["rate"] * 100).round(3),
+                "Lift vs Control %": (result["lift"] * 100).round(2),
+                "Always-valid p": result["p"].round(4),
+                "Significant": ["—"] + ["✅" if s else "❌" for s in significant[1:]],
+            }
+        ),
+        hide_index=True,
+    )
+    st.caption(
+        f"mSPRT with a normal mixture sized to a {test.expected_lift * 100:.0f}% lift; "
+        f"α = {result['alpha']:.4f} per challenger. p-values only ever go down, so peeking is safe."
+    )
 
-- **Buffer** – Schedules social posts; useful for Marketplace-style traffic  
-  👉 <https://buffer.com>  
+    if len(snap["names"]) < 2:
+        return
+    winners = [i for i in range(1, len(significant)) if significant[i] and result["lift"][i] > 0]
+    if winners:
+        best = max(winners, key=lambda i: result["lift"][i])
+        st.success(f"🏆 **{snap['names'][best]}** beats the control on {test.metric} — you can stop the test.")
+    elif snap["decided"]:
+        st.warning(f"Every challenger is significantly worse than the control on {test.metric} — stop the test.")
+    else:
+        st.info("No answer yet — keep sending traffic.")
 
-- **Hootsuite** – Multi-platform scheduling  
-  👉 <https://hootsuite.com>  
-            """
-        )
 
-    with st.expander("✅ Posting Tips for Best Results"):
-        st.markdown(
-            """
-1. **Post Consistently** – New ads every 2–3 days, renew expired ads.  
-2. **Use Multiple Sites** – Don’t rely on one; start with ⭐ sites first.  
-3. **Include Quality Images** – Clear, well-lit, relevant to your offer.  
-4. **Write Compelling Titles** – Use benefit + keywords.  
-5. **Add Your Website URL** – Always include your landing page or funnel with tracking.  
-6. **Track Performance** – UTM tags + Analytics tab.  
-7. **Follow Site Rules** – Avoid bans; read guidelines.  
-8. **Optimize for Local** – Use city/region + relevant keywords.  
-9. **Test Ad Copy** – Use Classified Ad Writer + A/B Split Tester.  
-10. **Respond Quickly** – Same-day replies boost conversions.  
-            """
-        )
+ANALYTICS_CHANNELS = ["Affiliate", "Solo Ads", "Banner / Display", "Classifieds", "Email", "Other"]
+ANALYTICS_DB_PATH = os.environ.get("ILLUMINATI_ANALYTICS_DB") or os.path.join(DATA_DIR, "analytics.db")
+ANALYTICS_PAGE_SIZE = 100
+ANALYTICS_IMPORT_CHUNK = 50_000
+NOT_IN_FILE = "(not in file)"
+TREND_GRAINS = {"day": "Daily", "week": "Weekly", "month": "Monthly"}
+TREND_METRICS = ["Spend", "Revenue", "Clicks", "Leads", "Sales", "CPC", "EPC", "ROI%"]
+TREND_MAX_POINTS = 180
 
 
-def page_ab_split_tester():
-    render_header()
-    st.subheader("🧪 A/B Split Tester")
-    st.markdown("Compare two variants with CTR, CVR, EPC, and ROI.")
+@st.cache_resource(show_spinner=False)
+def get_analytics_db():
+    """Process-wide SQLite store; None when the database can't be opened (e.g. a read-only disk)."""
+    try:
+        return analytics_store.SQLiteCampaignStore(ANALYTICS_DB_PATH)
+    except (sqlite3.Error, OSError):
+        return None
+
+
+def get_analytics_backend():
+    """The persistent store, or a per-session in-memory store when the database is unavailable."""
+    store = get_analytics_db()
+    if store is not None:
+        return store, True
+    if "analytics_store" not in st.session_state:
+        st.session_state["analytics_store"] = analytics_store.CampaignStore()
+    return st.session_state["analytics_store"], False
+
+
+def analytics_filters(store) -> Dict:
+    c1, c2, c3 = st.columns(3)
+    campaign = c1.selectbox("Campaign", ["All"] + store.options("Campaign"), key="analytics_campaign")
+    channel = c2.selectbox("Channel", ["All"] + store.options("Channel"), key="analytics_channel")
+    days = c3.date_input("Date range", value=(), key="analytics_dates")
+    start = end = None
+    if days:
+        # Whole days in UTC; the end bound is exclusive.
+        start = datetime.combine(days[0], datetime.min.time(), tzinfo=timezone.utc)
+        end = datetime.combine(days[-1], datetime.min.time(), tzinfo=timezone.utc) + timedelta(days=1)
+    return {
+        "campaign": None if campaign == "All" else campaign,
+        "channel": None if channel == "All" else channel,
+        "start": start,
+        "end": end,
+    }
 
-    test_type = st.selectbox(
-        "Test Type",
-        ["Headline", "Sales Page / VSL", "Email Subject", "Display Ad / Banner", "Classified Ad", "Other"],
-        index=0,
-    )
 
-    with st.form("ab_test_form"):
-        st.markdown("### Variant Details")
-        col_a, col_b = st.columns(2)
-        with col_a:
-            name_a = st.text_input("Name A", f"{test_type} A")
-            copy_a = st.text_area("Copy / Notes A", "", key="copy_a")
-            imp_a = st.number_input("Impressions A", min_value=0, step=1, value=0)
-            clicks_a = st.number_input("Clicks A", min_value=0, step=1, value=0)
-            conv_a = st.number_input("Conversions A", min_value=0, step=1, value=0)
-            rev_a = st.number_input("Revenue A (optional)", min_value=0.0, step=1.0, value=0.0)
-        with col_b:
-            name_b = st.text_input("Name B", f"{test_type} B")
-            copy_b = st.text_area("Copy / Notes B", "", key="copy_b")
-            imp_b = st.number_input("Impressions B", min_value=0, step=1, value=0)
-            clicks_b = st.number_input("Clicks B", min_value=0, step=1, value=0)
-            conv_b = st.number_input("Conversions B", min_value=0, step=1, value=0)
-            rev_b = st.number_input("Revenue B (optional)", min_value=0.0, step=1.0, value=0.0)
-        submitted = st.form_submit_button("📊 Calculate A/B Results")
-
-    if not submitted:
-        st.info("Fill in the numbers for A and B, then click **Calculate**.")
+def render_analytics_import(store):
+    with st.expander("📥 Bulk Import (Network CSV)"):
+        upload = st.file_uploader("Stats export (CSV)", type=["csv"], key="analytics_csv")
+        if upload is None:
+            st.caption("Columns like cost, clicks, conversions and payout are matched automatically; adjust before importing.")
+            return
+
+        headers = analytics_store.csv_headers(upload)
+        guess = analytics_store.guess_column_mapping(headers)
+        choices = [NOT_IN_FILE] + headers
+        cols = st.columns(4)
+        mapping = {}
+        for n, target in enumerate(analytics_store.SNAPSHOT_COLUMNS):
+            index = choices.index(guess[target]) if guess[target] else 0
+            pick = cols[n % 4].selectbox(target, choices, index=index, key=f"analytics_map_{target}")
+            mapping[target] = None if pick == NOT_IN_FILE else pick
+
+        defaults = {}
+        if mapping["Campaign"] is None:
+            defaults["Campaign"] = st.text_input("Campaign for every row", upload.name.rsplit(".", 1)[0])
+        if mapping["Channel"] is None:
+            defaults["Channel"] = st.selectbox("Channel for every row", ANALYTICS_CHANNELS, key="analytics_import_channel")
+        if mapping["Timestamp"] is None:
+            st.caption("No date column mapped: rows are stamped with the import time.")
+
+        if not st.button("📥 Import Rows"):
+            return
+        bar = st.progress(0.0, text="Importing…")
+        size = max(upload.size, 1)
+
+        def progress(result):
+            bar.progress(min(upload.tell() / size, 1.0), text=f"{result.rows:,} rows imported…")
+
+        with timed("analytics:import"):
+            result = analytics_store.import_csv(upload, store, mapping, defaults, ANALYTICS_IMPORT_CHUNK, progress)
+        bar.progress(1.0, text=f"{result.rows:,} rows imported.")
+        skipped = f" Skipped {result.skipped:,} rows with an unreadable date." if result.skipped else ""
+        st.success(f"Imported {result.rows:,} snapshots in {result.chunks} chunk(s).{skipped}")
+        st.dataframe(result.summary(), hide_index=True)
+
+
+def render_analytics_trends(store, filters: Dict):
+    st.markdown("### 📈 Trends")
+    c1, c2 = st.columns([1, 3])
+    grain = c1.radio("Bucket", list(TREND_GRAINS), format_func=TREND_GRAINS.get, key="analytics_grain")
+    metrics = c2.multiselect("Metrics", TREND_METRICS, default=["Spend", "Revenue"], key="analytics_metrics")
+    with timed("analytics:trend"):
+        trend = store.trend(grain, **filters)
+    if trend.empty or not metrics:
         return
-
-    def calc(imp, clk, conv, rev):
-        ctr = (clk / imp * 100) if imp > 0 else 0.0
-        cvr = (conv / clk * 100) if clk > 0 else 0.0
-        cr = (conv / imp * 100) if imp > 0 else 0.0
-        epc = (rev / clk) if clk > 0 else 0.0
-        roi = ((rev - imp) / imp * 100) if imp > 0 and rev > 0 else 0.0
-        return ctr, cvr, cr, epc, roi
-
-    ctr_a, cvr_a, cr_a, epc_a, roi_a = calc(imp_a, clicks_a, conv_a, rev_a)
-    ctr_b, cvr_b, cr_b, epc_b, roi_b = calc(imp_b, clicks_b, conv_b, rev_b)
-
-    col1, col2 = st.columns(2)
-    with col1:
-        st.markdown(f"#### {name_a}")
-        st.write(
-            f"CTR: {ctr_a:.2f}% | Click→Conv: {cvr_a:.2f}% | Imp→Conv: {cr_a:.2f}% | EPC: ${epc_a:.2f} | ROI: {roi_a:.2f}%"
-        )
-    with col2:
-        st.markdown(f"#### {name_b}")
-        st.write(
-            f"CTR: {ctr_b:.2f}% | Click→Conv: {cvr_b:.2f}% | Imp→Conv: {cr_b:.2f}% | EPC: ${epc_b:.2f} | ROI: {roi_b:.2f}%"
-        )
+    points = analytics_store.downsample(trend, TREND_MAX_POINTS)
+    if len(points) < len(trend):
+        st.caption(f"{len(trend):,} {TREND_GRAINS[grain].lower()} buckets merged into {len(points)} chart points.")
+    st.line_chart(points.set_index("Bucket")[metrics])
 
 
 def page_analytics():
     render_header()
     st.subheader("📈 Analytics & Campaign Tracker")
-    st.markdown("Track CPC, CPL, CPS, EPC, and ROI. Data is session-only.")
-
-    if "analytics_history" not in st.session_state:
-        st.session_state["analytics_history"] = []
+    store, persistent = get_analytics_backend()
+    if persistent:
+        st.markdown("Track CPC, CPL, CPS, EPC, and ROI. Snapshots are saved on this server.")
+    else:
+        st.markdown("Track CPC, CPL, CPS, EPC, and ROI. Data is session-only.")
+        st.warning(f"Couldn't open the analytics database at `{ANALYTICS_DB_PATH}`; nothing will be kept.")
 
     with st.form("analytics_form"):
         col1, col2, col3 = st.columns(3)
         with col1:
             campaign_name = st.text_input("Campaign Name", "Default Campaign")
-            channel = st.selectbox(
-                "Channel", ["Affiliate", "Solo Ads", "Banner / Display", "Classifieds", "Email", "Other"], index=0
-            )
+            channel = st.selectbox("Channel", ANALYTICS_CHANNELS, index=0)
         with col2:
             spend = st.number_input("Ad Spend / Cost ($)", min_value=0.0, step=1.0, value=0.0)
             clicks = st.number_input("Clicks", min_value=0, step=1, value=0)
@@ -1959,33 +3428,83 @@ def page_analytics():
         submitted = st.form_submit_button("➕ Add / Update Campaign Snapshot")
 
     if submitted:
-        cpc = (spend / clicks) if clicks > 0 else 0.0
-        cpl = (spend / leads) if leads > 0 else 0.0
-        cps = (spend / sales) if sales > 0 else 0.0
-        epc = (revenue / clicks) if clicks > 0 else 0.0
-        roi = ((revenue - spend) / spend * 100) if spend > 0 else 0.0
-        snap = {
-            "Campaign": campaign_name,
-            "Channel": channel,
-            "Spend": spend,
-            "Clicks": clicks,
-            "Leads": leads,
-            "Sales": sales,
-            "Revenue": revenue,
-            "CPC": round(cpc, 4),
-            "CPL": round(cpl, 4),
-            "CPS": round(cps, 4),
-            "EPC": round(epc, 4),
-            "ROI%": round(roi, 2),
-        }
-        st.session_state["analytics_history"].append(snap)
+        with timed("analytics:append"):
+            store.append(
+                [
+                    {
+                        "Campaign": campaign_name,
+                        "Channel": channel,
+                        "Spend": spend,
+                        "Clicks": clicks,
+                        "Leads": leads,
+                        "Sales": sales,
+                        "Revenue": revenue,
+                    }
+                ]
+            )
         st.success("Snapshot added.")
 
-    if st.session_state["analytics_history"]:
-        st.markdown("### 📊 Campaign History (This Session)")
-        st.dataframe(st.session_state["analytics_history"])
-    else:
+    render_analytics_import(store)
+    if persistent:
+        render_postback_info()
+
+    if not len(store):
         st.info("No campaign snapshots yet.")
+        return
+
+    filters = analytics_filters(store)
+    with timed("analytics:rollup"):
+        rollup = store.rollup(**filters)
+    st.markdown("### 🧮 Totals by Campaign & Channel")
+    st.dataframe(rollup, hide_index=True)
+
+    render_analytics_trends(store, filters)
+
+    with timed("analytics:count"):
+        total = store.count(**filters)
+    st.markdown("### 📊 Campaign History")
+    if not total:
+        st.info("No snapshots match these filters.")
+        return
+    pages = (total + ANALYTICS_PAGE_SIZE - 1) // ANALYTICS_PAGE_SIZE
+    page_no = st.number_input(f"Page (of {pages:,})", min_value=1, max_value=pages, value=1, key="analytics_page")
+    with timed("analytics:page"):
+        rows = store.page((page_no - 1) * ANALYTICS_PAGE_SIZE, ANALYTICS_PAGE_SIZE, **filters)
+    st.caption(f"{total:,} snapshots, newest first.")
+    st.dataframe(rows, hide_index=True)
+
+
+POSTBACK_URL = f"http://127.0.0.1:{postback_receiver.DEFAULT_PORT}"
+
+
+def render_postback_info():
+    with st.expander("📡 Conversion Postbacks"):
+        st.markdown(
+            "Run the receiver next to the app and point your networks' postback / S2S pixel at it. "
+            "Hits are validated, batched and saved into this database every second."
+        )
+        st.code(
+            f"python postback_receiver.py --port {postback_receiver.DEFAULT_PORT} --db {ANALYTICS_DB_PATH}",
+            language="bash",
+        )
+        st.code(
+            f"{POSTBACK_URL}/postback?event=sale&campaign={{offer_name}}&payout={{payout}}"
+            "&variant={sub1}&txid={transaction_id}",
+            language="text",
+        )
+        st.caption(
+            "`event` is click, lead, sale or impression; repeated `txid`s count once. "
+            "Hits with a `variant` also feed the A/B Split Tester's Sequential Test tab."
+        )
+        if requests is not None and st.button("Check receiver", key="postback_check"):
+            try:
+                health = requests.get(f"{POSTBACK_URL}/health", timeout=2).json()
+                st.success(
+                    f"Receiver up: {health['accepted']:,} hits accepted, {health['written']:,} saved, "
+                    f"{health['rejected']:,} rejected, {health['duplicates']:,} duplicates."
+                )
+            except Exception as e:
+                st.warning(f"Receiver not reachable at {POSTBACK_URL}: {e}")
 
 
 def page_system_checklist():
@@ -2024,16 +3543,8 @@ def page_copy_analyzer():
                 st.error("Please paste some copy first.")
                 return
             analysis = analyze_copy_score(text)
-            col_a, col_b, col_c = st.columns(3)
-            with col_a:
-                st.metric("Overall Score", f"{analysis['total_score']} / 100")
-                st.metric("Length & Depth", f"{analysis['length_score']:.1f}")
-            with col_b:
-                st.metric("Emotional Triggers", f"{analysis['emotion_score']:.1f}")
-                st.metric("Structure (AIDA / PAS)", f"{analysis['structure_score']:.1f}")
-            with col_c:
-                st.metric("CTAs & Closers", f"{analysis['cta_score']:.1f}")
-                st.metric("Specificity & Proof", f"{analysis['specificity_score']:.1f}")
+            emit_event("copy.scored", {"version": "Copy Analyzer", "copy": text, "score": analysis})
+            render_score_metrics(analysis)
     else:
         col1, col2 = st.columns(2)
         with col1:
@@ -2046,6 +3557,7 @@ def page_copy_analyzer():
                 return
             a = analyze_copy_score(text_a)
             b = analyze_copy_score(text_b)
+            emit_event("copy.compared", {"a": {"copy": text_a, "score": a}, "b": {"copy": text_b, "score": b}})
             col_a, col_b = st.columns(2)
             with col_a:
                 st.markdown("#### Variant A")
@@ -2083,90 +3595,180 @@ def page_settings_integrations():
         language="ini",
     )
 
+    st.markdown("### 🎭 Style Packs")
+    registry = get_style_registry()
+    st.caption(
+        f"{len(registry.names())} master styles loaded from `style_packs/`. "
+        "Upload a JSON pack with `name`, `flavor`, and optional `intro`, `classified_hook`, `vsl_hook`."
+    )
+    pack_file = st.file_uploader("Add or update a style pack (.json)", type=["json"])
+    if pack_file is not None and st.button("➕ Install Style Pack"):
+        try:
+            pack = registry.add(json.load(pack_file), persist=True)
+            st.success(f"Style pack '{pack['name']}' installed.")
+        except (ValueError, OSError) as e:
+            st.error(f"Could not install style pack: {e}")
+
     st.markdown("### 🔗 Zapier Webhooks")
     zap_url = st.text_input("Zapier Catch Hook URL", st.session_state.get("zapier_url", ""))
     st.session_state["zapier_url"] = zap_url
+    formats = list(webhook_outbox.BATCH_FORMATS)
+    zap_format = st.selectbox(
+        "Delivery",
+        formats,
+        index=formats.index(st.session_state.get("zapier_format", "single")),
+        format_func=webhook_outbox.BATCH_FORMATS.get,
+        help="Zapier catch hooks accept a JSON array and run once per item; use NDJSON only for endpoints that read it.",
+    )
+    st.session_state["zapier_format"] = zap_format
     test_payload = {"event": "test_ping", "source": "Illuminati AI Copy Master"}
     if st.button("🚀 Send Test Webhook"):
-        ok, msg = send_zapier_webhook(zap_url, test_payload)
+        ok, msg = send_zapier_webhook(zap_url, test_payload, zap_format)
         if ok:
             st.success(msg)
         else:
             st.error(msg)
 
+    dispatcher = get_webhook_dispatcher()
+    if dispatcher is not None:
+        stats = dispatcher.outbox.stats()
+        st.caption(
+            f"Outbox: {stats['pending']} pending ({stats['retrying']} retrying), {stats['dead']} failed · "
+            f"{dispatcher.sent} delivered since start"
+        )
+        if stats["last_error"]:
+            st.caption(f"Last error: {stats['last_error']}")
+        if not dispatcher.is_alive():
+            st.error("The webhook delivery thread has stopped; queued webhooks will be sent after an app restart.")
+        elif dispatcher.error:
+            st.warning(f"Webhook delivery is retrying after an outbox error: {dispatcher.error}")
+        if stats["dead"] and st.button("🔁 Retry Failed Webhooks"):
+            dispatcher.outbox.requeue_dead()
+            dispatcher.wake()
+            st.rerun()
+
+    st.markdown("### 📤 Automatic Events")
+    st.caption(
+        "Send an event for every generated copy, email sequence, VSL script and classified ad batch, "
+        "every score and every AI enhancement. Events are queued and written in the background."
+    )
+    sinks = st.multiselect("Send events to", EVENT_SINKS, default=st.session_state.get("event_sinks", []))
+    st.session_state["event_sinks"] = sinks
+    if "Zapier" in sinks and not zap_url:
+        st.warning("Add a Zapier Catch Hook URL above to send events to Zapier.")
+    if "Local file" in sinks:
+        st.caption(f"Local file: `{event_log_path()}` (one JSON event per line).")
+    bus = get_event_bus()
+    if bus.emitted:
+        st.caption(
+            f"Events: {bus.emitted:,} emitted, {bus.written:,} written"
+            + (f", {bus.errors:,} failed" if bus.errors else "")
+        )
+    if bus.last_error:
+        st.caption(f"Last event error: {bus.last_error}")
+
 
 # =========================
 # Main (auth-gated)
 # =========================
 
+MINDSET_VIDEO_URL = "https://youtu.be/l1gXZu1i8TM?si=2D_D5KvB6t8fxxUj"
+
+
+def render_mindset_video():
+    """Sidebar video, embedded only once the user asks for it so navigation doesn't reload the player."""
+    st.markdown("##### 🎧 Mindset Fuel")
+    if st.toggle("▶️ Load video", key="mindset_video"):
+        st.video(MINDSET_VIDEO_URL)
+    st.caption('🎧 Earl Nightingale – "The Strangest Secret"')
+
+
+PAGES: Dict[str, Callable[[], None]] = {
+    "Dashboard": page_dashboard,
+    "Generate Copy": page_generate_copy,
+    "Email Sequences": page_email_sequences,
+    "VSL & Webinar Scripts": page_vsl_webinar,
+    "Classified Ad Writer": page_classified_writer,
+    "Manual & Lead Magnet": page_manual_assets,
+    "Traffic & Networks": page_traffic_networks,
+    "Classified Sites": page_classified_sites,
+    "A/B Split Tester": page_ab_split_tester,
+    "Analytics": page_analytics,
+    "System Checklist": page_system_checklist,
+    "Copy Analyzer": page_copy_analyzer,
+    "Settings & Integrations": page_settings_integrations,
+}
+
+PROFILE_ENGINES = ["cProfile", "pyinstrument"]
+
+
+def render_page(page: str):
+    """Render one page under the page timer; profile it if a capture was requested last run."""
+    render = PAGES[page]
+
+    def timed_render():
+        with timed(f"page:{page}", exclusive_as=f"widgets:{page}"):
+            render()
+
+    engine = st.session_state.pop("profile_next", None)
+    if engine is None:
+        timed_render()
+        return
+    report = run_profiled(timed_render, engine)
+    st.session_state["last_profile"] = {"page": page, "engine": engine, "report": report}
+
+
+def render_perf_panel():
+    """Admin-only sidebar panel with rolling render timings and the last profiler capture."""
+    store = get_perf_store()
+    with st.sidebar.expander("⏱️ Performance"):
+        rows = store.summary()
+        if rows:
+            st.dataframe(rows, hide_index=True)
+        else:
+            st.caption("No timings recorded yet.")
+        st.caption(f"Percentiles over the last {PERF_WINDOW} runs of each block, across all sessions.")
+
+        engines = PROFILE_ENGINES if Profiler is not None else PROFILE_ENGINES[:1]
+        engine = st.selectbox("Profiler", engines, key="profile_engine")
+        c1, c2 = st.columns(2)
+        if c1.button("Profile next rerun"):
+            st.session_state["profile_next"] = engine
+            st.rerun()
+        if c2.button("Reset timings"):
+            store.reset()
+            st.rerun()
+
+        last = st.session_state.get("last_profile")
+        if last:
+            st.caption(f"Last capture: {last['page']} ({last['engine']})")
+            st.code(last["report"], language="text")
+
+
 def main():
     if not is_authenticated():
         # Login-only view; sidebar: logo + mindset video
         with st.sidebar:
             st.markdown('<div class="sidebar-logo">🔺 Illuminati AI</div>', unsafe_allow_html=True)
             st.markdown("---")
-            st.markdown("##### 🎧 Mindset Fuel")
-            st.video("https://youtu.be/l1gXZu1i8TM?si=2D_D5KvB6t8fxxUj")
-            st.caption('🎧 Earl Nightingale – "The Strangest Secret"')
+            render_mindset_video()
         login_page()
         return
 
     # Authenticated UI with full nav
     with st.sidebar:
         st.markdown('<div class="sidebar-logo">🔺 Illuminati AI</div>', unsafe_allow_html=True)
-        page = st.radio(
-            "Navigate",
-            [
-                "Dashboard",
-                "Generate Copy",
-                "Email Sequences",
-                "VSL & Webinar Scripts",
-                "Classified Ad Writer",
-                "Manual & Lead Magnet",
-                "Traffic & Networks",
-                "Classified Sites",
-                "A/B Split Tester",
-                "Analytics",
-                "System Checklist",
-                "Copy Analyzer",
-                "Settings & Integrations",
-            ],
-        )
+        page = st.radio("Navigate", list(PAGES))
         st.markdown("---")
-        st.markdown("##### 🎧 Mindset Fuel")
-        st.video("https://youtu.be/l1gXZu1i8TM?si=2D_D5KvB6t8fxxUj")
-        st.caption('🎧 Earl Nightingale – "The Strangest Secret"')
+        render_mindset_video()
         if st.button("🚪 Logout"):
             st.session_state["auth_ok"] = False
             st.success("Logged out.")
             st.rerun()
 
-    if page == "Dashboard":
-        page_dashboard()
-    elif page == "Generate Copy":
-        page_generate_copy()
-    elif page == "Email Sequences":
-        page_email_sequences()
-    elif page == "VSL & Webinar Scripts":
-        page_vsl_webinar()
-    elif page == "Classified Ad Writer":
-        page_classified_writer()
-    elif page == "Manual & Lead Magnet":
-        page_manual_assets()
-    elif page == "Traffic & Networks":
-        page_traffic_networks()
-    elif page == "Classified Sites":
-        page_classified_sites()
-    elif page == "A/B Split Tester":
-        page_ab_split_tester()
-    elif page == "Analytics":
-        page_analytics()
-    elif page == "System Checklist":
-        page_system_checklist()
-    elif page == "Copy Analyzer":
-        page_copy_analyzer()
-    elif page == "Settings & Integrations":
-        page_settings_integrations()
+    render_page(page)
+    # The only login is the admin account, so the panel shows for any authenticated session.
+    render_perf_panel()
 
     render_footer()
 
@@ -0,0 +1 @@
+# Lets tests import the top-level modules (webhook_outbox, ...) when run as plain `pytest`.
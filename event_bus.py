@@ -0,0 +1,115 @@
+# Structured app events
+# emit() stamps an event and puts it on an in-process queue, which costs the page a few
+# microseconds. One worker thread drains the queue in batches, serializes each event
+# once and hands it to its sinks: the webhook outbox (for Zapier) and/or an
+# append-only JSONL file. Nothing on the page waits for disk or network I/O.
+
+import json
+import queue
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from webhook_outbox import Dispatcher
+
+EVENT_SOURCE = "Illuminati AI Copy Master"
+
+# (kind, data, timestamp, zapier (url, fmt) or None, file path or None)
+_Item = Tuple[str, object, datetime, Optional[Tuple[str, str]], Optional[str]]
+
+
+def event_record(kind: str, data, ts: datetime) -> Dict:
+    return {
+        "event": kind,
+        "id": uuid.uuid4().hex,
+        "ts": ts.isoformat(timespec="milliseconds"),
+        "source": EVENT_SOURCE,
+        "data": data,
+    }
+
+
+class EventBus(threading.Thread):
+    """
+    Queue + drain thread for app events. ``dispatcher`` delivers events routed to a
+    webhook URL; without one those routes are dropped (file routes still work).
+    Callers must not mutate ``data`` after emitting it.
+    """
+
+    def __init__(self, dispatcher: Optional[Dispatcher] = None, batch_size: int = 500):
+        super().__init__(daemon=True)
+        self.dispatcher = dispatcher
+        self.batch_size = batch_size
+        self.emitted = 0
+        self.written = 0
+        self.errors = 0
+        self.last_error = ""
+        self._queue: "queue.SimpleQueue[Optional[_Item]]" = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._drained = threading.Condition()
+
+    def emit(
+        self,
+        kind: str,
+        data,
+        zapier: Optional[Tuple[str, str]] = None,
+        file_path: Optional[str] = None,
+    ):
+        """Queue one event for the given sinks; a no-op when no sink is set."""
+        if zapier is None and file_path is None:
+            return
+        with self._lock:
+            self.emitted += 1
+        self._queue.put((kind, data, datetime.now(timezone.utc), zapier, file_path))
+
+    def stop(self):
+        self._queue.put(None)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every event emitted so far has been written (or has failed)."""
+        target = self.emitted
+        with self._drained:
+            return self._drained.wait_for(lambda: self.written + self.errors >= target, timeout)
+
+    def _next_batch(self) -> Tuple[List[_Item], bool]:
+        batch: List[_Item] = []
+        item = self._queue.get()
+        while item is not None:
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                break
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return batch, False
+        return batch, item is None
+
+    def _write(self, batch: List[_Item]):
+        files: Dict[str, List[str]] = {}
+        outbox_rows: List[Tuple[str, str, str]] = []
+        for kind, data, ts, zapier, file_path in batch:
+            line = json.dumps(event_record(kind, data, ts), ensure_ascii=False, default=str)
+            if file_path is not None:
+                files.setdefault(file_path, []).append(line)
+            if zapier is not None and self.dispatcher is not None:
+                outbox_rows.append((zapier[0], line, zapier[1]))
+        for path, lines in files.items():
+            with open(path, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+        if outbox_rows:
+            self.dispatcher.outbox.put_many(outbox_rows)
+            self.dispatcher.wake()
+        self.written += len(batch)
+
+    def run(self):
+        done = False
+        while not done:
+            batch, done = self._next_batch()
+            if batch:
+                try:
+                    self._write(batch)
+                except Exception as e:
+                    self.errors += len(batch)
+                    self.last_error = f"{type(e).__name__}: {e}"
+            with self._drained:
+                self._drained.notify_all()
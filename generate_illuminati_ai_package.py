@@ -1,49 +1,97 @@
 # Minimal, stable Illuminati AI manual generator
-# Creates a simple PDF + ZIP package with no external dependencies beyond reportlab
+# Creates a simple PDF + ZIP package with no external dependencies beyond reportlab.
+# Everything renders in memory: the PDF streams straight into its ZIP entry, and both
+# can be written to a path or any writable file-like object (e.g. a download buffer).
+# build_manual assembles generated campaign assets into a multi-section manual;
+# build_manual_package rebuilds one incrementally from cached per-section parts, and
+# build_batch packages many offers in a process pool.
 
+import argparse
+import hashlib
+import io
+import json
+import multiprocessing
 import os
+import re
+import sys
+import time
+import traceback
 import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
+from functools import lru_cache, partial
+from typing import BinaryIO, Callable, Dict, List, Optional, Union
+from xml.sax.saxutils import escape
 
+import reportlab
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak, KeepTogether, Flowable
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle, StyleSheet1
 from reportlab.lib.enums import TA_CENTER
 
+# Optional: merges cached section parts for incremental rebuilds (full rebuilds without it)
+try:
+    from pypdf import PdfReader, PdfWriter
+except ImportError:
+    PdfReader = PdfWriter = None
+
 PACKAGE_ZIP_NAME = "Illuminati_AI_Package.zip"
 PDF_NAME = "Illuminati_AI_Copy_Master_Manual.pdf"
+README_TEXT = (
+    "Illuminati AI Copy Master Package (Lite)\n"
+    "----------------------------------------\n\n"
+    f"PDF: {PDF_NAME}\n\n"
+    "This package was generated by the minimal Illuminati AI Copy Master generator.\n"
+    "You can expand the manual and generator logic later with more sections, images, and content.\n"
+)
 
+Output = Union[str, BinaryIO]
 
-def build_pdf(output_path: str):
-    """Create a very simple Illuminati AI Copy Master manual PDF."""
-    doc = SimpleDocTemplate(
-        output_path,
-        pagesize=A4,
-        topMargin=0.75 * inch,
-        bottomMargin=0.75 * inch,
-        leftMargin=0.75 * inch,
-        rightMargin=0.75 * inch,
-    )
 
+@lru_cache(maxsize=1)
+def manual_styles() -> StyleSheet1:
+    """The sample stylesheet plus the manual's own styles, built once per process."""
     styles = getSampleStyleSheet()
-
-    title_style = ParagraphStyle(
+    styles.add(ParagraphStyle(
         name="TitleCenter",
         parent=styles["Title"],
         alignment=TA_CENTER,
         fontSize=20,
         spaceAfter=12,
-    )
-
-    subtitle_style = ParagraphStyle(
+    ))
+    styles.add(ParagraphStyle(
         name="SubtitleCenter",
         parent=styles["Heading2"],
         alignment=TA_CENTER,
         fontSize=14,
         spaceAfter=18,
+    ))
+    styles.add(ParagraphStyle(name="ManualBullet", parent=styles["BodyText"], leftIndent=14, bulletIndent=4))
+    styles.add(ParagraphStyle(name="AdText", parent=styles["BodyText"], fontName="Courier", fontSize=9, leading=11))
+    return styles
+
+
+def _doc(output: Output, **kwargs) -> SimpleDocTemplate:
+    return SimpleDocTemplate(
+        output,
+        pagesize=A4,
+        topMargin=0.75 * inch,
+        bottomMargin=0.75 * inch,
+        leftMargin=0.75 * inch,
+        rightMargin=0.75 * inch,
+        **kwargs,
     )
 
+
+def build_pdf(output: Output):
+    """Create a very simple Illuminati AI Copy Master manual PDF at a path or into a writable binary file object."""
+    doc = _doc(output)
+
+    styles = manual_styles()
+    title_style = styles["TitleCenter"]
+    subtitle_style = styles["SubtitleCenter"]
     body_style = styles["BodyText"]
 
     story = []
@@ -100,23 +148,505 @@ def build_pdf(output_path: str):
     doc.build(story)
 
 
-def main():
-    # Build PDF
-    build_pdf(PDF_NAME)
-
-    # Create ZIP package
-    with zipfile.ZipFile(PACKAGE_ZIP_NAME, "w", zipfile.ZIP_DEFLATED) as zf:
-        zf.write(PDF_NAME, arcname=PDF_NAME)
-        readme_text = (
-            "Illuminati AI Copy Master Package (Lite)\n"
-            "----------------------------------------\n\n"
-            f"PDF: {PDF_NAME}\n\n"
-            "This package was generated by the minimal Illuminati AI Copy Master generator.\n"
-            "You can expand the manual and generator logic later with more sections, images, and content.\n"
+def pdf_bytes() -> bytes:
+    buf = io.BytesIO()
+    build_pdf(buf)
+    return buf.getvalue()
+
+
+# Campaign manual
+# A section is {"kind", "title", "content"}; content depends on the kind:
+#   text, sales_copy, vsl: str (Markdown-ish: **bold**, "#" headings, "-" bullets)
+#   headlines, classified: List[str]
+#   emails: List[{"subject", "body"}]
+#   lead_magnet: {"title": str, "outline": List[str]}
+
+# Below this much section text, spawning workers costs more than it saves.
+PARALLEL_MIN_CHARS = 400_000
+
+_BOLD_RE = re.compile(r"\*\*(.+?)\*\*")
+
+
+def _markup(text: str) -> str:
+    return _BOLD_RE.sub(r"<b>\1</b>", escape(text.strip())).replace("\n", "<br/>")
+
+
+def text_flowables(text: str, styles: StyleSheet1) -> List[Flowable]:
+    """Blank-line separated blocks; "#" lines become headings and "-"/"*" lines bullets."""
+    out: List[Flowable] = []
+    for block in re.split(r"\n\s*\n", text or ""):
+        lines = [ln for ln in block.strip().splitlines() if ln.strip()]
+        if not lines:
+            continue
+        if all(ln.lstrip().startswith(("- ", "* ", "• ")) for ln in lines):
+            out.extend(Paragraph(_markup(ln.lstrip()[2:]), styles["ManualBullet"], bulletText="•") for ln in lines)
+        elif lines[0].startswith("#"):
+            level = min(len(lines[0]) - len(lines[0].lstrip("#")) + 1, 4)
+            out.append(Paragraph(_markup(lines[0].lstrip("#")), styles[f"Heading{level}"]))
+            if lines[1:]:
+                out.append(Paragraph(_markup("\n".join(lines[1:])), styles["BodyText"]))
+        else:
+            out.append(Paragraph(_markup("\n".join(lines)), styles["BodyText"]))
+    return out
+
+
+def section_flowables(section: Dict) -> List[Flowable]:
+    """Flowables for one manual section, starting with its heading."""
+    styles = manual_styles()
+    kind, content = section["kind"], section["content"]
+    out: List[Flowable] = [Paragraph(escape(section["title"]), styles["Heading1"])]
+    if kind == "headlines":
+        out.extend(Paragraph(f"{i}. {_markup(h)}", styles["BodyText"]) for i, h in enumerate(content, start=1))
+    elif kind == "emails":
+        for i, email in enumerate(content, start=1):
+            out.append(Paragraph(f"Email {i}: {_markup(email['subject'])}", styles["Heading3"]))
+            out.extend(text_flowables(email["body"], styles))
+    elif kind == "classified":
+        for i, ad in enumerate(content, start=1):
+            block = [Paragraph(f"Ad {i}", styles["Heading4"])] + [
+                Paragraph(_markup(part), styles["AdText"]) for part in re.split(r"\n\s*\n", ad) if part.strip()
+            ]
+            out.append(KeepTogether(block))
+    elif kind == "lead_magnet":
+        out.append(Paragraph(_markup(content["title"]), styles["Heading2"]))
+        out.extend(
+            Paragraph(_markup(item), styles["ManualBullet"], bulletText=f"{i}.")
+            for i, item in enumerate(content["outline"], start=1)
         )
-        zf.writestr("README.txt", readme_text)
+    else:
+        out.extend(text_flowables(content, styles))
+    return out
+
+
+def _size(content) -> int:
+    if isinstance(content, str):
+        return len(content)
+    if isinstance(content, dict):
+        return sum(_size(v) for v in content.values())
+    if isinstance(content, (list, tuple)):
+        return sum(_size(v) for v in content)
+    return 0
+
+
+def _map_sections(fn: Callable, sections: List[Dict], workers: Optional[int] = None) -> List:
+    """``fn`` over sections, in a spawn process pool once there's enough text to pay for it."""
+    max_workers = min(workers or os.cpu_count() or 1, len(sections))
+    if max_workers <= 1 or sum(_size(s["content"]) for s in sections) < PARALLEL_MIN_CHARS:
+        return [fn(s) for s in sections]
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=ctx) as pool:
+        return list(pool.map(fn, sections))
+
+
+def prepare_sections(sections: List[Dict], workers: Optional[int] = None) -> List[List[Flowable]]:
+    """
+    Parse every section into flowables. Large manuals fan sections out to a process
+    pool (``workers`` defaults to the CPU count; 1 means serial); the parsed
+    paragraphs come back pickled, so small manuals stay in-process.
+    """
+    return _map_sections(section_flowables, sections, workers)
+
+
+def _page_footer(canvas, doc):
+    canvas.saveState()
+    canvas.setFont("Helvetica", 8)
+    canvas.drawRightString(doc.pagesize[0] - doc.rightMargin, 0.45 * inch, f"Page {doc.page}")
+    canvas.restoreState()
+
+
+def _cover_story(sections: List[Dict], title: str, subtitle: str) -> List[Flowable]:
+    styles = manual_styles()
+    story: List[Flowable] = [
+        Spacer(1, 1 * inch),
+        Paragraph(escape(title), styles["TitleCenter"]),
+        Paragraph(escape(subtitle), styles["SubtitleCenter"]),
+        Paragraph(f"Generated on: {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')} UTC", styles["BodyText"]),
+        Spacer(1, 0.4 * inch),
+        Paragraph("Contents", styles["Heading3"]),
+    ]
+    story.extend(
+        Paragraph(escape(s["title"]), styles["ManualBullet"], bulletText=f"{i}.")
+        for i, s in enumerate(sections, start=1)
+    )
+    return story
+
+
+def build_manual(
+    sections: List[Dict],
+    output: Output,
+    title: str = "Illuminati AI Copy Master",
+    subtitle: str = "Campaign Manual",
+    workers: Optional[int] = None,
+):
+    """
+    Lay out a cover with contents plus one chapter per section. Sections are
+    prepared up front (in parallel when large) and then laid out in one pass.
+    """
+    sections = [s for s in sections if s.get("content")]
+    prepared = prepare_sections(sections, workers)
+    story = _cover_story(sections, title, subtitle)
+    for flowables in prepared:
+        story.append(PageBreak())
+        story.extend(flowables)
+    _doc(output, title=title).build(story, onFirstPage=_page_footer, onLaterPages=_page_footer)
+
+
+def manual_bytes(sections: List[Dict], **kwargs) -> bytes:
+    buf = io.BytesIO()
+    build_manual(sections, buf, **kwargs)
+    return buf.getvalue()
+
+
+# Incremental rebuilds
+# Every section renders to its own PDF part, cached on disk under the hash of its
+# content (plus the layout version), and the manual is the cover merged with the
+# parts. A rebuild lays out only sections whose hash has no cached part. Part
+# footers number pages within the section, so a part never depends on what
+# precedes it. manifest.json records the section and asset hashes behind the
+# current package; when none changed, the package is left as it is.
+
+# Bump when section layout changes so cached parts are re-rendered.
+RENDER_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+
 
-    print(f"[OK] Created ZIP package: {PACKAGE_ZIP_NAME}")
+def content_hash(*parts) -> str:
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def section_hash(section: Dict) -> str:
+    return content_hash(RENDER_VERSION, reportlab.Version, section["kind"], section["title"], section["content"])
+
+
+def _part_footer(section_title: str, canvas, doc):
+    canvas.saveState()
+    canvas.setFont("Helvetica", 8)
+    canvas.drawString(doc.leftMargin, 0.45 * inch, section_title[:90])
+    canvas.drawRightString(doc.pagesize[0] - doc.rightMargin, 0.45 * inch, str(doc.page))
+    canvas.restoreState()
+
+
+def render_section_pdf(section: Dict) -> bytes:
+    """One section as a standalone PDF part."""
+    buf = io.BytesIO()
+    footer = partial(_part_footer, section["title"])
+    _doc(buf, title=section["title"]).build(section_flowables(section), onFirstPage=footer, onLaterPages=footer)
+    return buf.getvalue()
+
+
+def _write_atomic(path: str, data: bytes):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _load_manifest(cache_dir: str) -> Dict:
+    try:
+        with open(os.path.join(cache_dir, MANIFEST_NAME), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def build_manual_incremental(
+    sections: List[Dict],
+    output: Output,
+    cache_dir: str,
+    title: str = "Illuminati AI Copy Master",
+    subtitle: str = "Campaign Manual",
+    workers: Optional[int] = None,
+) -> Dict:
+    """
+    Build the manual from cached section parts, rendering only the missing ones
+    (in parallel when large). Falls back to a full build_manual without pypdf.
+    """
+    sections = [s for s in sections if s.get("content")]
+    if PdfWriter is None:
+        build_manual(sections, output, title, subtitle, workers)
+        return {"rendered": len(sections), "reused": 0, "incremental": False}
+
+    parts_dir = os.path.join(cache_dir, "parts")
+    os.makedirs(parts_dir, exist_ok=True)
+    keys = [section_hash(s) for s in sections]
+    paths = [os.path.join(parts_dir, f"{k}.pdf") for k in keys]
+    missing = [i for i, path in enumerate(paths) if not os.path.exists(path)]
+    missing = list({keys[i]: i for i in missing}.values())  # identical sections render once
+    for i, data in zip(missing, _map_sections(render_section_pdf, [sections[i] for i in missing], workers)):
+        _write_atomic(paths[i], data)
+
+    cover = io.BytesIO()
+    _doc(cover, title=title).build(_cover_story(sections, title, subtitle), onFirstPage=_page_footer)
+    writer = PdfWriter()
+    writer.append(PdfReader(cover))
+    pages = []
+    for section, path in zip(sections, paths):
+        start = len(writer.pages)
+        writer.append(PdfReader(path))
+        writer.add_outline_item(section["title"], start)
+        pages.append(len(writer.pages) - start)
+    writer.add_metadata({"/Title": title})
+    writer.write(output)
+
+    # Drop parts no longer referenced so the cache tracks the current manual.
+    live = {f"{k}.pdf" for k in keys}
+    for name in os.listdir(parts_dir):
+        if name.endswith(".pdf") and name not in live:
+            os.remove(os.path.join(parts_dir, name))
+    return {
+        "rendered": len(missing),
+        "reused": len(sections) - len(missing),
+        "pages": len(writer.pages),
+        "sections": [
+            {"title": s["title"], "kind": s["kind"], "hash": k, "pages": n} for s, k, n in zip(sections, keys, pages)
+        ],
+        "incremental": True,
+    }
+
+
+def build_manual_package(
+    sections: List[Dict],
+    zip_path: str,
+    cache_dir: str,
+    assets: Optional[Dict[str, Union[str, bytes]]] = None,
+    title: str = "Illuminati AI Copy Master",
+    subtitle: str = "Campaign Manual",
+    pdf_name: str = PDF_NAME,
+    workers: Optional[int] = None,
+) -> Dict:
+    """
+    Manual PDF + README + ``assets`` (arcname -> text or bytes) as a ZIP at ``zip_path``.
+    Skips the build when the manifest shows no section or asset changed; otherwise
+    re-renders only changed sections and rewrites the ZIP. Returns a build report.
+    """
+    started = time.perf_counter()
+    os.makedirs(cache_dir, exist_ok=True)
+    assets = dict(assets or {})
+    readme = README_TEXT.replace(PDF_NAME, pdf_name)
+    asset_hashes = {
+        name: hashlib.sha256(data if isinstance(data, bytes) else data.encode("utf-8")).hexdigest()[:32]
+        for name, data in sorted(assets.items())
+    }
+    section_keys = [section_hash(s) for s in sections if s.get("content")]
+    package_key = content_hash(title, subtitle, pdf_name, readme, section_keys, asset_hashes)
+
+    manifest = _load_manifest(cache_dir)
+    if manifest.get("package") == package_key and os.path.exists(zip_path):
+        return {
+            "status": "unchanged",
+            "rendered": 0,
+            "reused": len(section_keys),
+            "seconds": time.perf_counter() - started,
+        }
+
+    pdf = io.BytesIO()
+    report = build_manual_incremental(sections, pdf, cache_dir, title, subtitle, workers)
+    tmp = f"{zip_path}.{os.getpid()}.tmp"
+    with zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as zf:
+        # PDF streams are already compressed; storing skips a second deflate pass.
+        zf.writestr(pdf_name, pdf.getvalue(), compress_type=zipfile.ZIP_STORED)
+        zf.writestr("README.txt", readme)
+        for name, data in sorted(assets.items()):
+            zf.writestr(name, data)
+    os.replace(tmp, zip_path)
+
+    manifest = {
+        "render_version": RENDER_VERSION,
+        "package": package_key,
+        "title": title,
+        "pdf": pdf_name,
+        "sections": report.get("sections", []),
+        "assets": asset_hashes,
+        "built": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
+    }
+    _write_atomic(os.path.join(cache_dir, MANIFEST_NAME), json.dumps(manifest, indent=2).encode("utf-8"))
+    report.update(status="built", seconds=time.perf_counter() - started)
+    return report
+
+
+def build_package(output: Output):
+    """Write the PDF + README ZIP to a path or a writable binary file object; the PDF goes straight into its entry."""
+    with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as zf:
+        with zf.open(PDF_NAME, "w") as entry:
+            build_pdf(entry)
+        zf.writestr("README.txt", README_TEXT)
+
+
+def package_bytes() -> bytes:
+    buf = io.BytesIO()
+    build_package(buf)
+    return buf.getvalue()
+
+
+# Batch packaging
+# An offers manifest is a JSON list (or {"offers": [...]}) or JSONL of
+#   {"name", "sections": [...], optional "id", "title", "subtitle", "assets"}
+# Each offer becomes <out>/<slug>.zip holding <slug>.pdf; the slug comes from "id"
+# or "name", so names are stable across runs, and section parts are cached per offer
+# under <out>/.cache/<slug>. Offers build in a spawn process pool, one job per offer;
+# a failing offer is reported and the rest carry on.
+
+BATCH_REPORT_NAME = "batch_report.json"
+
+
+def load_offers(path: str) -> List[Dict]:
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    if path.endswith(".jsonl"):
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    data = json.loads(text)
+    return data["offers"] if isinstance(data, dict) else data
+
+
+def offer_slug(offer: Dict) -> str:
+    raw = str(offer.get("id") or offer.get("name") or "offer")
+    return re.sub(r"[^a-z0-9]+", "-", raw.lower()).strip("-")[:80] or "offer"
+
+
+def batch_jobs(offers: List[Dict], out_dir: str) -> List[Dict]:
+    """One job per offer with its deterministic output paths (repeated slugs get -2, -3... in manifest order)."""
+    jobs, used = [], set()
+    for index, offer in enumerate(offers):
+        base = slug = offer_slug(offer) if isinstance(offer, dict) else f"offer-{index + 1}"
+        n = 1
+        while slug in used:
+            n += 1
+            slug = f"{base}-{n}"
+        used.add(slug)
+        jobs.append({
+            "index": index,
+            "slug": slug,
+            "offer": offer,
+            "zip_path": os.path.join(out_dir, f"{slug}.zip"),
+            "cache_dir": os.path.join(out_dir, ".cache", slug),
+        })
+    return jobs
+
+
+def build_offer_job(job: Dict) -> Dict:
+    """Build one offer's package; every error is caught and returned in the result."""
+    started = time.perf_counter()
+    result = {"index": job["index"], "slug": job["slug"], "zip": job["zip_path"], "pid": os.getpid()}
+    try:
+        offer = job["offer"]
+        if not isinstance(offer, dict):
+            raise ValueError("offer must be an object")
+        sections = offer.get("sections")
+        if not isinstance(sections, list) or not sections:
+            raise ValueError("offer has no sections")
+        if not all(isinstance(sec, dict) and sec.get("title") and "content" in sec for sec in sections):
+            raise ValueError("every section needs a title and content")
+        sections = [dict(sec, kind=sec.get("kind") or "text") for sec in sections]
+        name = str(offer.get("name") or job["slug"])
+        report = build_manual_package(
+            sections,
+            job["zip_path"],
+            job["cache_dir"],
+            assets=offer.get("assets"),
+            title=str(offer.get("title") or name),
+            subtitle=str(offer.get("subtitle") or "Campaign Manual"),
+            pdf_name=f"{job['slug']}.pdf",
+            workers=1,  # the batch pool already has one process per core
+        )
+        result.update(ok=True, status=report["status"], rendered=report["rendered"], reused=report["reused"])
+    except Exception as e:
+        result.update(ok=False, status="failed", error=f"{type(e).__name__}: {e}", traceback=traceback.format_exc())
+    result["seconds"] = round(time.perf_counter() - started, 4)
+    return result
+
+
+def _run_isolated(job: Dict, ctx) -> Dict:
+    """Re-run a job in its own process after a worker died, so one crash can't fail the others."""
+    with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+        try:
+            return pool.submit(build_offer_job, job).result()
+        except BrokenProcessPool:
+            return {"index": job["index"], "slug": job["slug"], "zip": job["zip_path"], "ok": False,
+                    "status": "failed", "error": "worker process died", "seconds": 0.0}
+
+
+def build_batch(
+    offers: List[Dict],
+    out_dir: str,
+    workers: Optional[int] = None,
+    progress: Optional[Callable[[Dict], None]] = None,
+) -> Dict:
+    """
+    Package every offer into ``out_dir`` and write batch_report.json there. Jobs run
+    in a spawn process pool (``workers`` defaults to the CPU count; 1 means serial)
+    and results come back in manifest order with per-job timing.
+    """
+    started = time.perf_counter()
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = batch_jobs(offers, out_dir)
+    max_workers = min(workers or os.cpu_count() or 1, len(jobs)) or 1
+    results: Dict[int, Dict] = {}
+
+    def done(result: Dict):
+        results[result["index"]] = result
+        if progress:
+            progress(result)
+
+    if max_workers <= 1:
+        for job in jobs:
+            done(build_offer_job(job))
+    else:
+        ctx = multiprocessing.get_context("spawn")
+        crashed: List[Dict] = []
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=ctx) as pool:
+            futures = {pool.submit(build_offer_job, job): job for job in jobs}
+            for future in as_completed(futures):
+                try:
+                    done(future.result())
+                except BrokenProcessPool:
+                    crashed.append(futures[future])
+        for job in sorted(crashed, key=lambda j: j["index"]):
+            done(_run_isolated(job, ctx))
+
+    ordered = [results[i] for i in range(len(jobs))]
+    wall = time.perf_counter() - started
+    busy = sum(r["seconds"] for r in ordered)
+    report = {
+        "offers": len(jobs),
+        "built": sum(r["status"] == "built" for r in ordered),
+        "unchanged": sum(r["status"] == "unchanged" for r in ordered),
+        "failed": sum(not r["ok"] for r in ordered),
+        "workers": max_workers,
+        "wall_seconds": round(wall, 4),
+        "job_seconds": round(busy, 4),
+        "speedup": round(busy / wall, 2) if wall else 0.0,
+        "jobs": ordered,
+    }
+    _write_atomic(os.path.join(out_dir, BATCH_REPORT_NAME), json.dumps(report, indent=2).encode("utf-8"))
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the Illuminati AI package, or one package per offer.")
+    parser.add_argument("--batch", metavar="OFFERS", help="JSON or JSONL manifest of offers to package")
+    parser.add_argument("--out", default="packages", help="output directory for batch mode")
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    if not args.batch:
+        build_package(PACKAGE_ZIP_NAME)
+        print(f"[OK] Created ZIP package: {PACKAGE_ZIP_NAME}")
+        return
+
+    def progress(result: Dict):
+        mark = "OK" if result["ok"] else "FAIL"
+        detail = result["status"] if result["ok"] else result["error"]
+        print(f"[{mark}] {result['slug']} ({result['seconds']:.2f}s) {detail}")
+
+    report = build_batch(load_offers(args.batch), args.out, args.workers, progress)
+    print(
+        f"[OK] {report['offers']} offers: {report['built']} built, {report['unchanged']} unchanged, "
+        f"{report['failed']} failed in {report['wall_seconds']:.2f}s on {report['workers']} workers "
+        f"({report['speedup']}x). Report: {os.path.join(args.out, BATCH_REPORT_NAME)}"
+    )
+    if report["failed"]:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,181 @@
+# Geo-localized classified ad mass generation
+# Streams city/region rows from a CSV, localizes a set of base ads for each row and
+# writes CSV or JSONL to disk with bounded memory. Large lists fan out to a process
+# pool; workers only import this module, never the Streamlit app.
+
+import csv
+import io
+import itertools
+import json
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Deque, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+Location = Tuple[str, str]
+
+OUTPUT_FORMATS = ("csv", "jsonl")
+CSV_FIELDS = ["location_id", "city", "region", "variant", "title", "ad"]
+
+CITY_HEADERS = ("city", "town", "location", "metro")
+REGION_HEADERS = ("region", "state", "province", "county", "country")
+
+
+def read_locations(f: TextIO) -> Iterator[Location]:
+    """Yield (city, region) pairs. Uses a header row when it names a city column, else columns 1–2."""
+    reader = csv.reader(f)
+    first = next(reader, None)
+    if first is None:
+        return
+
+    header = [h.strip().lower() for h in first]
+    city_col = next((header.index(h) for h in CITY_HEADERS if h in header), None)
+    if city_col is None:
+        city_col, region_col = 0, 1
+        rows: Iterable[List[str]] = itertools.chain([first], reader)
+    else:
+        region_col = next((header.index(h) for h in REGION_HEADERS if h in header), None)
+        rows = reader
+
+    for row in rows:
+        if len(row) <= city_col:
+            continue
+        city = row[city_col].strip()
+        if not city:
+            continue
+        region = row[region_col].strip() if region_col is not None and len(row) > region_col else ""
+        yield city, region
+
+
+def localize_ad(ad: str, city: str, region: str = "") -> str:
+    place = f"{city}, {region}" if region else city
+    hook, _, rest = ad.partition("\n\n")
+    blocks = rest.split("\n\n") if rest else []
+    local_line = f"Now serving {place} and nearby areas."
+    # Keep the CTA last; the local line goes right before it.
+    blocks.insert(max(len(blocks) - 1, 0), local_line)
+    return "\n\n".join([f"{hook.rstrip().rstrip('.')} — {place}"] + blocks)
+
+
+# Worker state is set once per process by the pool initializer, so each chunk
+# only ships its locations, not the base ads.
+_WORKER_ADS: List[str] = []
+_WORKER_FMT = "csv"
+_WORKER_PER_LOCATION = 1
+
+
+def _init_worker(ads: List[str], fmt: str, per_location: int) -> None:
+    global _WORKER_ADS, _WORKER_FMT, _WORKER_PER_LOCATION
+    _WORKER_ADS, _WORKER_FMT, _WORKER_PER_LOCATION = ads, fmt, per_location
+
+
+def render_location_chunk(
+    rows: List[Location],
+    start_id: int,
+    ads: Optional[List[str]] = None,
+    fmt: Optional[str] = None,
+    per_location: Optional[int] = None,
+) -> str:
+    """Render one chunk of locations to serialized CSV/JSONL text (no header)."""
+    ads = _WORKER_ADS if ads is None else ads
+    fmt = _WORKER_FMT if fmt is None else fmt
+    per_location = _WORKER_PER_LOCATION if per_location is None else per_location
+
+    buf = io.StringIO()
+    writer = csv.writer(buf) if fmt == "csv" else None
+    n_ads = len(ads)
+    for offset, (city, region) in enumerate(rows):
+        location_id = start_id + offset
+        for v in range(per_location):
+            # Rotate through the base ads so neighbouring locations differ.
+            ad = localize_ad(ads[(location_id * per_location + v) % n_ads], city, region)
+            title = ad.split("\n", 1)[0]
+            record = [location_id, city, region, v + 1, title, ad]
+            if writer is not None:
+                writer.writerow(record)
+            else:
+                buf.write(json.dumps(dict(zip(CSV_FIELDS, record)), ensure_ascii=False))
+                buf.write("\n")
+    return buf.getvalue()
+
+
+def _chunks(locations: Iterable[Location], size: int) -> Iterator[List[Location]]:
+    chunk: List[Location] = []
+    for loc in locations:
+        chunk.append(loc)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def stream_localized_ads(
+    ads: List[str],
+    locations: Iterable[Location],
+    out: TextIO,
+    fmt: str = "csv",
+    per_location: int = 1,
+    chunk_size: int = 2000,
+    workers: Optional[int] = None,
+    progress: Optional[Callable[[int], None]] = None,
+) -> int:
+    """
+    Write localized ads for every location to ``out`` and return the number of locations.
+
+    Lists that fit in one chunk render in-process; longer lists use a process pool
+    (``workers`` defaults to the CPU count; 1 means serial). At most two
+    chunks per worker are in flight, so memory stays bounded however long the list is.
+    """
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported output format: {fmt}")
+    if not ads:
+        raise ValueError("Need at least one base ad to localize.")
+
+    if fmt == "csv":
+        csv.writer(out).writerow(CSV_FIELDS)
+
+    chunks = _chunks(locations, chunk_size)
+    head = list(itertools.islice(chunks, 2))
+    if not head:
+        return 0
+    chunks = itertools.chain(head, chunks)
+
+    done = 0
+    max_workers = workers or os.cpu_count() or 1
+    if len(head) < 2 or max_workers <= 1:
+        for chunk in chunks:
+            out.write(render_location_chunk(chunk, done, ads, fmt, per_location))
+            done += len(chunk)
+            if progress:
+                progress(done)
+        return done
+
+    # Spawn keeps workers clean of the host process's threads (e.g. a Streamlit server).
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=ctx,
+        initializer=_init_worker,
+        initargs=(list(ads), fmt, per_location),
+    ) as pool:
+        pending: Deque = deque()
+        next_id = 0
+        for chunk in chunks:
+            pending.append((pool.submit(render_location_chunk, chunk, next_id), len(chunk)))
+            next_id += len(chunk)
+            while len(pending) >= 2 * max_workers:
+                done = _drain_one(pending, out, done, progress)
+        while pending:
+            done = _drain_one(pending, out, done, progress)
+    return done
+
+
+def _drain_one(pending: Deque, out: TextIO, done: int, progress: Optional[Callable[[int], None]]) -> int:
+    future, n = pending.popleft()
+    out.write(future.result())
+    done += n
+    if progress:
+        progress(done)
+    return done
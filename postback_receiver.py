@@ -0,0 +1,384 @@
+# Conversion postback receiver
+# Standalone HTTP server for affiliate-network postbacks and S2S pixels. Hits are
+# validated and buffered in memory, then folded into one analytics snapshot per
+# minute x campaign x channel and written to the analytics database in batched
+# transactions, which the Analytics page reads. Hits that carry a variant are also
+# served on /events in the Sequential Test feed format for the A/B Split Tester.
+# Single-threaded asyncio; the database writes run on one helper thread.
+#
+#   python postback_receiver.py [--port 8765] [--db data/analytics.db] [--token SECRET]
+#
+# Example postback URL for a network:
+#   http://HOST:8765/postback?event=sale&campaign={offer_name}&payout={payout}&variant={sub1}&txid={transaction_id}
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import signal
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Deque, Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+import pandas as pd
+
+import analytics_store
+
+DEFAULT_PORT = 8765
+DEFAULT_DB = os.environ.get("ILLUMINATI_ANALYTICS_DB") or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "data", "analytics.db"
+)
+
+# Networks name the same macro differently; the first alias present wins.
+PARAM_ALIASES = {
+    "event": ("event", "type", "goal", "status"),
+    "campaign": ("campaign", "offer", "offer_name", "offer_id", "campaign_id"),
+    "channel": ("channel", "network", "source", "traffic_source"),
+    "variant": ("variant", "sub_id", "subid", "sub1", "aff_sub", "s1"),
+    "payout": ("payout", "amount", "revenue", "commission", "sum"),
+    "cost": ("cost", "spend"),
+    "txid": ("txid", "transaction_id", "order_id", "click_id", "clickid"),
+    "token": ("token", "key"),
+}
+# Postback event -> (analytics count column, A/B feed event)
+EVENT_TYPES = {
+    "impression": (None, "impression"),
+    "click": ("Clicks", "click"),
+    "lead": ("Leads", "conversion"),
+    "sale": ("Sales", "conversion"),
+    "conversion": ("Sales", "conversion"),
+    "approved": ("Sales", "conversion"),
+}
+MAX_FIELD = 200
+MAX_BODY = 65536
+PIXEL_GIF = bytes.fromhex("47494638396101000100800000000000ffffff21f90401000000002c00000000010001000002024401003b")
+
+# (minute epoch, campaign, channel, count column, payout, cost)
+Hit = Tuple[int, str, str, Optional[str], float, float]
+
+
+def _param(params: Dict[str, str], field: str) -> str:
+    for name in PARAM_ALIASES[field]:
+        value = params.get(name)
+        if value:
+            return value.strip()
+    return ""
+
+
+def _money(value: str, field: str) -> float:
+    if not value:
+        return 0.0
+    try:
+        amount = float(value.replace("$", "").replace(",", ""))
+    except ValueError:
+        raise ValueError(f"{field} is not a number") from None
+    if not math.isfinite(amount) or amount < 0:
+        raise ValueError(f"{field} must be a non-negative amount")
+    return amount
+
+
+class PostbackReceiver:
+    """
+    Validation, buffering and batched writes, independent of the HTTP layer.
+    ``handle`` is cheap and never touches the database; ``flush`` does the writing.
+    """
+
+    def __init__(
+        self,
+        store,
+        token: Optional[str] = None,
+        default_channel: str = "Affiliate",
+        feed_size: int = 200_000,
+        dedupe_size: int = 1_000_000,
+    ):
+        self.store = store
+        self.token = token
+        self.default_channel = default_channel
+        self.dedupe_size = dedupe_size
+        self._buffer: List[Hit] = []
+        self._lock = threading.Lock()
+        self._seen: "OrderedDict[Tuple[str, str], None]" = OrderedDict()
+        self._feed: Deque[Dict] = deque(maxlen=feed_size)
+        self._feed_id = 0
+        self.accepted = 0
+        self.rejected = 0
+        self.duplicates = 0
+        self.written = 0
+        self.flushes = 0
+        self.last_error = ""
+
+    def handle(self, params: Dict[str, str], now: Optional[float] = None) -> Tuple[int, str]:
+        """Validate and buffer one hit; returns (HTTP status, short reason)."""
+        if self.token and _param(params, "token") != self.token:
+            self.rejected += 1
+            return 403, "bad token"
+        event = (_param(params, "event") or "conversion").lower()
+        if event not in EVENT_TYPES:
+            self.rejected += 1
+            return 400, f"unknown event '{event[:MAX_FIELD]}'"
+        campaign = _param(params, "campaign")
+        channel = _param(params, "channel") or self.default_channel
+        variant = _param(params, "variant")
+        if not campaign:
+            self.rejected += 1
+            return 400, "campaign is required"
+        if max(len(campaign), len(channel), len(variant)) > MAX_FIELD:
+            self.rejected += 1
+            return 400, "field too long"
+        try:
+            payout = _money(_param(params, "payout"), "payout")
+            cost = _money(_param(params, "cost"), "cost")
+        except ValueError as e:
+            self.rejected += 1
+            return 400, str(e)
+
+        # Networks retry postbacks; a repeated transaction id counts once.
+        txid = _param(params, "txid")
+        if txid:
+            key = (event, txid)
+            if key in self._seen:
+                self.duplicates += 1
+                return 200, "duplicate"
+            self._seen[key] = None
+            if len(self._seen) > self.dedupe_size:
+                self._seen.popitem(last=False)
+
+        column, ab_event = EVENT_TYPES[event]
+        minute = int((time.time() if now is None else now) // 60) * 60
+        if column or payout or cost:
+            with self._lock:
+                self._buffer.append((minute, campaign, channel, column, payout, cost))
+        if variant:
+            self._feed_id += 1
+            self._feed.append({"id": self._feed_id, "variant": variant, "event": ab_event, "campaign": campaign})
+        self.accepted += 1
+        return 200, "ok"
+
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    def flush(self) -> int:
+        """Write buffered hits as per-minute snapshots in one store transaction; returns hits written."""
+        with self._lock:
+            hits, self._buffer = self._buffer, []
+        if not hits:
+            return 0
+        df = pd.DataFrame(hits, columns=["Timestamp", "Campaign", "Channel", "Column", "Revenue", "Spend"])
+        for col in analytics_store.COUNT_COLUMNS:
+            df[col] = (df["Column"] == col).astype("int64")
+        snapshots = df.groupby(["Timestamp", "Campaign", "Channel"], as_index=False)[
+            analytics_store.METRIC_COLUMNS
+        ].sum()
+        snapshots["Timestamp"] = pd.to_datetime(snapshots["Timestamp"], unit="s", utc=True)
+        try:
+            self.store.append(snapshots)
+        except Exception as e:
+            # Keep the hits for the next flush rather than dropping conversions.
+            with self._lock:
+                self._buffer[:0] = hits
+            self.last_error = f"{type(e).__name__}: {e}"
+            raise
+        self.written += len(hits)
+        self.flushes += 1
+        self.last_error = ""
+        return len(hits)
+
+    def events_since(self, since: int, limit: int = 10_000) -> List[Dict]:
+        """A/B feed events with id > ``since`` (oldest first), for ab_stream.HttpPoller."""
+        if not self._feed or since >= self._feed_id:
+            return []
+        first = self._feed[0]["id"]
+        start = max(since + 1 - first, 0)
+        return [self._feed[i] for i in range(start, min(start + limit, len(self._feed)))]
+
+    def stats(self) -> Dict:
+        return {
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "duplicates": self.duplicates,
+            "pending": self.pending(),
+            "written": self.written,
+            "flushes": self.flushes,
+            "feed_id": self._feed_id,
+            "last_error": self.last_error,
+        }
+
+
+_REASONS = {200: "OK", 400: "Bad Request", 403: "Forbidden", 404: "Not Found", 405: "Method Not Allowed"}
+
+
+def _response(status: int, body: bytes, content_type: str, keep_alive: bool) -> bytes:
+    head = (
+        f"HTTP/1.1 {status} {_REASONS.get(status, 'OK')}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "Cache-Control: no-store\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode("latin-1") + body
+
+
+class PostbackServer:
+    """Minimal HTTP/1.1 keep-alive server in front of a PostbackReceiver."""
+
+    def __init__(self, receiver: PostbackReceiver, batch_size: int = 5000, flush_interval: float = 1.0):
+        self.receiver = receiver
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="postback-writer")
+        self._flushing: Optional[asyncio.Future] = None
+        self._clients: Set[asyncio.StreamWriter] = set()
+
+    def route(self, method: str, target: str, body: bytes, content_type: str) -> Tuple[int, bytes, str]:
+        url = urlsplit(target)
+        params = dict(parse_qsl(url.query))
+        if url.path in ("/postback", "/pixel", "/pixel.gif"):
+            if method == "HEAD":
+                # Link checkers and URL validators probe with HEAD; that is not a hit.
+                return 200, b"", "text/plain" if url.path == "/postback" else "image/gif"
+            if method == "POST" and body:
+                if "json" in content_type:
+                    try:
+                        data = json.loads(body)
+                    except ValueError:
+                        return 400, b"invalid json", "text/plain"
+                    if isinstance(data, dict):
+                        params.update({k: str(v) for k, v in data.items()})
+                else:
+                    params.update(parse_qsl(body.decode("utf-8", "replace")))
+            status, reason = self.receiver.handle(params)
+            if self.receiver.pending() >= self.batch_size:
+                self._schedule_flush()
+            if url.path != "/postback" and status == 200:
+                return 200, PIXEL_GIF, "image/gif"
+            return status, reason.encode(), "text/plain"
+        if url.path == "/events" and method == "GET":
+            try:
+                since = int(params.get("since", 0))
+            except ValueError:
+                return 400, b"since must be an integer", "text/plain"
+            events = self.receiver.events_since(since)
+            return 200, "".join(json.dumps(e) + "\n" for e in events).encode(), "application/x-ndjson"
+        if url.path == "/health":
+            return 200, json.dumps(self.receiver.stats()).encode(), "application/json"
+        return 404, b"not found", "text/plain"
+
+    def _schedule_flush(self):
+        if self._flushing is None or self._flushing.done():
+            self._flushing = asyncio.get_running_loop().run_in_executor(self._writer, self._flush_quietly)
+
+    def _flush_quietly(self):
+        try:
+            self.receiver.flush()
+        except Exception:
+            pass  # recorded in receiver.last_error; hits stay buffered for the next try
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            if self.receiver.pending():
+                self._schedule_flush()
+
+    async def _connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._clients.add(writer)
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ", 2)
+                except ValueError:
+                    writer.write(_response(400, b"bad request", "text/plain", False))
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(":")
+                    if name:
+                        headers[name.strip().lower()] = value.strip()
+                try:
+                    length = int(headers.get("content-length", "0") or 0)
+                except ValueError:
+                    length = -1
+                if not 0 <= length <= MAX_BODY:
+                    writer.write(_response(400, b"bad content-length", "text/plain", False))
+                    break
+                body = await reader.readexactly(length) if length else b""
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" and (version == "HTTP/1.1" or connection == "keep-alive")
+                if method not in ("GET", "POST", "HEAD"):
+                    status, payload, ctype = 405, b"method not allowed", "text/plain"
+                else:
+                    status, payload, ctype = self.route(method, target, body, headers.get("content-type", ""))
+                writer.write(_response(status, b"" if method == "HEAD" else payload, ctype, keep_alive))
+                if not keep_alive:
+                    break
+                if writer.transport.get_write_buffer_size() > 65536:
+                    await writer.drain()
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._clients.discard(writer)
+            writer.close()
+
+    async def serve(self, host: str, port: int):
+        server = await asyncio.start_server(self._connection, host, port, backlog=1024)
+        flusher = asyncio.create_task(self._flush_loop())
+        stopping = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stopping.set)
+            except (NotImplementedError, RuntimeError):
+                pass  # e.g. Windows; Ctrl+C still raises KeyboardInterrupt
+        try:
+            await stopping.wait()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            flusher.cancel()
+            server.close()
+            # Idle keep-alive clients would hold wait_closed() open (Python 3.12+), so
+            # close them and flush first; buffered hits must not depend on clients leaving.
+            for writer in list(self._clients):
+                writer.close()
+            self._flush_quietly()
+            try:
+                await asyncio.wait_for(server.wait_closed(), timeout=5)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                pass
+            self._flush_quietly()
+            self._writer.shutdown(wait=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Receive affiliate postbacks into the analytics database.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--db", default=DEFAULT_DB, help="analytics SQLite database (shared with the app)")
+    parser.add_argument("--token", default=os.environ.get("POSTBACK_TOKEN"), help="require ?token=... on every hit")
+    parser.add_argument("--channel", default="Affiliate", help="channel for hits that don't name one")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--flush-interval", type=float, default=1.0)
+    args = parser.parse_args()
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.db)), exist_ok=True)
+    receiver = PostbackReceiver(analytics_store.SQLiteCampaignStore(args.db), args.token, args.channel)
+    server = PostbackServer(receiver, args.batch_size, args.flush_interval)
+    print(f"[OK] Postback receiver on http://{args.host}:{args.port}/postback -> {args.db}")
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    print(f"[OK] Stopped. {receiver.written:,} hits written, {receiver.pending():,} unflushed.")
+
+
+if __name__ == "__main__":
+    main()
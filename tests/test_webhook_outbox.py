@@ -0,0 +1,103 @@
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from webhook_outbox import BATCH_FORMATS, Dispatcher, Outbox
+
+
+class StandIn(ThreadingHTTPServer):
+    """Local webhook endpoint: the first ``fail_first`` requests get a 503, /bad gets a 400 until ``accept_bad``."""
+
+    def __init__(self, fail_first: int = 5):
+        super().__init__(("127.0.0.1", 0), Handler)
+        self.fail_first = fail_first
+        self.accept_bad = False
+        self.requests = 0
+        self.received = Counter()
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"])).decode("utf-8")
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            if server.requests <= server.fail_first:
+                status = 503
+            elif self.path == "/bad" and not server.accept_bad:
+                status = 400
+            else:
+                status = 200
+                if self.path.endswith("/ndjson"):
+                    events = [json.loads(line) for line in body.splitlines() if line]
+                elif self.path.endswith("/array"):
+                    events = json.loads(body)
+                else:
+                    events = [json.loads(body)]
+                server.received.update(e["id"] for e in events)
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stand_in():
+    server = StandIn()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def wait_for(predicate, timeout: float = 30.0) -> bool:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return predicate()
+
+
+def test_dispatcher_delivers_every_format_once_and_dead_letters_client_errors(stand_in, tmp_path):
+    outbox = Outbox(str(tmp_path / "o.db"), backoff=0.05)
+    expected = []
+    for fmt in BATCH_FORMATS:
+        for i in range(100):
+            event_id = f"{fmt}-{i}"
+            outbox.put(f"{stand_in.url}/hook/{fmt}", {"id": event_id, "n": i}, fmt)
+            expected.append(event_id)
+    outbox.put(f"{stand_in.url}/bad", {"id": "bad-0"})
+
+    dispatcher = Dispatcher(outbox, batch_size=25, idle=0.2)
+    dispatcher.start()
+    try:
+        assert wait_for(lambda: len(stand_in.received) >= len(expected) and outbox.stats()["dead"] == 1)
+        assert all(stand_in.received[event_id] == 1 for event_id in expected)
+        assert "bad-0" not in stand_in.received
+        stats = outbox.stats()
+        assert stats["pending"] == 0 and stats["dead"] == 1
+        assert stats["last_error"].startswith("HTTP 400")
+
+        stand_in.accept_bad = True
+        assert outbox.requeue_dead() == 1
+        dispatcher.wake()
+        assert wait_for(lambda: stand_in.received["bad-0"] == 1)
+        assert wait_for(lambda: outbox.stats() == {"pending": 0, "retrying": 0, "dead": 0, "last_error": ""})
+        assert sum(stand_in.received.values()) == len(expected) + 1
+        assert dispatcher.error == ""
+    finally:
+        dispatcher.stop()
+        dispatcher.join(timeout=5)
@@ -0,0 +1,245 @@
+# Durable webhook delivery
+# Events are written to a local SQLite outbox first and delivered by a background
+# thread over a pooled HTTP session, so the page never waits on the endpoint. Rows are
+# deleted only after a 2xx, which makes delivery at-least-once across retries and
+# restarts. Batches go out as one request per event, a JSON array (Zapier catch hooks
+# run once per item) or NDJSON, depending on what the endpoint accepts.
+
+import json
+import random
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:
+    requests = None
+    HTTPAdapter = None
+
+BATCH_FORMATS = {
+    "single": "One request per event",
+    "array": "JSON array per batch",
+    "ndjson": "NDJSON per batch",
+}
+
+# Client errors that won't succeed on retry; the row is parked as dead for a manual requeue.
+_RETRYABLE_4XX = {408, 409, 425, 429}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    fmt TEXT NOT NULL DEFAULT 'single',
+    created REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt REAL NOT NULL,
+    dead INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (dead, next_attempt);
+"""
+
+Row = Tuple[int, str, str, int, str]
+
+
+class Outbox:
+    """
+    Pending webhook events in a WAL-mode SQLite table. Connections are per thread, so
+    the page can enqueue while the dispatcher thread reads and acknowledges.
+    """
+
+    def __init__(self, path: str, max_attempts: int = 12, backoff: float = 2.0, max_backoff: float = 900.0):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def put(self, url: str, payload: Dict, fmt: str = "single") -> int:
+        """Store one event for ``url``; ``fmt`` is its batch format (see BATCH_FORMATS)."""
+        if fmt not in BATCH_FORMATS:
+            raise ValueError(f"Unknown batch format: {fmt}")
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            cur = conn.execute(
+                "INSERT INTO outbox (url, payload, fmt, created, next_attempt) VALUES (?, ?, ?, ?, ?)",
+                (url, json.dumps(payload, ensure_ascii=False, default=str), fmt, now, now),
+            )
+        return cur.lastrowid
+
+    def put_many(self, rows: List[Tuple[str, str, str]]) -> int:
+        """Store already-serialized (url, payload json, fmt) rows in one transaction."""
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            conn.executemany(
+                "INSERT INTO outbox (url, payload, fmt, created, next_attempt) VALUES (?, ?, ?, ?, ?)",
+                [(url, payload, fmt, now, now) for url, payload, fmt in rows],
+            )
+        return len(rows)
+
+    def due(self, limit: int = 500, now: Optional[float] = None) -> List[Row]:
+        """Oldest deliverable rows as (id, url, payload json, attempts, fmt)."""
+        return self._conn().execute(
+            "SELECT id, url, payload, attempts, fmt FROM outbox "
+            "WHERE dead = 0 AND next_attempt <= ? ORDER BY id LIMIT ?",
+            (time.time() if now is None else now, limit),
+        ).fetchall()
+
+    def next_due(self) -> Optional[float]:
+        row = self._conn().execute("SELECT MIN(next_attempt) FROM outbox WHERE dead = 0").fetchone()
+        return row[0]
+
+    def ack(self, ids: List[int]):
+        conn = self._conn()
+        with conn:
+            conn.executemany("DELETE FROM outbox WHERE id = ?", [(i,) for i in ids])
+
+    def fail(self, rows: List[Row], error: str, permanent: bool = False):
+        """Reschedule with capped exponential backoff and jitter; park rows that are out of attempts."""
+        now = time.time()
+        updates = []
+        for row_id, _, _, attempts, _ in rows:
+            attempts += 1
+            delay = min(self.backoff * 2 ** (attempts - 1), self.max_backoff) * random.uniform(0.8, 1.2)
+            dead = int(permanent or attempts >= self.max_attempts)
+            updates.append((attempts, now + delay, dead, error[:500], row_id))
+        conn = self._conn()
+        with conn:
+            conn.executemany(
+                "UPDATE outbox SET attempts = ?, next_attempt = ?, dead = ?, last_error = ? WHERE id = ?", updates
+            )
+
+    def requeue_dead(self) -> int:
+        conn = self._conn()
+        with conn:
+            cur = conn.execute(
+                "UPDATE outbox SET dead = 0, attempts = 0, next_attempt = ? WHERE dead = 1", (time.time(),)
+            )
+        return cur.rowcount
+
+    def stats(self) -> Dict:
+        pending, retrying, dead = self._conn().execute(
+            "SELECT COALESCE(SUM(dead = 0), 0), COALESCE(SUM(dead = 0 AND attempts > 0), 0), COALESCE(SUM(dead), 0) "
+            "FROM outbox"
+        ).fetchone()
+        last = self._conn().execute(
+            "SELECT last_error FROM outbox WHERE last_error != '' ORDER BY id DESC LIMIT 1"
+        ).fetchone()
+        return {"pending": pending, "retrying": retrying, "dead": dead, "last_error": last[0] if last else ""}
+
+
+def pooled_session(pool_size: int = 4):
+    if requests is None:
+        raise RuntimeError("The requests package is needed to deliver webhooks.")
+    session = requests.Session()
+    # Retries are the outbox's job; the adapter only pools keep-alive connections.
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _encode(rows: List[Row], fmt: str) -> Tuple[str, str]:
+    if fmt == "ndjson":
+        return "\n".join(r[2] for r in rows) + "\n", "application/x-ndjson"
+    if fmt == "array":
+        return "[" + ",".join(r[2] for r in rows) + "]", "application/json"
+    return rows[0][2], "application/json"
+
+
+class Dispatcher(threading.Thread):
+    """
+    Drains the outbox in the background. ``wake()`` after enqueueing delivers right
+    away; otherwise the thread sleeps until the next retry is due (at most ``idle``
+    seconds). Rows for the same URL and format share a request, up to ``batch_size``.
+    """
+
+    def __init__(
+        self,
+        outbox: Outbox,
+        batch_size: int = 100,
+        timeout: float = 10.0,
+        idle: float = 30.0,
+        session=None,
+    ):
+        super().__init__(daemon=True)
+        self.outbox = outbox
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.idle = idle
+        self.session = session or pooled_session()
+        self.sent = 0
+        self.requests_made = 0
+        self.error = ""
+        self._wake = threading.Event()
+        self._halt = threading.Event()
+
+    def wake(self):
+        self._wake.set()
+
+    def stop(self):
+        self._halt.set()
+        self._wake.set()
+
+    def _post(self, url: str, rows: List[Row], fmt: str):
+        body, content_type = _encode(rows, fmt)
+        self.requests_made += 1
+        try:
+            resp = self.session.post(
+                url, data=body.encode("utf-8"), headers={"Content-Type": content_type}, timeout=self.timeout
+            )
+        except Exception as e:
+            self.outbox.fail(rows, f"{type(e).__name__}: {e}")
+            return
+        if 200 <= resp.status_code < 300:
+            self.outbox.ack([r[0] for r in rows])
+            self.sent += len(rows)
+        else:
+            permanent = 400 <= resp.status_code < 500 and resp.status_code not in _RETRYABLE_4XX
+            self.outbox.fail(rows, f"HTTP {resp.status_code}: {resp.text[:200]}", permanent)
+
+    def deliver_due(self) -> int:
+        """One pass over due rows; returns how many rows were attempted."""
+        rows = self.outbox.due(limit=self.batch_size * 10)
+        groups: Dict[Tuple[str, str], List[Row]] = {}
+        for row in rows:
+            groups.setdefault((row[1], row[4]), []).append(row)
+        for (url, fmt), group in groups.items():
+            size = 1 if fmt == "single" else self.batch_size
+            for i in range(0, len(group), size):
+                self._post(url, group[i : i + size], fmt)
+        return len(rows)
+
+    def run(self):
+        while not self._halt.is_set():
+            self._wake.clear()
+            try:
+                attempted = self.deliver_due()
+                next_due = None if attempted else self.outbox.next_due()
+                self.error = ""
+            except Exception as e:
+                # e.g. "database is locked" while another thread writes; the rows stay
+                # queued, so note the error and try again after the idle wait.
+                self.error = f"{type(e).__name__}: {e}"
+                attempted, next_due = 0, None
+            if attempted:
+                continue
+            wait = self.idle if next_due is None else min(max(next_due - time.time(), 0.05), self.idle)
+            self._wake.wait(wait)